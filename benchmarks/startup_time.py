@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Measure the startup time of the command line paths that must not load the GUI.
+
+Each command is run several times in a new interpreter and the median wall time is
+compared with the budget. The script exits with status 1 if any command exceeds it.
+
+usage: python benchmarks/startup_time.py [RUNS]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+# milliseconds from starting the interpreter until the command has finished
+BUDGET_MS = 50
+
+COMMANDS = [
+    ["--version"],
+    ["--help"],
+    ["merge", "--help"],
+    ["run", "--help"],
+    ["info"],  # usage error
+]
+
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def measure(arguments: list[str], runs: int) -> float:
+    """
+    Run a new interpreter with the given arguments and measure the median wall time.
+
+    Args:
+        arguments (list[str]): The arguments of the interpreter.
+        runs (int): The number of runs.
+
+    Returns:
+        float: The median wall time in milliseconds.
+    """
+    environment = dict(os.environ, PYTHONPATH=SOURCE_DIR)
+    times = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, *arguments],
+            env=environment,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+        times.append((time.perf_counter() - start) * 1000)
+
+    return statistics.median(times)
+
+
+def main() -> int:
+    """Measure all commands and report them, returning 1 if any exceeds the budget."""
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    print(f"{'(interpreter only)':<24} {measure(['-c', 'pass'], runs):6.1f} ms")
+
+    exceeded = False
+    for arguments in COMMANDS:
+        # like the installed pydfcat script, which doesn't go through runpy
+        median = measure(["-c", "from pydfcat import start; start()", *arguments], runs)
+        exceeded |= median > BUDGET_MS
+        status = "ok" if median <= BUDGET_MS else f"over {BUDGET_MS} ms"
+        print(f"pydfcat {' '.join(arguments):<16} {median:6.1f} ms  {status}")
+
+    return 1 if exceeded else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,9 @@
 # -*- coding: utf-8 -*-
 import argparse
-
-import customtkinter
 import os
+import sys
 
-from .settings import DIRNAME
-from .window import ApplicationWindow
+from .settings import CLI_COMMANDS, DIRNAME
 
 
 __version__ = "0.1.00-dev.5"
@@ -13,17 +11,34 @@ __version__ = "0.1.00-dev.5"
 
 def start():
     """Start the program and process arguments from CLI"""
+    # headless commands don't load the GUI at all
+    if sys.argv[1:2] and sys.argv[1] in CLI_COMMANDS:
+        from .cli import main
+
+        sys.exit(main(sys.argv[1:]))
+
     description = (
         "PyDFCat is a GUI PDF editor providing functionality to rearrange and "
         "delete pages within a PDF-file, as well as adding pages from other PDF-files"
     )
-    parser = argparse.ArgumentParser(prog="pydfcat", description=description)
+    parser = argparse.ArgumentParser(
+        prog="pydfcat",
+        description=description,
+        epilog=f"headless commands: {', '.join(CLI_COMMANDS)}, "
+        "see %(prog)s COMMAND --help",
+    )
     parser.add_argument(
         "filepath",
         nargs="?",
         help="path to the file to open in %(prog)s",
         metavar="FILE",
     )
+    parser.add_argument(
+        "-w",
+        "--watch",
+        action="store_true",
+        help="reload the file whenever another program changes it",
+    )
     parser.add_argument(
         "-V", "--version", action="version", version=f"%(prog)s {__version__}"
     )
@@ -32,15 +47,18 @@ def start():
     if args.filepath and not os.path.isfile(args.filepath):
         parser.error(f"Couldn't find the provided file: {args.filepath}")
 
+    # the GUI is only imported once it is needed
+    import customtkinter
+
+    from .window import ApplicationWindow
+
     customtkinter.set_default_color_theme(os.path.join(DIRNAME, "assets/ctktheme.json"))
 
     root_window = ApplicationWindow()
 
-    # open file from cli argument
+    # open file from cli argument, after the window has been shown
     if args.filepath:
-        root_window.toolbar.disable_all()
-        root_window.open_file(args.filepath)
-        root_window.toolbar.enable_all()
+        root_window.open_file_when_shown(args.filepath, watch=args.watch)
 
     # run the windows mainloop
     root_window.mainloop()
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+import os
+from typing import Optional
+
+import fitz  # PyMuPDF
+
+from .pageops import parse_page_ranges
+from .pagetable import PageTable
+
+
+def open_pdf(file_name: str) -> fitz.Document:
+    """
+    Open a PDF file that pages can be taken from.
+
+    Args:
+        file_name (str): The path of the PDF file.
+
+    Returns:
+        fitz.Document: The opened document.
+
+    Raises:
+        ValueError: If the file isn't a PDF or is password protected.
+    """
+    document = fitz.Document(file_name)
+    if not document.is_pdf:
+        raise ValueError(f"{file_name} is not a PDF file")
+    if document.needs_pass:
+        raise ValueError(f"{file_name} is password protected")
+
+    return document
+
+
+def merge(file_names: list[str]) -> PageTable:
+    """
+    Concatenate the pages of PDF files.
+
+    Args:
+        file_names (list[str]): The paths of the files, in order.
+
+    Returns:
+        PageTable: The pages of all files.
+    """
+    table = PageTable()
+    for file_name in file_names:
+        table.extend(PageTable.from_document(open_pdf(file_name)))
+
+    return table
+
+
+def select(file_name: str, pages: str) -> PageTable:
+    """
+    Keep only some pages of a PDF file, in the order of a page range.
+
+    Args:
+        file_name (str): The path of the file.
+        pages (str): The pages to keep, see `parse_page_ranges`.
+
+    Returns:
+        PageTable: The selected pages.
+    """
+    table = PageTable.from_document(open_pdf(file_name))
+    return PageTable(table.refs(parse_page_ranges(pages, len(table))))
+
+
+def delete(file_name: str, pages: str) -> PageTable:
+    """
+    Remove pages of a PDF file.
+
+    Args:
+        file_name (str): The path of the file.
+        pages (str): The pages to remove, see `parse_page_ranges`.
+
+    Returns:
+        PageTable: The remaining pages.
+    """
+    table = PageTable.from_document(open_pdf(file_name))
+    table.delete(parse_page_ranges(pages, len(table)))
+    return table
+
+
+def duplicate(file_name: str, pages: str, deep: bool = False) -> PageTable:
+    """
+    Insert copies of pages of a PDF file behind the last of them.
+
+    Args:
+        file_name (str): The path of the file.
+        pages (str): The pages to duplicate, see `parse_page_ranges`.
+        deep (bool, optional): Whether to store independent copies instead of sharing the
+            page objects. Default is False.
+
+    Returns:
+        PageTable: The pages including the copies.
+    """
+    table = PageTable.from_document(open_pdf(file_name))
+    table.duplicate(parse_page_ranges(pages, len(table)), deep=deep)
+    return table
+
+
+def insert(
+    file_name: str,
+    source: str,
+    pages: Optional[str] = None,
+    before: Optional[int] = None,
+) -> PageTable:
+    """
+    Insert pages of another PDF file in front of a page.
+
+    Args:
+        file_name (str): The path of the file to insert into.
+        source (str): The path of the file to take the pages from.
+        pages (str, optional): The pages of the source, see `parse_page_ranges`.
+            Default is all pages.
+        before (int, optional): The page (counting from 1) to insert the pages in front
+            of. Default is behind the last page.
+
+    Returns:
+        PageTable: The pages including the inserted ones.
+
+    Raises:
+        ValueError: If the page to insert in front of doesn't exist.
+    """
+    table = PageTable.from_document(open_pdf(file_name))
+    source_table = PageTable.from_document(open_pdf(source))
+
+    if pages:
+        refs = source_table.refs(parse_page_ranges(pages, len(source_table)))
+    else:
+        refs = list(source_table)
+
+    position = len(table) + 1 if before is None else before
+    if not 1 <= position <= len(table) + 1:
+        raise ValueError(f"Page {position} is out of range (1-{len(table) + 1})")
+
+    table.insert(position - 1, refs)
+    return table
+
+
+def describe(file_name: str) -> list[tuple[str, str]]:
+    """
+    Describe the properties of a PDF file.
+
+    Args:
+        file_name (str): The path of the file.
+
+    Returns:
+        list[tuple[str, str]]: The name and value of each property.
+    """
+    with fitz.Document(file_name) as document:
+        # the metadata of an encrypted document is only available after authenticating
+        metadata = document.metadata or {}
+
+        properties = [
+            ("pages", str(document.page_count)),
+            ("format", metadata.get("format") or "-"),
+            ("encrypted", "yes" if document.is_encrypted else "no"),
+            ("size", f"{os.path.getsize(file_name)} bytes"),
+        ]
+
+        if not document.needs_pass:
+            for key in ("title", "author", "producer"):
+                properties.append((key, metadata.get(key) or "-"))
+            if document.page_count:
+                width, height = document[0].rect.br
+                properties.append(("page size", f"{width:.0f} x {height:.0f} pt"))
+
+    return properties
@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+import getpass
+import json
+import os
+import socket
+import socketserver
+import tempfile
+import threading
+from typing import Any, Optional, Sequence
+
+import fitz  # PyMuPDF
+
+from .pagetable import PageRef, PageTable
+from .settings import CLIPBOARD_SOCKET_NAME, CLIPBOARD_SOCKET_TIMEOUT
+
+
+def default_socket_path() -> str:
+    """
+    Get the path of the socket shared by all instances of the current user.
+
+    Returns:
+        str: The path in $XDG_RUNTIME_DIR, or in the temporary directory if it isn't set.
+    """
+    directory = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(directory, CLIPBOARD_SOCKET_NAME.format(user=getpass.getuser()))
+
+
+def write_shared_pages(refs: Sequence[PageRef], file_name: str) -> dict[str, list]:
+    """
+    Write pages into the shared file, so another process can open them.
+
+    The pages are copied instead of referring to their source files, since a page number
+    of an open document doesn't refer to the same page of its file anymore once the
+    document has been edited and saved. The file is replaced atomically, so documents
+    opened from a previous version of it keep working.
+
+    Args:
+        refs (Sequence[PageRef]): The page references.
+        file_name (str): The path of the shared file.
+
+    Returns:
+        dict[str, list]: The path, modification time and size of the shared file, and
+            the file index, page number and rotation of each page.
+    """
+    document = PageTable(refs).materialize()
+
+    handle, temp_name = tempfile.mkstemp(
+        suffix=".pdf", dir=os.path.dirname(file_name) or None
+    )
+    os.close(handle)
+    try:
+        document.save(temp_name, garbage=1)
+        # saving recreates the file, it is only readable by the user again
+        os.chmod(temp_name, 0o600)
+        os.replace(temp_name, file_name)
+    except BaseException:
+        os.remove(temp_name)
+        raise
+    finally:
+        document.close()
+
+    stat = os.stat(file_name)
+    return {
+        "files": [[os.path.abspath(file_name), stat.st_mtime_ns, stat.st_size]],
+        "pages": [[0, page, None] for page in range(len(refs))],
+    }
+
+
+class _BrokerServer(socketserver.ThreadingUnixStreamServer):
+    """The socket server keeping the shared pages."""
+
+    daemon_threads = True
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the _BrokerServer.
+
+        Args:
+            path (str): The path of the socket.
+        """
+        super().__init__(path, _BrokerHandler)
+        self.shared: dict[str, list] = {"files": [], "pages": []}
+        self.lock = threading.Lock()
+
+
+class _BrokerHandler(socketserver.StreamRequestHandler):
+    """Handles a single request of an instance, one JSON message per line."""
+
+    server: _BrokerServer
+
+    def handle(self) -> None:
+        """Store published pages or answer with the shared pages."""
+        line = self.rfile.readline()
+        if not line:
+            # an instance checking whether the socket is served
+            return
+
+        request = json.loads(line)
+
+        with self.server.lock:
+            if request["command"] == "publish":
+                self.server.shared = request["pages"]
+                response: dict[str, Any] = {}
+            else:
+                response = {"pages": self.server.shared}
+
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+
+
+class ClipboardBroker:
+    """
+    Shares pages between instances of the application over a local Unix domain socket.
+
+    The first instance that publishes or fetches pages serves the socket from a background
+    thread, all other instances connect to it. Published pages are written into a shared
+    file next to the socket and only its path is sent through the socket. The receiving
+    instance keeps the shared file open, so pasting the same pages again doesn't parse it
+    again.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """
+        Initialize the ClipboardBroker.
+
+        Args:
+            path (str, optional): The path of the socket. Default is `default_socket_path`.
+        """
+        self.path = path or default_socket_path()
+        self.shared_path = os.path.splitext(self.path)[0] + ".pdf"
+
+        self._server: Optional[_BrokerServer] = None
+        self._sources: dict[tuple[str, int, int], fitz.Document] = {}
+
+    @staticmethod
+    def available() -> bool:
+        """Whether the platform supports Unix domain sockets."""
+        return hasattr(socket, "AF_UNIX")
+
+    def publish(self, refs: Sequence[PageRef]) -> None:
+        """
+        Share pages with the other instances, replacing the previously shared pages.
+
+        Args:
+            refs (Sequence[PageRef]): The page references.
+
+        Raises:
+            OSError: If the shared file can't be written, or the broker can't be reached
+                or started.
+        """
+        pages = write_shared_pages(refs, self.shared_path)
+        self._request({"command": "publish", "pages": pages})
+
+    def fetch(self) -> list[PageRef]:
+        """
+        Get the pages shared by any instance.
+
+        Returns:
+            list[PageRef]: References to the shared pages.
+
+        Raises:
+            ValueError: If the shared file has been replaced by pages shared meanwhile.
+            OSError: If the broker can't be reached or started, or a file can't be read.
+        """
+        shared = self._request({"command": "fetch"})["pages"]
+
+        documents = [self._open_source(*file) for file in shared["files"]]
+        # previously shared files stay open as long as their pasted pages are used
+        self._sources = {
+            key: document
+            for key, document in self._sources.items()
+            if document in documents
+        }
+        return [
+            PageRef(documents[file], page, rotation)
+            for file, page, rotation in shared["pages"]
+        ]
+
+    def close(self) -> None:
+        """Stop serving the socket, if this instance serves it."""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+            # nobody can fetch the shared pages anymore
+            for path in (self.path, self.shared_path):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _open_source(self, path: str, mtime: int, size: int) -> fitz.Document:
+        """Open a shared file, reusing it if it was opened before."""
+        key = (path, mtime, size)
+        if key in self._sources:
+            return self._sources[key]
+
+        stat = os.stat(path)
+        if (stat.st_mtime_ns, stat.st_size) != (mtime, size):
+            raise ValueError("Other pages have been shared meanwhile, please try again")
+
+        document = self._sources[key] = fitz.Document(path)
+        return document
+
+    def _request(self, message: dict[str, Any]) -> dict[str, Any]:
+        """Send a message to the broker, starting it if no instance serves it yet."""
+        try:
+            return self._send(message)
+        except (FileNotFoundError, ConnectionRefusedError):
+            self._serve()
+            return self._send(message)
+
+    def _send(self, message: dict[str, Any]) -> dict[str, Any]:
+        """Send a message to the broker and wait for the response."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(CLIPBOARD_SOCKET_TIMEOUT)
+            connection.connect(self.path)
+            connection.sendall(json.dumps(message).encode() + b"\n")
+
+            with connection.makefile("rb") as response:
+                return json.loads(response.readline())
+
+    def _serve(self) -> None:
+        """Serve the socket from a background thread."""
+        if self._is_served():
+            # another instance has just started serving
+            return
+
+        # the socket of an instance that didn't exit cleanly is left behind
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+        # the socket is only accessible by the user from the moment it is created
+        umask = os.umask(0o077)
+        try:
+            self._server = _BrokerServer(self.path)
+        except OSError:
+            # another instance has just started serving
+            return
+        finally:
+            os.umask(umask)
+
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def _is_served(self) -> bool:
+        """Whether an instance accepts connections on the socket."""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(CLIPBOARD_SOCKET_TIMEOUT)
+            try:
+                connection.connect(self.path)
+            except (FileNotFoundError, ConnectionRefusedError):
+                return False
+            except OSError:
+                # e.g. the serving instance is busy, its socket mustn't be removed
+                return True
+        return True
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+import argparse
+import sys
+
+from .settings import SAVE_DEFAULT_PROFILE, SAVE_PROFILES
+
+# this module must not import tkinter or any widget module, so the headless commands run
+# without a display; PyMuPDF and the page operations are only imported once a command
+# runs, so --help and usage errors return immediately (typing isn't imported either, see
+# benchmarks/startup_time.py)
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from .pagetable import PageTable
+
+
+def _info(args: argparse.Namespace) -> None:
+    """Print the properties of each file."""
+    from .batch import describe
+
+    for n, file_name in enumerate(args.files):
+        if n:
+            print()
+
+        print(file_name)
+        for name, value in describe(file_name):
+            print(f"  {name + ':':<11} {value}")
+
+
+def _build_table(args: argparse.Namespace) -> "PageTable":
+    """Build the page table of the output file of a writing command."""
+    from . import batch
+
+    if args.command == "merge":
+        return batch.merge(args.files)
+    if args.command == "select":
+        return batch.select(args.file, args.pages)
+    if args.command == "delete":
+        return batch.delete(args.file, args.pages)
+    if args.command == "duplicate":
+        return batch.duplicate(args.file, args.pages, deep=args.deep)
+    if args.command == "insert":
+        return batch.insert(args.file, args.source, args.pages, args.before)
+    return _run(args)
+
+
+def _run(args: argparse.Namespace) -> "PageTable":
+    """Plan an edit script, the output file defaults to the one named by the script."""
+    from .editscript import load_script, plan_script
+
+    plan = plan_script(load_script(args.script))
+    if not args.quiet:
+        print(f"run: {plan}", file=sys.stderr, flush=True)
+
+    args.output = args.output or plan.output
+    if not (args.output or args.dry_run):
+        raise ValueError("The edit script doesn't name an output file, use -o OUTPUT")
+    return plan.table
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Create the parser of the headless subcommands.
+
+    Returns:
+        argparse.ArgumentParser: The parser, the chosen subcommand is stored in `command`.
+    """
+    parser = argparse.ArgumentParser(
+        prog="pydfcat",
+        description="Rearrange, select and combine PDF pages without opening a window.",
+    )
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND", required=True)
+
+    # options shared by all commands writing a file
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument(
+        "-o",
+        "--output",
+        help="file to write the result to, default is to replace the input file",
+        metavar="OUTPUT",
+    )
+    output.add_argument(
+        "-p",
+        "--profile",
+        choices=SAVE_PROFILES,
+        default=SAVE_DEFAULT_PROFILE,
+        help="save profile, default is %(default)s",
+    )
+    output.add_argument(
+        "-q", "--quiet", action="store_true", help="don't report progress on stderr"
+    )
+    pages_help = "pages like 1-20,45,100- (counting from 1)"
+
+    merge = commands.add_parser("merge", parents=[output], help="concatenate PDF files")
+    merge.add_argument(
+        "files", nargs="+", help="files to merge, in order", metavar="FILE"
+    )
+
+    select = commands.add_parser(
+        "select", parents=[output], help="keep only some pages, in the given order"
+    )
+    select.add_argument("file", help="the PDF file", metavar="FILE")
+    select.add_argument("pages", help=pages_help, metavar="PAGES")
+
+    delete = commands.add_parser("delete", parents=[output], help="delete pages")
+    delete.add_argument("file", help="the PDF file", metavar="FILE")
+    delete.add_argument("pages", help=pages_help, metavar="PAGES")
+
+    duplicate = commands.add_parser(
+        "duplicate", parents=[output], help="duplicate pages behind the last of them"
+    )
+    duplicate.add_argument("file", help="the PDF file", metavar="FILE")
+    duplicate.add_argument("pages", help=pages_help, metavar="PAGES")
+    duplicate.add_argument(
+        "--deep",
+        action="store_true",
+        help="store independent copies instead of sharing the page objects",
+    )
+
+    insert = commands.add_parser(
+        "insert", parents=[output], help="insert pages of another PDF file"
+    )
+    insert.add_argument("file", help="the PDF file to insert into", metavar="FILE")
+    insert.add_argument(
+        "source", help="the PDF file to take the pages from", metavar="SOURCE"
+    )
+    insert.add_argument(
+        "--pages", help=f"{pages_help} of SOURCE, default is all", metavar="PAGES"
+    )
+    insert.add_argument(
+        "--before",
+        type=int,
+        help="insert in front of this page, default is behind the last page",
+        metavar="PAGE",
+    )
+
+    run = commands.add_parser(
+        "run",
+        parents=[output],
+        help="apply a JSON edit script, writing the output file once",
+        description="Apply a JSON edit script, writing the output file once. The script "
+        'lists "steps" like {"op": "insert", "source": "b.pdf", "after": 12}, see '
+        "pydfcat.editscript.plan_script.",
+    )
+    run.add_argument("script", help="the JSON edit script", metavar="SCRIPT")
+    run.add_argument(
+        "-n",
+        "--dry-run",
+        action="store_true",
+        help="only check the script and show the plan",
+    )
+
+    info = commands.add_parser("info", help="show the properties of PDF files")
+    info.add_argument("files", nargs="+", help="files to describe", metavar="FILE")
+
+    return parser
+
+
+class _ProgressReporter:
+    """Reports the progress of a command on stderr."""
+
+    def __init__(self, command: str) -> None:
+        """
+        Initialize the _ProgressReporter.
+
+        Args:
+            command (str): The name of the command, prefixed to each report.
+        """
+        self.command = command
+        # a terminal shows a single updated line, logs get one line per step
+        self._end = "\r" if sys.stderr.isatty() else "\n"
+        self._percent = -1
+
+    def __call__(self, progress: float) -> None:
+        """Report the fraction of pages copied so far, skipping unchanged percentages."""
+        percent = int(progress * 100)
+        if percent != self._percent:
+            self._percent = percent
+            print(
+                f"{self.command}: copying pages {percent:3d}%",
+                end=self._end,
+                file=sys.stderr,
+                flush=True,
+            )
+
+    def finish(self, message: str) -> None:
+        """Report the end of the command."""
+        if self._end == "\r":
+            print(file=sys.stderr)
+        print(f"{self.command}: {message}", file=sys.stderr, flush=True)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Run a headless subcommand.
+
+    Args:
+        argv (list[str], optional): The command line arguments without the program
+            name. Default is `sys.argv[1:]`.
+
+    Returns:
+        int: The exit status, 0 on success.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "merge" and not args.output:
+        parser.error("merge requires an output file (-o OUTPUT)")
+
+    try:
+        if args.command == "info":
+            _info(args)
+            return 0
+
+        table = _build_table(args)
+        if getattr(args, "dry_run", False):
+            return 0
+
+        from .saving import save_full
+
+        reporter = None if args.quiet else _ProgressReporter(args.command)
+        report = save_full(
+            table, args.output or args.file, args.profile, progress=reporter
+        )
+    except (OSError, RuntimeError, ValueError) as error:
+        parser.exit(1, f"{parser.prog}: error: {error}\n")
+
+    if reporter is not None:
+        reporter.finish(str(report))
+    return 0
@@ -0,0 +1,581 @@
+# -*- coding: utf-8 -*-
+from difflib import SequenceMatcher
+from typing import TYPE_CHECKING, Callable, Iterable, Optional
+
+import fitz  # PyMuPDF
+
+from .fingerprint import PageFingerprints, updated_objects
+from .history import Change, History, PageDelta, PagePermutation
+from .pagetable import PageRef, PageTable
+from .settings import HISTORY_MAX_PAGE_REFS, SAVE_DEFAULT_PROFILE
+from .spool import DocumentSpool
+from .workspace import DocumentSession, Workspace
+
+# this module must not import tkinter or any widget module, so the document operations
+# can be used and benchmarked without a display; saving is imported on first use
+if TYPE_CHECKING:
+    from .saving import SaveReport
+
+Listener = Callable[[Change], None]
+
+
+class Editor:
+    """
+    The open documents, the clipboard and the history of an editing session.
+
+    All operations only rearrange page references, see `PageTable`, and are recorded in
+    the history. Every change of a page table, including the ones applied by `undo` and
+    `redo`, is reported to the subscribed listeners as a `PageDelta` or `PagePermutation`
+    after it was applied, so views can follow the documents without knowing which
+    operation changed them. Page numbers are counted from 0.
+    """
+
+    def __init__(self, max_page_refs: int = HISTORY_MAX_PAGE_REFS) -> None:
+        """
+        Initialize the Editor.
+
+        Args:
+            max_page_refs (int, optional): The maximum number of page references kept in
+                the history.
+        """
+        self.workspace = Workspace()
+        # the clipboard is shared by all open documents, its imported pages are
+        # kept in temporary files instead of memory
+        self.clipboard = PageTable()
+        self.clipboard_spool = DocumentSpool()
+        # the versions of files read by `reload`, copied so they can't change under
+        # the pages referring to them
+        self.file_spool = DocumentSpool()
+        # the object hashes of the copies, carried over when a copy is updated
+        self.file_fingerprints = PageFingerprints()
+        # identical pages are stored and rendered only once in the clipboard
+        self.clipboard_fingerprints = PageFingerprints()
+        self.history = History(self._apply, max_page_refs)
+
+        self._listeners: list[Listener] = []
+        # the fingerprints of the pages each file contains, valid as long as the
+        # `saved_refs` of its document are the same list, see `reload`
+        self._file_fingerprints: dict[
+            DocumentSession, tuple[list[PageRef], list[bytes]]
+        ] = {}
+        # the latest copy of each file, updated by the next `reload` if possible, and
+        # the older copies, released as soon as no page refers to them anymore
+        self._latest_copies: dict[DocumentSession, fitz.Document] = {}
+        self._old_copies: list[fitz.Document] = []
+
+    @property
+    def active(self) -> DocumentSession:
+        """The active document, the target of all document operations."""
+        return self.workspace.active
+
+    @property
+    def pages(self) -> PageTable:
+        """The page table of the active document."""
+        return self.workspace.active.pages
+
+    def subscribe(self, listener: Listener) -> None:
+        """
+        Report the changes of all page tables to a listener.
+
+        Args:
+            listener (Callable[[Change], None]): Called with each applied change.
+        """
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Listener) -> None:
+        """
+        Stop reporting changes to a listener.
+
+        Args:
+            listener (Callable[[Change], None]): The subscribed listener.
+        """
+        self._listeners.remove(listener)
+
+    def open(self, file_name: str) -> DocumentSession:
+        """
+        Open a PDF file and make it the active document.
+
+        Args:
+            file_name (str): The path of the file.
+
+        Returns:
+            DocumentSession: The opened document, or the already open document of the file.
+        """
+        session = self.workspace.find(file_name)
+
+        if session is None:
+            session = DocumentSession(fitz.Document(file_name), file_name)
+            self.workspace.add(session)
+        else:
+            self.workspace.active = session
+
+        return session
+
+    def close(self, session: Optional[DocumentSession] = None) -> None:
+        """
+        Close a document and discard its changes.
+
+        Closing the last document also clears the clipboard and the history.
+
+        Args:
+            session (DocumentSession, optional): The document to close. Default is the
+                active document.
+        """
+        session = session or self.workspace.active
+        self.workspace.remove(session)
+        self.history.forget(session.pages)
+        self._file_fingerprints.pop(session, None)
+        if session in self._latest_copies:
+            self._old_copies.append(self._latest_copies.pop(session))
+
+        if not self.workspace:
+            # release the page sources
+            self.clipboard.clear()
+            self.history.clear()
+            self.clipboard_spool.clear()
+            self.clipboard_fingerprints.clear()
+            self.file_spool.clear()
+            self.file_fingerprints.clear()
+            self._old_copies.clear()
+        else:
+            self._release_file_copies()
+
+    def save(self, file_name: str = "", profile: Optional[str] = None) -> "SaveReport":
+        """
+        Save the active document.
+
+        Saving back to the file the document was opened from or last saved to only
+        appends the changes to it if possible, see `save_incremental`.
+
+        Args:
+            file_name (str, optional): The destination file. Default is the file of the
+                document.
+            profile (str, optional): Rewrite the whole file with this save profile instead
+                of updating it incrementally.
+
+        Returns:
+            SaveReport: The report of the save.
+
+        Raises:
+            ValueError: If the document has no file name yet and none is given.
+        """
+        from .saving import save_full, save_incremental
+
+        session = self.workspace.active
+        file_name = file_name or session.file_name
+        if not file_name:
+            raise ValueError("The document has no file name yet")
+
+        if file_name != session.file_name:
+            # the content of another file is unknown, so it has to be rewritten
+            session.saved_refs = []
+            session.file_name = file_name
+
+        report = None
+        if profile is None:
+            report = save_incremental(session.pages, file_name, session.saved_refs)
+        if report is None:
+            report = save_full(
+                session.pages, file_name, profile or SAVE_DEFAULT_PROFILE
+            )
+
+        self.mark_saved(session, session.pages)
+        return report
+
+    def mark_saved(self, session: DocumentSession, refs: Iterable[PageRef]) -> None:
+        """
+        Record the pages the file of a document contains after it was saved.
+
+        The fingerprints of the file kept for `reload` are carried over, so the saved
+        content isn't taken as a change of the file.
+
+        Args:
+            session (DocumentSession): The saved document.
+            refs (Iterable[PageRef]): The references of the saved pages, in order.
+        """
+        session.saved_refs = list(refs)
+
+        saved = self._file_fingerprints.pop(session, None)
+        if saved is not None:
+            known = dict(zip(*saved))
+            fingerprints = PageFingerprints()
+            self._file_fingerprints[session] = (
+                session.saved_refs,
+                [
+                    known.get(ref) or _saved_fingerprint(fingerprints, ref)
+                    for ref in session.saved_refs
+                ],
+            )
+
+    def reload(self, session: Optional[DocumentSession] = None) -> bool:
+        """
+        Update a document to the current content of its file, e.g. after another program
+        has appended pages to it.
+
+        The pages of the file are compared with the pages it contained before by their
+        content, see `PageFingerprints`. Only pages that were changed, added or removed in
+        the file are replaced in the page table, as one step of the history, so unchanged
+        pages keep their references and aren't rendered again. Pages added behind a page
+        follow that page, even if it was moved in the meantime, and unsaved edits of other
+        pages are kept.
+
+        If the file has only been appended to since the last reload, e.g. by a scanner,
+        only the appended bytes are copied and only the pages they change are hashed
+        again, see `DocumentSpool.update_file`.
+
+        Args:
+            session (DocumentSession, optional): The document to reload. Default is the
+                active document.
+
+        Returns:
+            bool: Whether the page table has changed.
+
+        Raises:
+            ValueError: If the document has no file or the file can't be read completely,
+                e.g. because it is still being written.
+        """
+        session = session or self.workspace.active
+        if not session.file_name:
+            raise ValueError("The document has no file to reload")
+
+        # the new version is read from a copy, so it can't change while it is shown
+        fingerprints = self.file_fingerprints
+        previous = self._latest_copies.get(session)
+        update = None
+        if previous is not None:
+            update = self.file_spool.update_file(previous, session.file_name)
+
+        if update is not None:
+            document, appended = update
+            fingerprints.inherit(
+                document, previous, updated_objects(document, appended)
+            )
+        else:
+            document = self.file_spool.spool_file(session.file_name)
+            if document.needs_pass or document.is_repaired:
+                self.file_spool.release(document)
+                raise ValueError(f"{session.file_name} can't be read completely")
+
+        old_fingerprints = self._saved_fingerprints(session, fingerprints)
+        new_fingerprints = [
+            fingerprints.fingerprint(document, page)
+            for page in range(document.page_count)
+        ]
+
+        file_refs, replacements, followers, front = _match_file_pages(
+            session.saved_refs,
+            old_fingerprints,
+            list(PageTable.from_document(document)),
+            new_fingerprints,
+        )
+        session.saved_refs = file_refs
+        self._file_fingerprints[session] = (file_refs, new_fingerprints)
+        if previous is not None:
+            self._old_copies.append(previous)
+        self._latest_copies[session] = document
+
+        refs = list(front)
+        for ref in session.pages:
+            refs.extend(replacements.get(ref, [ref]))
+            refs.extend(followers.pop(ref, []))
+        # pages added behind pages that were removed from the document in the meantime
+        for added in followers.values():
+            refs.extend(added)
+
+        deltas = self._replace_pages(session.pages, refs)
+        if deltas:
+            self._record("reload", *deltas)
+        self._release_file_copies()
+        return bool(deltas)
+
+    def copy(self, page_numbers: Iterable[int]) -> list[PageRef]:
+        """
+        Append pages of the active document to the clipboard.
+
+        Pages with the same content as a page in the clipboard share its reference.
+
+        Args:
+            page_numbers (Iterable[int]): The numbers of the pages to copy.
+
+        Returns:
+            list[PageRef]: The references added to the clipboard.
+        """
+        refs = self.clipboard_fingerprints.canonicalize(
+            self.pages.refs(sorted(page_numbers))
+        )
+        if refs:
+            self._record("copy", self._append_to_clipboard(refs))
+        return refs
+
+    def cut(self, page_numbers: Iterable[int]) -> list[PageRef]:
+        """
+        Move pages of the active document to the end of the clipboard.
+
+        Args:
+            page_numbers (Iterable[int]): The numbers of the pages to cut.
+
+        Returns:
+            list[PageRef]: The references added to the clipboard.
+        """
+        page_numbers = sorted(set(page_numbers))
+        if not page_numbers:
+            return []
+
+        removed = self.pages.delete(page_numbers)
+        deletion = PageDelta.deletion(self.pages, page_numbers, removed)
+        refs = self.clipboard_fingerprints.canonicalize(removed)
+        self._record("cut", deletion, self._append_to_clipboard(refs))
+        return refs
+
+    def paste(self, position: int, refs: Iterable[PageRef]) -> list[PageRef]:
+        """
+        Insert pages into the active document.
+
+        Args:
+            position (int): The number of the page to insert the pages in front of.
+            refs (Iterable[PageRef]): The references of the pages to insert, e.g. taken
+                from the clipboard with `clipboard.refs`.
+
+        Returns:
+            list[PageRef]: The inserted references.
+        """
+        refs = list(refs)
+        if refs:
+            self.pages.insert(position, refs)
+            self._record(
+                "paste",
+                PageDelta.insertion(
+                    self.pages, range(position, position + len(refs)), refs
+                ),
+            )
+        return refs
+
+    def duplicate(
+        self, page_numbers: Iterable[int], deep: bool = False
+    ) -> list[PageRef]:
+        """
+        Duplicate pages of the active document behind the last of them.
+
+        Args:
+            page_numbers (Iterable[int]): The numbers of the pages to duplicate.
+            deep (bool, optional): Whether to save the copies as independent pages instead
+                of sharing the page objects of the duplicated pages. Default is False.
+
+        Returns:
+            list[PageRef]: The inserted copies.
+        """
+        page_numbers = sorted(page_numbers)
+        copies = self.pages.duplicate(page_numbers, deep=deep)
+        if copies:
+            position = max(page_numbers) + 1
+            self._record(
+                "duplicate",
+                PageDelta.insertion(
+                    self.pages, range(position, position + len(copies)), copies
+                ),
+            )
+        return copies
+
+    def delete(self, page_numbers: Iterable[int]) -> list[PageRef]:
+        """
+        Delete pages of the active document.
+
+        Args:
+            page_numbers (Iterable[int]): The numbers of the pages to delete.
+
+        Returns:
+            list[PageRef]: The deleted references.
+        """
+        page_numbers = sorted(set(page_numbers))
+        refs = self.pages.delete(page_numbers)
+        if refs:
+            self._record("delete", PageDelta.deletion(self.pages, page_numbers, refs))
+        return refs
+
+    def move(self, page_numbers: Iterable[int], position: int) -> bool:
+        """
+        Move pages of the active document in front of a position as one permutation.
+
+        Args:
+            page_numbers (Iterable[int]): The numbers of the pages to move, in the desired
+                order.
+            position (int): The number of the page the moved pages are placed in front of,
+                before moving them. Use the page count to move them to the end.
+
+        Returns:
+            bool: Whether the order of the pages has changed.
+        """
+        permutation = PagePermutation.move(self.pages, page_numbers, position)
+        order = permutation.order
+        if order == sorted(order):
+            return False
+
+        self.pages.permute(order)
+        self._record("move", permutation)
+        return True
+
+    def import_pages(self, refs: Iterable[PageRef]) -> list[PageRef]:
+        """
+        Append imported pages to the clipboard as one step.
+
+        Only references to the pages are added, the imported documents stay open as their
+        sources. Documents that only exist in memory, e.g. converted images, are moved to
+        temporary files first.
+
+        Args:
+            refs (Iterable[PageRef]): The references to the imported pages.
+
+        Returns:
+            list[PageRef]: The references added to the clipboard.
+        """
+        refs = self.clipboard_spool.spool_refs(refs)
+        refs = self.clipboard_fingerprints.canonicalize(refs)
+        if refs:
+            self._record("import", self._append_to_clipboard(refs))
+        return refs
+
+    def undo(self) -> None:
+        """Undo the last edit of any document or the clipboard."""
+        self.history.undo()
+
+    def redo(self) -> None:
+        """Redo the last undone edit of any document or the clipboard."""
+        self.history.redo()
+
+    def _append_to_clipboard(self, refs: list[PageRef]) -> PageDelta:
+        """Append references to the clipboard and return the applied delta."""
+        position = len(self.clipboard)
+        self.clipboard.extend(refs)
+        return PageDelta.insertion(
+            self.clipboard, range(position, position + len(refs)), refs
+        )
+
+    def _release_file_copies(self) -> None:
+        """
+        Release the older copies of files no page of a document, the clipboard or the
+        history refers to anymore.
+        """
+        if not self._old_copies:
+            return
+
+        used = {ref.document for ref in self.clipboard}
+        used.update(ref.document for ref in self.history.page_refs())
+        for session in self.workspace:
+            used.update(ref.document for ref in session.pages)
+            used.update(ref.document for ref in session.saved_refs)
+
+        old_copies = self._old_copies
+        self._old_copies = []
+        for document in old_copies:
+            if document in used:
+                self._old_copies.append(document)
+            else:
+                self.file_fingerprints.forget(document)
+                self.file_spool.release(document)
+
+    def _saved_fingerprints(
+        self, session: DocumentSession, fingerprints: PageFingerprints
+    ) -> list[bytes]:
+        """Get the fingerprints of the pages the file of a document contains."""
+        saved_refs, saved_fingerprints = self._file_fingerprints.get(
+            session, (None, [])
+        )
+        if saved_refs is not session.saved_refs:
+            saved_fingerprints = [
+                _saved_fingerprint(fingerprints, ref) for ref in session.saved_refs
+            ]
+        return saved_fingerprints
+
+    @staticmethod
+    def _replace_pages(table: PageTable, refs: list[PageRef]) -> list[PageDelta]:
+        """
+        Change a page table to the given references with as few deletions and insertions
+        as possible and return the applied deltas.
+        """
+        deleted: list[int] = []
+        inserted: list[int] = []
+        matcher = SequenceMatcher(None, list(table), refs, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag != "equal":
+                deleted.extend(range(i1, i2))
+                inserted.extend(range(j1, j2))
+
+        deltas = []
+        if deleted:
+            removed = table.delete(deleted)
+            deltas.append(PageDelta.deletion(table, deleted, removed))
+        if inserted:
+            added = [refs[position] for position in inserted]
+            table.insert_at(inserted, added)
+            deltas.append(PageDelta.insertion(table, inserted, added))
+        return deltas
+
+    def _record(self, action: str, *deltas: Change) -> None:
+        """Record the deltas of an applied edit and report them to the listeners."""
+        self.history.record(action, list(deltas))
+        for delta in deltas:
+            self._notify(delta)
+
+    def _apply(self, delta: Change) -> None:
+        """Apply a delta of the history and report it to the listeners."""
+        delta.apply()
+        self._notify(delta)
+
+    def _notify(self, delta: Change) -> None:
+        """Report an applied delta to all listeners."""
+        for listener in self._listeners:
+            listener(delta)
+
+
+def _saved_fingerprint(fingerprints: PageFingerprints, ref: PageRef) -> bytes:
+    """Get the fingerprint of a page as it is saved, including its rotation."""
+    return fingerprints.fingerprint(ref.document, ref.page, ref.rotation)
+
+
+def _match_file_pages(
+    old_refs: list[PageRef],
+    old_fingerprints: list[bytes],
+    new_refs: list[PageRef],
+    new_fingerprints: list[bytes],
+) -> tuple[
+    list[PageRef],
+    dict[PageRef, list[PageRef]],
+    dict[PageRef, list[PageRef]],
+    list[PageRef],
+]:
+    """
+    Match the pages of two versions of a file by their fingerprints.
+
+    Returns:
+        tuple: The references to the pages of the new version, keeping the old references
+            of unchanged pages, the new pages replacing each changed or removed old page,
+            the new pages added behind each old page, and the new pages added in front of
+            the first page.
+    """
+    file_refs: list[PageRef] = []
+    replacements: dict[PageRef, list[PageRef]] = {}
+    followers: dict[PageRef, list[PageRef]] = {}
+    front: list[PageRef] = []
+
+    matcher = SequenceMatcher(None, old_fingerprints, new_fingerprints, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            file_refs.extend(old_refs[i1:i2])
+            continue
+
+        added = new_refs[j1:j2]
+        file_refs.extend(added)
+
+        if i1 == i2:
+            if i1:
+                followers.setdefault(old_refs[i1 - 1], []).extend(added)
+            else:
+                front.extend(added)
+            continue
+
+        # changed pages are replaced one by one, surplus new pages follow the last one
+        for offset, ref in enumerate(old_refs[i1:i2]):
+            replacements.setdefault(ref, added[offset : offset + 1])
+        followers.setdefault(old_refs[i2 - 1], []).extend(added[i2 - i1 :])
+
+    return file_refs, replacements, followers, front
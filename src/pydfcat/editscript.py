@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+from typing import Any, Callable, Optional, Union
+
+import fitz  # PyMuPDF
+
+from .pageops import is_blank_page, move_order, parse_page_ranges
+from .pagetable import PageRef, PageTable, ref_runs
+from .saving import SaveReport, save_full
+from .settings import SAVE_DEFAULT_PROFILE
+
+# the keys each step accepts, besides "op"
+_STEP_KEYS = {
+    "append": {"source", "pages"},
+    "insert": {"source", "pages", "before", "after"},
+    "select": {"pages"},
+    "delete": {"pages"},
+    "delete_blank": set(),
+    "duplicate": {"pages", "deep"},
+    "move": {"pages", "before", "after"},
+    "rotate": {"pages", "angle"},
+}
+
+
+class EditPlan:
+    """
+    The result of planning an edit script: the pages of the output file, in order.
+
+    Planning only rearranges page references, no page is copied until the plan is
+    written with `write`. The whole script is then carried out by one `insert_pdf` call
+    per run of consecutive source pages and a single `select`, and the output file is
+    written exactly once.
+    """
+
+    def __init__(self, table: PageTable, output: Optional[str] = None) -> None:
+        """
+        Initialize the EditPlan.
+
+        Args:
+            table (PageTable): The pages of the output file.
+            output (str, optional): The output file named by the script.
+        """
+        self.table = table
+        self.output = output
+
+    @property
+    def transfers(self) -> int:
+        """The number of `insert_pdf` calls needed to copy the pages."""
+        return len(ref_runs(dict.fromkeys(ref.original() for ref in self.table)))
+
+    def __str__(self) -> str:
+        """Describe the plan in a single line."""
+        sources = {id(ref.document) for ref in self.table}
+        return (
+            f"{len(self.table)} pages from {len(sources)} files "
+            f"in {self.transfers} transfers"
+        )
+
+    def write(
+        self,
+        output: Optional[str] = None,
+        profile: str = SAVE_DEFAULT_PROFILE,
+        progress: Optional[Callable[[float], None]] = None,
+    ) -> SaveReport:
+        """
+        Write the planned pages to the output file.
+
+        Args:
+            output (str, optional): The output file. Default is the one of the script.
+            profile (str, optional): The save profile. Default is `SAVE_DEFAULT_PROFILE`.
+            progress (Callable[[float], None], optional): Called with the fraction of pages
+                copied so far, see `save_full`.
+
+        Returns:
+            SaveReport: The report of the save.
+
+        Raises:
+            ValueError: If neither the script nor the caller names an output file.
+        """
+        output = output or self.output
+        if not output:
+            raise ValueError("The edit script doesn't name an output file")
+
+        return save_full(self.table, output, profile, progress=progress)
+
+
+class _Planner:
+    """Applies the steps of an edit script to a page table."""
+
+    def __init__(self, sources: dict[str, str], base_dir: str) -> None:
+        """
+        Initialize the _Planner.
+
+        Args:
+            sources (dict[str, str]): The paths of the source files by their names.
+            base_dir (str): The directory relative paths are resolved against.
+        """
+        self.sources = sources
+        self.base_dir = base_dir
+        self.table = PageTable()
+
+        self._documents: dict[str, PageTable] = {}
+
+    def source(self, name: str) -> PageTable:
+        """Get the pages of a source file by its name or path, opening it only once."""
+        path = os.path.join(self.base_dir, self.sources.get(name, name))
+        path = os.path.normpath(path)
+
+        if path not in self._documents:
+            document = fitz.Document(path)
+            if not document.is_pdf:
+                raise ValueError(f"{path} is not a PDF file")
+            if document.needs_pass:
+                raise ValueError(f"{path} is password protected")
+            self._documents[path] = PageTable.from_document(document)
+
+        return self._documents[path]
+
+    def apply(self, step: dict[str, Any]) -> None:
+        """Apply a single step to the page table."""
+        operation = step.get("op")
+        if operation not in _STEP_KEYS:
+            raise ValueError(
+                f"Unknown operation {operation!r}, choose one of {', '.join(_STEP_KEYS)}"
+            )
+
+        unknown = set(step) - _STEP_KEYS[operation] - {"op"}
+        if unknown:
+            raise ValueError(
+                f"Unknown keys for {operation}: {', '.join(sorted(unknown))}"
+            )
+
+        getattr(self, f"_{operation}")(step)
+
+    def _pages(self, step: dict[str, Any], table: PageTable) -> list[int]:
+        """Resolve the page range of a step, all pages if it has none."""
+        pages = step.get("pages")
+        if pages is None:
+            return list(range(len(table)))
+
+        return parse_page_ranges(str(pages), len(table))
+
+    def _position(self, step: dict[str, Any]) -> int:
+        """Resolve the position of a step given by "before" or "after" a page."""
+        if "before" in step and "after" in step:
+            raise ValueError('Use either "before" or "after", not both')
+
+        if "before" in step:
+            position = int(step["before"]) - 1
+        elif "after" in step:
+            position = int(step["after"])
+        else:
+            position = len(self.table)
+
+        if not 0 <= position <= len(self.table):
+            raise ValueError(
+                f"Position {position + 1} is out of range (1-{len(self.table) + 1})"
+            )
+        return position
+
+    def _source_refs(self, step: dict[str, Any]) -> list[PageRef]:
+        """Get the pages of the source file of a step."""
+        if "source" not in step:
+            raise ValueError(f'{step["op"]} requires a "source"')
+
+        source = self.source(step["source"])
+        return source.refs(self._pages(step, source))
+
+    def _append(self, step: dict[str, Any]) -> None:
+        """Append pages of a source file."""
+        self.table.extend(self._source_refs(step))
+
+    def _insert(self, step: dict[str, Any]) -> None:
+        """Insert pages of a source file at a position."""
+        self.table.insert(self._position(step), self._source_refs(step))
+
+    def _select(self, step: dict[str, Any]) -> None:
+        """Keep only the given pages, in the order of the page range."""
+        self.table = PageTable(self.table.refs(self._pages(step, self.table)))
+
+    def _delete(self, step: dict[str, Any]) -> None:
+        """Remove the given pages."""
+        self.table.delete(self._pages(step, self.table))
+
+    def _delete_blank(self, _step: dict[str, Any]) -> None:
+        """Remove all pages without visible content."""
+        self.table.delete(
+            index for index, ref in enumerate(self.table) if is_blank_page(ref.load())
+        )
+
+    def _duplicate(self, step: dict[str, Any]) -> None:
+        """Insert copies of the given pages behind the last of them."""
+        self.table.duplicate(self._pages(step, self.table), deep=bool(step.get("deep")))
+
+    def _move(self, step: dict[str, Any]) -> None:
+        """Move the given pages to a position."""
+        order = move_order(
+            len(self.table), self._pages(step, self.table), self._position(step)
+        )
+        self.table.permute(order)
+
+    def _rotate(self, step: dict[str, Any]) -> None:
+        """Rotate the given pages clockwise."""
+        angle = int(step.get("angle", 90))
+        if angle % 90:
+            raise ValueError(f"The angle must be a multiple of 90, not {angle}")
+
+        rotated = set(self._pages(step, self.table))
+        refs = list(self.table)
+        for index in rotated:
+            ref = refs[index]
+            rotation = ref.load().rotation if ref.rotation is None else ref.rotation
+            refs[index] = ref._replace(rotation=(rotation + angle) % 360)
+
+        self.table = PageTable(refs)
+
+
+def load_script(file_name: str) -> dict[str, Any]:
+    """
+    Read an edit script from a JSON file.
+
+    Args:
+        file_name (str): The path of the JSON file.
+
+    Returns:
+        dict[str, Any]: The edit script, relative paths in it are resolved against the
+            directory of the file.
+    """
+    with open(file_name, encoding="utf-8") as file:
+        script = json.load(file)
+
+    if isinstance(script, dict):
+        script.setdefault("base_dir", os.path.dirname(os.path.abspath(file_name)))
+    return script
+
+
+def plan_script(script: Union[dict[str, Any], list[dict[str, Any]]]) -> EditPlan:
+    """
+    Plan an edit script without copying or writing any page.
+
+    An edit script is either a list of steps or an object like::
+
+        {
+            "sources": {"A": "a.pdf", "B": "b.pdf"},
+            "steps": [
+                {"op": "append", "source": "A", "pages": "3-9"},
+                {"op": "insert", "source": "B", "after": 12},
+                {"op": "delete_blank"}
+            ],
+            "output": "out.pdf"
+        }
+
+    The steps are applied in order to the pages of the output file, which starts empty.
+    "append" and "insert" take "pages" of a "source", given by its name in "sources" or
+    its path. "select", "delete", "duplicate" (optionally "deep"), "move" and "rotate" (by
+    "angle", default 90) act on the "pages" of the output file, resolved when the step is
+    applied. Positions are given "before" or "after" a page, default is the end. Pages are
+    counted from 1, page ranges are written like "1-20,45,100-".
+
+    Args:
+        script (Union[dict[str, Any], list[dict[str, Any]]]): The edit script.
+
+    Returns:
+        EditPlan: The planned output file.
+
+    Raises:
+        ValueError: If a step is invalid or a source file can't be used.
+    """
+    if isinstance(script, list):
+        script = {"steps": script}
+
+    planner = _Planner(script.get("sources", {}), script.get("base_dir", ""))
+    for number, step in enumerate(script.get("steps", []), start=1):
+        if not isinstance(step, dict):
+            raise ValueError(f"Step {number} must be an object, not {step!r}")
+
+        try:
+            planner.apply(step)
+        except (KeyError, TypeError, ValueError, RuntimeError) as error:
+            raise ValueError(f"Step {number} ({step.get('op')}): {error}") from error
+
+    output = script.get("output")
+    if output:
+        output = os.path.join(script.get("base_dir", ""), output)
+    return EditPlan(planner.table, output)
+
+
+def run_script(
+    script: Union[dict[str, Any], list[dict[str, Any]]],
+    output: Optional[str] = None,
+    profile: str = SAVE_DEFAULT_PROFILE,
+    progress: Optional[Callable[[float], None]] = None,
+) -> SaveReport:
+    """
+    Plan an edit script and write the output file exactly once.
+
+    Args:
+        script (Union[dict[str, Any], list[dict[str, Any]]]): The edit script, see
+            `plan_script`.
+        output (str, optional): The output file. Default is the one of the script.
+        profile (str, optional): The save profile. Default is `SAVE_DEFAULT_PROFILE`.
+        progress (Callable[[float], None], optional): Called with the fraction of pages
+            copied so far, see `save_full`.
+
+    Returns:
+        SaveReport: The report of the save.
+
+    Raises:
+        ValueError: If the script is invalid or doesn't name an output file.
+    """
+    return plan_script(script).write(output, profile, progress)
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Iterable, Optional, Sequence
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from .pagetable import PageRef
+from .settings import (
+    CONVERTIBLE_EXTENSIONS,
+    IMAGE_EXTENSIONS,
+    IMPORT_CHUNK_FILES,
+    JPEG_EXTENSIONS,
+    WORKER_START_METHOD,
+)
+
+
+def _extension(file_name: str) -> str:
+    """Get the lowercase extension of a file name without the dot."""
+    return os.path.splitext(file_name)[1].lower().lstrip(".")
+
+
+def is_convertible(file_name: str) -> bool:
+    """
+    Check whether a file can be converted to PDF pages.
+
+    Args:
+        file_name (str): The path of the file.
+
+    Returns:
+        bool: True if the file is an image or a document format `fitz` can open.
+    """
+    extension = _extension(file_name)
+    return extension in IMAGE_EXTENSIONS or extension in CONVERTIBLE_EXTENSIONS
+
+
+def convertible_files(folder: str) -> list[str]:
+    """
+    List the files of a folder that can be converted to PDF pages.
+
+    Args:
+        folder (str): The path of the folder.
+
+    Returns:
+        list[str]: The paths of the convertible files, sorted by name.
+    """
+    return [
+        os.path.join(folder, name)
+        for name in sorted(os.listdir(folder))
+        if is_convertible(name) and os.path.isfile(os.path.join(folder, name))
+    ]
+
+
+def convert_to_pdf(file_name: str) -> bytes:
+    """
+    Convert an image or document file to a PDF.
+
+    JPEG files are embedded as they are, without decoding and re-encoding them. All other
+    formats are converted by `fitz.Document.convert_to_pdf`.
+
+    Args:
+        file_name (str): The path of the file.
+
+    Returns:
+        bytes: The converted PDF.
+    """
+    if _extension(file_name) in JPEG_EXTENSIONS:
+        return _jpeg_to_pdf(file_name)
+
+    with fitz.Document(file_name) as document:
+        return document.convert_to_pdf()
+
+
+def _jpeg_to_pdf(file_name: str) -> bytes:
+    """Embed a JPEG file as a single page, using its resolution for the page size."""
+    with open(file_name, "rb") as file:
+        data = file.read()
+
+    # only the header is read to get the size
+    with Image.open(file_name) as image:
+        width, height = image.size
+        x_dpi, y_dpi = image.info.get("dpi", (72, 72))
+
+    with fitz.Document() as document:
+        page = document.new_page(
+            width=width * 72 / (x_dpi or 72), height=height * 72 / (y_dpi or 72)
+        )
+        page.insert_image(page.rect, stream=data)
+        return document.tobytes()
+
+
+def validate_pdf(file_name: str) -> Optional[bytes]:
+    """
+    Check that a PDF file can be imported.
+
+    Args:
+        file_name (str): The path of the PDF file.
+
+    Returns:
+        Optional[bytes]: None if the file can be opened as it is, or the repaired PDF if
+            the file is damaged, so it doesn't have to be repaired again.
+
+    Raises:
+        ValueError: If the file isn't a PDF, is encrypted or has no pages.
+    """
+    with fitz.Document(file_name) as document:
+        if not document.is_pdf:
+            raise ValueError("not a PDF file")
+        if document.needs_pass:
+            raise ValueError("the file is password protected")
+        if not document.page_count:
+            raise ValueError("the file has no pages")
+
+        return document.tobytes() if document.is_repaired else None
+
+
+def _prepare_in_worker(file_name: str) -> Optional[bytes]:
+    """Validate or convert a file in a worker process, with errors that can be sent back."""
+    try:
+        if _extension(file_name) == "pdf":
+            return validate_pdf(file_name)
+        return convert_to_pdf(file_name)
+    except Exception as error:  # pylint: disable=broad-except
+        # exceptions of PyMuPDF may not be picklable
+        raise RuntimeError(str(error)) from None
+
+
+class ImportJob:
+    """
+    Open PDF files and convert other files to PDF pages without blocking the caller.
+
+    The job is advanced by repeatedly calling `step`, e.g. from the event loop of the GUI.
+    All files are validated or converted in parallel worker processes. PDF files stay open
+    as the source of their pages, the converted pages of all other files are collected
+    into `document`. The references to all imported pages are listed in `refs`, in the
+    order of the files. Files that can't be imported are skipped and listed in `failed`.
+
+    The workers are started with "forkserver", or "spawn" where it isn't available, since
+    forking the GUI process would copy the locks of its other threads, e.g. of the
+    clipboard broker, in whatever state they are.
+    """
+
+    def __init__(
+        self, file_names: Iterable[str], workers: Optional[int] = None
+    ) -> None:
+        """
+        Initialize the ImportJob.
+
+        Args:
+            file_names (Iterable[str]): The paths of the files to import, in order.
+            workers (int, optional): The number of worker processes. Default is the
+                number of CPUs.
+        """
+        self.file_names = list(file_names)
+        self.workers = workers
+        self.document = fitz.Document()
+        self.refs: list[PageRef] = []
+        self.progress = 0.0
+        self.failed: list[tuple[str, str]] = []
+        self.cancelled = False
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._futures: Sequence[Future] = []
+        self._collected = 0
+
+    def step(self) -> bool:
+        """
+        Collect the next files prepared so far, in order.
+
+        Returns:
+            bool: True if all files have been imported or skipped, or the job has been
+                cancelled.
+        """
+        if self.cancelled:
+            return True
+
+        if self._executor is None:
+            self._start()
+
+        for _ in range(IMPORT_CHUNK_FILES):
+            if self._collected == len(self._futures):
+                break
+
+            future = self._futures[self._collected]
+            if not future.done():
+                return False
+
+            file_name = self.file_names[self._collected]
+            try:
+                self._collect(file_name, future.result())
+            except Exception as error:  # pylint: disable=broad-except
+                self.failed.append((file_name, str(error)))
+
+            self._collected += 1
+            self.progress = self._collected / len(self._futures)
+
+        if self._collected < len(self._futures):
+            return False
+
+        self._executor.shutdown()
+        return True
+
+    def cancel(self) -> None:
+        """Stop importing the files, the already collected pages are kept."""
+        self.cancelled = True
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _start(self) -> None:
+        """Hand all files to the worker processes."""
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(WORKER_START_METHOD),
+        )
+        self._futures = [
+            self._executor.submit(_prepare_in_worker, file_name)
+            for file_name in self.file_names
+        ]
+
+    def _collect(self, file_name: str, data: Optional[bytes]) -> None:
+        """Add the pages of a validated or converted file."""
+        if _extension(file_name) == "pdf":
+            source = (
+                fitz.Document(file_name) if data is None else fitz.Document(stream=data)
+            )
+            self.refs.extend(PageRef(source, page) for page in range(source.page_count))
+            return
+
+        first_page = self.document.page_count
+        with fitz.Document(stream=data) as pages:
+            self.document.insert_pdf(pages)
+
+        self.refs.extend(
+            PageRef(self.document, page)
+            for page in range(first_page, self.document.page_count)
+        )
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+import time
+from typing import Optional
+
+from .settings import WATCH_SETTLE_TIME
+
+# inotify(7) flags, from <sys/inotify.h>
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+_IN_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+# the fixed part of struct inotify_event: wd, mask, cookie, len
+_EVENT = struct.Struct("iIII")
+
+FileState = tuple[int, int, int]
+
+
+class _Inotify:
+    """The inotify events of the files in a directory, read without blocking."""
+
+    def __init__(self, directory: str) -> None:
+        """
+        Initialize the _Inotify.
+
+        Args:
+            directory (str): The directory to watch.
+
+        Raises:
+            OSError: If inotify isn't available.
+        """
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        # the directory is watched, so files replaced by a rename are noticed as well
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), _IN_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"Can't watch {directory}")
+
+    def names(self) -> set[str]:
+        """Get the names of the files changed since the last call."""
+        names = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return names
+
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                name = data[offset : offset + length].rstrip(b"\0")
+                names.add(os.fsdecode(name))
+                offset += length
+
+    def close(self) -> None:
+        """Stop watching and release the file descriptor."""
+        os.close(self._fd)
+
+
+class FileWatcher:
+    """
+    Notices when a file has been changed on disk.
+
+    On Linux the directory of the file is watched with inotify, so the file is only
+    examined after it was written to. Elsewhere, or if inotify isn't available, the
+    modification time and size of the file are compared on every `poll`.
+
+    A change is only reported once the file hasn't changed for `settle_time` seconds, so
+    a file that is still being written, e.g. by a scanner appending pages, is reported
+    once it is complete.
+    """
+
+    def __init__(self, file_name: str, settle_time: float = WATCH_SETTLE_TIME) -> None:
+        """
+        Initialize the FileWatcher.
+
+        Args:
+            file_name (str): The file to watch.
+            settle_time (float, optional): The seconds the file has to stay unchanged
+                before the change is reported.
+        """
+        self.file_name = os.path.abspath(file_name)
+        self.settle_time = settle_time
+
+        self._state = _file_state(self.file_name)
+        # the changed state of the file and when it was first seen
+        self._pending: Optional[FileState] = None
+        self._pending_since = 0.0
+
+        self._inotify: Optional[_Inotify] = None
+        if sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify(os.path.dirname(self.file_name))
+            except (OSError, AttributeError):
+                # e.g. the limit of watches is reached, fall back to polling
+                self._inotify = None
+
+    @property
+    def uses_inotify(self) -> bool:
+        """Whether changes are noticed with inotify instead of polling."""
+        return self._inotify is not None
+
+    def poll(self) -> bool:
+        """
+        Check whether the file has changed since the last reported change.
+
+        Returns:
+            bool: True once per change, after the file has settled.
+        """
+        if (
+            self._inotify is not None
+            and os.path.basename(self.file_name) not in self._inotify.names()
+            and self._pending is None
+        ):
+            return False
+
+        state = _file_state(self.file_name)
+        now = time.monotonic()
+
+        if state is None or state == self._state:
+            # the file is missing or was restored, e.g. while it is being replaced
+            self._pending = None
+            return False
+
+        if state != self._pending:
+            self._pending = state
+            self._pending_since = now
+            return False
+
+        if now - self._pending_since < self.settle_time:
+            return False
+
+        self._state = state
+        self._pending = None
+        return True
+
+    def ignore_changes(self) -> None:
+        """Take the current content of the file as unchanged, e.g. after saving it."""
+        self._state = _file_state(self.file_name)
+        self._pending = None
+
+    def close(self) -> None:
+        """Stop watching the file."""
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+
+def _file_state(file_name: str) -> Optional[FileState]:
+    """Get the inode, size and modification time of a file, None if it doesn't exist."""
+    try:
+        stat = os.stat(file_name)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_size, stat.st_mtime_ns
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+import hashlib
+import re
+from typing import Iterable, Optional
+
+import fitz  # PyMuPDF
+
+from .pagetable import PageRef
+
+# an indirect reference like "12 0 R"
+_REFERENCE = re.compile(r"(\d+) (\d+) R")
+# references leading back to the page tree, which don't belong to the page content
+_BACK_REFERENCE = re.compile(r"/(Parent|P) \d+ \d+ R")
+# stream keys describing how a stream is encoded, which changes whenever a file is saved
+# with other compression options
+_ENCODING_KEYS = re.compile(
+    r"/(Length|DL)\b\s*(\d+ \d+ R|\d+)"
+    r"|/Filter\s*(/[^\s/\[\]<>()]+|\[[^\]]*\])"
+    r"|/DecodeParms\s*(<<[^<>]*>>|\[[^\]]*\]|null)"
+)
+# lossy image codecs, saving never re-encodes them, so their streams are compared as
+# stored instead of decoding every pixel
+_IMAGE_FILTERS = ("DCTDecode", "JPXDecode", "JBIG2Decode", "CCITTFaxDecode")
+# an object definition like "12 0 obj"
+_OBJECT = re.compile(rb"(\d+)\s+\d+\s+obj\b")
+
+
+class PageFingerprints:
+    """
+    Identifies pages with the same content, also across different documents.
+
+    A fingerprint hashes the content streams, resources and annotations of a page,
+    including the objects they refer to, like fonts and images. Object numbers are replaced by
+    the hashes of the objects, so the fingerprint doesn't depend on the document the page
+    is stored in. Streams are hashed decoded, so saving a file with other compression
+    options doesn't change its fingerprints. The hashes of shared objects are computed
+    only once per document, and can be carried over to an incrementally updated version
+    of the document, see `inherit`.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the PageFingerprints."""
+        self._objects: dict[fitz.Document, dict[int, bytes]] = {}
+        # the objects each hashed object refers to, to find the hashes an update changes
+        self._references: dict[fitz.Document, dict[int, set[int]]] = {}
+        self._pages: dict[bytes, PageRef] = {}
+
+    def fingerprint(
+        self, document: fitz.Document, page: int, rotation: Optional[int] = None
+    ) -> bytes:
+        """
+        Get the fingerprint of a page.
+
+        Args:
+            document (fitz.Document): The document of the page.
+            page (int): The number of the page.
+            rotation (int, optional): The rotation the page is saved with, e.g. the one
+                of a `PageRef`. Default is the rotation of the page.
+
+        Returns:
+            bytes: The fingerprint of the page.
+        """
+        digests = self._objects.setdefault(document, {})
+        loaded_page = document[page]
+
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(
+            f"{tuple(loaded_page.mediabox)} {tuple(loaded_page.cropbox)} "
+            f"{loaded_page.rotation if rotation is None else rotation}".encode()
+        )
+
+        for xref in loaded_page.get_contents():
+            digest.update(self._object_digest(document, xref, digests))
+
+        kind, resources = document.xref_get_key(loaded_page.xref, "Resources")
+        if kind == "null":
+            # inherited resources are only compared within the same document
+            digest.update(str(id(document)).encode())
+        digest.update(self._resolve(document, resources, digests).encode())
+
+        # pages only differing in their links or form fields are different pages
+        _, annotations = document.xref_get_key(loaded_page.xref, "Annots")
+        digest.update(self._resolve(document, annotations, digests).encode())
+
+        return digest.digest()
+
+    def canonical(self, ref: PageRef) -> PageRef:
+        """
+        Get the reference to the first seen page with the same content.
+
+        Args:
+            ref (PageRef): The page reference.
+
+        Returns:
+            PageRef: A reference to the same content, keeping the rotation and copy number
+                of the given reference.
+        """
+        original = self._pages.setdefault(self.fingerprint(ref.document, ref.page), ref)
+        return ref._replace(document=original.document, page=original.page)
+
+    def canonicalize(self, refs: Iterable[PageRef]) -> list[PageRef]:
+        """
+        Replace page references by references to the first seen page with the same content.
+
+        Equal references share one page object when saving and one rendered image, so
+        pages with the same content are stored and rendered only once.
+
+        Args:
+            refs (Iterable[PageRef]): The page references.
+
+        Returns:
+            list[PageRef]: The canonical references, see `canonical`.
+        """
+        return [self.canonical(ref) for ref in refs]
+
+    def inherit(
+        self, document: fitz.Document, previous: fitz.Document, updated: set[int]
+    ) -> None:
+        """
+        Carry the object hashes of a document over to an updated version of it.
+
+        The hashes of the updated objects and of all objects referring to them, directly
+        or indirectly, are dropped, the others are moved to the new version.
+
+        Args:
+            document (fitz.Document): The updated version of the document.
+            previous (fitz.Document): The previous version of the document.
+            updated (set[int]): The numbers of the objects added or replaced by the
+                update, see `updated_objects`.
+        """
+        digests = self._objects.pop(previous, {})
+        references = self._references.pop(previous, {})
+
+        referrers: dict[int, list[int]] = {}
+        for xref, referred in references.items():
+            for target in referred:
+                referrers.setdefault(target, []).append(xref)
+
+        changed = set(updated)
+        pending = list(changed)
+        while pending:
+            for xref in referrers.get(pending.pop(), ()):
+                if xref not in changed:
+                    changed.add(xref)
+                    pending.append(xref)
+
+        for xref in changed:
+            digests.pop(xref, None)
+            references.pop(xref, None)
+        self._objects[document] = digests
+        self._references[document] = references
+
+    def forget(self, document: fitz.Document) -> None:
+        """
+        Forget the object hashes of a document, e.g. before it is closed.
+
+        Args:
+            document (fitz.Document): The document.
+        """
+        self._objects.pop(document, None)
+        self._references.pop(document, None)
+
+    def clear(self) -> None:
+        """Forget all fingerprints and release the documents."""
+        self._objects.clear()
+        self._references.clear()
+        self._pages.clear()
+
+    def _resolve(
+        self, document: fitz.Document, source: str, digests: dict[int, bytes]
+    ) -> str:
+        """Replace the indirect references in an object source by the object hashes."""
+        return _REFERENCE.sub(
+            lambda match: self._object_digest(document, int(match[1]), digests).hex(),
+            _BACK_REFERENCE.sub("", source),
+        )
+
+    def _object_digest(
+        self, document: fitz.Document, xref: int, digests: dict[int, bytes]
+    ) -> bytes:
+        """Hash an object, its stream and the objects it refers to."""
+        if xref in digests:
+            return digests[xref]
+
+        # breaks reference cycles, e.g. between annotations
+        digests[xref] = b""
+
+        source = _BACK_REFERENCE.sub("", document.xref_object(xref, compressed=True))
+        is_stream = document.xref_is_stream(xref)
+        if is_stream:
+            source = _ENCODING_KEYS.sub("", source)
+
+        self._references.setdefault(document, {})[xref] = {
+            int(match[1]) for match in _REFERENCE.finditer(source)
+        }
+        digest = hashlib.blake2b(
+            self._resolve(document, source, digests).encode(), digest_size=16
+        )
+        if is_stream:
+            digest.update(_stream_content(document, xref))
+
+        digests[xref] = digest.digest()
+        return digests[xref]
+
+
+def updated_objects(document: fitz.Document, update: bytes) -> set[int]:
+    """
+    Find the objects an incremental update of a PDF file adds or replaces.
+
+    Bytes of stream data that happen to look like an object definition are taken as
+    objects as well, which only costs hashing them again.
+
+    Args:
+        document (fitz.Document): The document opened from the updated file.
+        update (bytes): The bytes appended to the file by the update.
+
+    Returns:
+        set[int]: The numbers of the objects, including the ones stored in object streams.
+    """
+    xrefs = {int(match[1]) for match in _OBJECT.finditer(update)}
+    xref_count = document.xref_length()
+
+    for xref in list(xrefs):
+        if not 0 < xref < xref_count:
+            continue
+        if document.xref_get_key(xref, "Type") != ("name", "/ObjStm"):
+            continue
+        kind, count = document.xref_get_key(xref, "N")
+        if kind != "int":
+            continue
+        # an object stream starts with pairs of object numbers and offsets
+        pairs = 2 * int(count)
+        header = (document.xref_stream(xref) or b"").split(maxsplit=pairs)
+        xrefs.update(int(number) for number in header[:pairs:2])
+
+    return xrefs
+
+
+def _stream_content(document: fitz.Document, xref: int) -> bytes:
+    """Get the content of a stream independent of its compression."""
+    _, filters = document.xref_get_key(xref, "Filter")
+    if any(name in filters for name in _IMAGE_FILTERS):
+        return document.xref_stream_raw(xref) or b""
+    return document.xref_stream(xref) or b""
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+import itertools
+import time
+from collections import deque
+from typing import Callable, Iterable, Iterator, NamedTuple, Sequence, Union
+
+from .pageops import inverse_order, move_order
+from .pagetable import PageRef, PageTable
+from .settings import HISTORY_COALESCE_TIME, HISTORY_MAX_PAGE_REFS
+
+
+class PageDelta(NamedTuple):
+    """
+    A compact change of a page table.
+
+    The delta stores the positions and references of the inserted or removed pages, never
+    their content, so it can be applied and inverted in time proportional to its size.
+    """
+
+    table: PageTable
+    positions: tuple[int, ...]
+    refs: tuple[PageRef, ...]
+    inserted: bool
+
+    @classmethod
+    def insertion(
+        cls, table: PageTable, positions: Sequence[int], refs: list[PageRef]
+    ) -> "PageDelta":
+        """Create a delta for references inserted at the given (ascending) positions."""
+        return cls(table, tuple(positions), tuple(refs), True)
+
+    @classmethod
+    def deletion(
+        cls, table: PageTable, positions: Sequence[int], refs: list[PageRef]
+    ) -> "PageDelta":
+        """Create a delta for references removed from the given (ascending) positions."""
+        return cls(table, tuple(positions), tuple(refs), False)
+
+    @property
+    def size(self) -> int:
+        """The number of page references the delta keeps."""
+        return len(self.refs)
+
+    def inverse(self) -> "PageDelta":
+        """Return the delta reverting this delta."""
+        return self._replace(inserted=not self.inserted)
+
+    def apply(self) -> None:
+        """Apply the delta to its page table."""
+        if self.inserted:
+            self.table.insert_at(self.positions, self.refs)
+        else:
+            self.table.delete(self.positions)
+
+
+class PagePermutation(NamedTuple):
+    """
+    A rearrangement of the pages of a page table by moving some of them.
+
+    Only the indices of the moved pages and their target position are stored, never
+    page references, and the order of all pages is derived from them with `move_order`
+    when the permutation is applied. Moving a page within a large table therefore keeps
+    one index.
+    """
+
+    table: PageTable
+    pages: tuple[int, ...]
+    position: int
+    inverted: bool = False
+
+    @classmethod
+    def move(
+        cls, table: PageTable, pages: Iterable[int], position: int
+    ) -> "PagePermutation":
+        """Create a permutation moving pages (in the given order) in front of a position."""
+        return cls(table, tuple(dict.fromkeys(pages)), position)
+
+    @property
+    def size(self) -> int:
+        """The number of indices the permutation keeps."""
+        return len(self.pages)
+
+    @property
+    def order(self) -> list[int]:
+        """The old index of each page in the new order, computed in O(n)."""
+        order = move_order(len(self.table), self.pages, self.position)
+        return inverse_order(order) if self.inverted else order
+
+    def inverse(self) -> "PagePermutation":
+        """Return the permutation restoring the previous order."""
+        return self._replace(inverted=not self.inverted)
+
+    def apply(self) -> None:
+        """Rearrange the page table."""
+        self.table.permute(self.order)
+
+
+Change = Union[PageDelta, PagePermutation]
+
+
+class _Step(NamedTuple):
+    """A journal entry of one (or several coalesced) user actions."""
+
+    action: str
+    deltas: list[Change]
+    timestamp: float
+
+
+class History:
+    """
+    Command journal for undoing and redoing page table edits.
+
+    Each action is recorded as a list of `PageDelta` or `PagePermutation` objects. The
+    journal is capped by the total number of page references it keeps, dropping the oldest
+    steps first, and rapid repetitions of the same action are coalesced into a single step.
+    """
+
+    def __init__(
+        self,
+        apply_command: Callable[[Change], None],
+        max_page_refs: int = HISTORY_MAX_PAGE_REFS,
+        coalesce_time: float = HISTORY_COALESCE_TIME,
+    ) -> None:
+        """
+        Initialize the History.
+
+        Args:
+            apply_command (Callable[[Change], None]):
+                A function applying a change to its page table and updating the views.
+            max_page_refs (int, optional):
+                The maximum number of page references kept in the journal.
+            coalesce_time (float, optional):
+                The time in seconds in which repetitions of an action are coalesced.
+        """
+        self._apply = apply_command
+        self.max_page_refs = max_page_refs
+        self.coalesce_time = coalesce_time
+
+        self._undo_steps: deque[_Step] = deque()
+        self._redo_steps: list[_Step] = []
+        self._page_refs = 0
+
+    @property
+    def can_undo(self) -> bool:
+        """Whether there is a step to undo."""
+        return bool(self._undo_steps)
+
+    @property
+    def can_redo(self) -> bool:
+        """Whether there is a step to redo."""
+        return bool(self._redo_steps)
+
+    def record(self, action: str, deltas: list[Change]) -> None:
+        """
+        Record the deltas of an already applied action.
+
+        Args:
+            action (str): The name of the action, e.g. "cut" or "delete".
+            deltas (list[Change]): The changes the action applied, in order.
+        """
+        if not deltas:
+            return
+
+        now = time.monotonic()
+        self._discard_redo_steps()
+
+        last_step = self._undo_steps[-1] if self._undo_steps else None
+        if (
+            last_step is not None
+            and last_step.action == action
+            and now - last_step.timestamp <= self.coalesce_time
+        ):
+            last_step.deltas.extend(deltas)
+            self._undo_steps[-1] = last_step._replace(timestamp=now)
+        else:
+            self._undo_steps.append(_Step(action, list(deltas), now))
+
+        self._page_refs += _count_refs(deltas)
+        self._enforce_limit()
+
+    def undo(self) -> None:
+        """Revert the last recorded step."""
+        if not self._undo_steps:
+            return
+
+        step = self._undo_steps.pop()
+        for delta in reversed(step.deltas):
+            self._apply(delta.inverse())
+
+        self._redo_steps.append(step)
+
+        # the next action must not be coalesced with a step before the reverted one
+        if self._undo_steps:
+            self._undo_steps[-1] = self._undo_steps[-1]._replace(
+                timestamp=float("-inf")
+            )
+
+    def redo(self) -> None:
+        """Reapply the last reverted step."""
+        if not self._redo_steps:
+            return
+
+        step = self._redo_steps.pop()
+        for delta in step.deltas:
+            self._apply(delta)
+
+        # a redone step must not be coalesced with the next action
+        self._undo_steps.append(step._replace(timestamp=float("-inf")))
+
+    def forget(self, table: PageTable) -> None:
+        """
+        Remove the steps changing a page table, e.g. of a closed document.
+
+        Later steps may depend on the positions an earlier step left behind, so the last
+        step changing the table is dropped together with all steps before it, and the
+        steps that can be redone are dropped if any of them changes the table.
+
+        Args:
+            table (PageTable): The page table to forget.
+        """
+        for index in range(len(self._undo_steps) - 1, -1, -1):
+            if _changes(self._undo_steps[index], table):
+                for _ in range(index + 1):
+                    step = self._undo_steps.popleft()
+                    self._page_refs -= _count_refs(step.deltas)
+                break
+
+        if any(_changes(step, table) for step in self._redo_steps):
+            self._discard_redo_steps()
+
+    def page_refs(self) -> Iterator[PageRef]:
+        """
+        Iterate over the page references the journal keeps, e.g. to find out which
+        documents are still needed to undo or redo a step.
+
+        Yields:
+            PageRef: The references of the recorded deltas, possibly repeated.
+        """
+        for step in itertools.chain(self._undo_steps, self._redo_steps):
+            for delta in step.deltas:
+                if isinstance(delta, PageDelta):
+                    yield from delta.refs
+
+    def clear(self) -> None:
+        """Remove all steps from the journal."""
+        self._undo_steps.clear()
+        self._redo_steps.clear()
+        self._page_refs = 0
+
+    def _discard_redo_steps(self) -> None:
+        """Drop the steps that can no longer be redone after a new action."""
+        for step in self._redo_steps:
+            self._page_refs -= _count_refs(step.deltas)
+        self._redo_steps.clear()
+
+    def _enforce_limit(self) -> None:
+        """Drop the oldest steps until the journal fits into its memory cap."""
+        while self._page_refs > self.max_page_refs and len(self._undo_steps) > 1:
+            step = self._undo_steps.popleft()
+            self._page_refs -= _count_refs(step.deltas)
+
+
+def _changes(step: _Step, table: PageTable) -> bool:
+    """Check whether a step changes the given page table."""
+    return any(delta.table is table for delta in step.deltas)
+
+
+def _count_refs(deltas: list[Change]) -> int:
+    """Count the page references (or indices) stored in a list of changes."""
+    return sum(delta.size for delta in deltas)
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+import os
+from typing import NamedTuple, Optional
+
+import customtkinter as ctk
+from PIL import Image, ImageTk
+
+from .settings import (
+    CLIPB_TOOLBAR_IMAGE_HEIGHT,
+    CLIPB_TOOLBAR_IMAGE_WIDTH,
+    DIRNAME,
+    TOOLBAR_IMAGE_HEIGHT,
+    TOOLBAR_IMAGE_WIDTH,
+)
+
+
+class ButtonIcons(NamedTuple):
+    """The images of a tool button in its states."""
+
+    outline: ctk.CTkImage
+    solid: ctk.CTkImage
+    # None for buttons that are hidden instead of disabled, like the close button
+    disabled: Optional[ctk.CTkImage]
+
+
+class IconCache:
+    """
+    The decoded icons of one folder of tool icons, drawn at one size.
+
+    Every icon file is read and decoded only once, and all buttons of a type share the
+    same images. A `CTkImage` keeps the photo images it has drawn for each scaling, so
+    enabling and disabling a button only swaps images that already exist.
+    """
+
+    def __init__(self, folder: str, size: tuple[int, int]) -> None:
+        """
+        Initialize the IconCache.
+
+        Args:
+            folder (str): The folder of the icons, relative to the assets.
+            size (tuple[int, int]): The width and height the icons are shown at.
+        """
+        self.folder = folder
+        self.size = size
+
+        self._images: dict[tuple[str, str], Image.Image] = {}
+        self._buttons: dict[str, ButtonIcons] = {}
+        self._photos: dict[tuple[str, str], ImageTk.PhotoImage] = {}
+
+    def button(self, name: str) -> ButtonIcons:
+        """
+        Get the images of a button, loading them on first use.
+
+        Args:
+            name (str): The type of the button, e.g. "open".
+
+        Returns:
+            ButtonIcons: The outline, solid and, if the button has one, disabled images
+                of the button.
+        """
+        icons = self._buttons.get(name)
+        if icons is None:
+            outline = self._image(name, "outline")
+            solid = self._image(name, "solid")
+            disabled = None
+            if os.path.isfile(self._path(name, "disabled-light")):
+                disabled = ctk.CTkImage(
+                    self._image(name, "disabled-light"),
+                    self._image(name, "disabled-dark"),
+                    size=self.size,
+                )
+
+            icons = self._buttons[name] = ButtonIcons(
+                ctk.CTkImage(outline, outline, size=self.size),
+                ctk.CTkImage(solid, solid, size=self.size),
+                disabled,
+            )
+        return icons
+
+    def photo(self, name: str, variant: str) -> ImageTk.PhotoImage:
+        """
+        Get an icon as a photo image of the icon size, for widgets that can't show a
+        `CTkImage`. Requires the main window to exist.
+
+        Args:
+            name (str): The type of the button, e.g. "save".
+            variant (str): One of "outline", "solid", "disabled-light" and
+                "disabled-dark".
+
+        Returns:
+            ImageTk.PhotoImage: The resized icon.
+        """
+        photo = self._photos.get((name, variant))
+        if photo is None:
+            photo = ImageTk.PhotoImage(self._image(name, variant).resize(self.size))
+            self._photos[name, variant] = photo
+        return photo
+
+    def _path(self, name: str, variant: str) -> str:
+        """Get the path of an icon file."""
+        return os.path.join(
+            DIRNAME, "assets", self.folder, name, f"{name}-{variant}.png"
+        )
+
+    def _image(self, name: str, variant: str) -> Image.Image:
+        """Read and decode an icon file once."""
+        image = self._images.get((name, variant))
+        if image is None:
+            with Image.open(self._path(name, variant)) as file:
+                image = self._images[name, variant] = file.convert("RGBA")
+        return image
+
+
+TOOLBAR_ICONS = IconCache("toolbar_icons", (TOOLBAR_IMAGE_WIDTH, TOOLBAR_IMAGE_HEIGHT))
+CLIPBOARD_ICONS = IconCache(
+    "clipboard_icons", (CLIPB_TOOLBAR_IMAGE_WIDTH, CLIPB_TOOLBAR_IMAGE_HEIGHT)
+)
@@ -1,15 +1,21 @@
 # -*- coding: utf-8 -*-
+import math
+import tkinter as tk
 from typing import Any, Callable
 
 import customtkinter as ctk
 import fitz  # PyMuPDF
+from CTkMessagebox import CTkMessagebox
 from PIL import Image
 
+from .pageops import parse_page_ranges
 from .settings import (
     COLOR_SELECTED_BLUE,
     IMPORT_WINDOW_HEIGHT_RATIO,
     PAGE_IPADDING,
     PAGE_X_PADDING,
+    PAGE_Y_PADDING,
+    PREVIEW_ROW_MARGIN,
     TOOLBAR_HEIGHT,
     TOOLBAR_WIDGET_BORDER_SPACING,
     TOOLBAR_WIDGET_HEIGHT,
@@ -28,7 +34,8 @@ class ImportWindow(ctk.CTkToplevel):
 
         Args:
             parent (Any): The parent widget.
-            proceed_command (Callable): A function to execute when the "ok" button is clicked.
+            proceed_command (Callable): A function receiving the document and the numbers of
+                the selected pages when the "ok" button is clicked.
             on_closing (Callable): A function to execute when the window is closed.
         """
         super().__init__(master=parent)
@@ -70,8 +77,23 @@ class ImportWindow(ctk.CTkToplevel):
             pady=TOOLBAR_Y_PADDING,
         )
 
+        # page range expression, used instead of the selection if given
+        self.range_entry = ctk.CTkEntry(
+            self.ui_frame,
+            height=TOOLBAR_WIDGET_HEIGHT,
+            placeholder_text="pages, e.g. 1-20,45,100-",
+        )
+        self.range_entry.pack(
+            side="left",
+            fill="both",
+            expand=True,
+            padx=TOOLBAR_X_PADDING,
+            pady=TOOLBAR_Y_PADDING,
+        )
+
         # events
         self.protocol("WM_DELETE_WINDOW", self.close)
+        self.range_entry.bind("<Return>", lambda _: self.proceed())
 
     def load_pages(self, document: fitz.Document) -> None:
         """
@@ -87,10 +109,26 @@ class ImportWindow(ctk.CTkToplevel):
         self.bind("<Configure>", lambda _: self.page_view.update_view())
 
     def proceed(self):
-        """Process the selected pages and execute the proceed command."""
-        selection = sorted(self.page_view.selected_pages)
-        self.document.select(selection)
-        self.proceed_command(self.document)
+        """
+        Process the selected pages and execute the proceed command.
+
+        A page range expression takes precedence over the pages selected in the preview.
+        It is resolved against the page count only, so no page has to be rendered.
+        """
+        expression = self.range_entry.get().strip()
+
+        if expression:
+            try:
+                page_numbers = parse_page_ranges(expression, self.document.page_count)
+            except ValueError as error:
+                CTkMessagebox(
+                    title="Invalid page range", message=str(error), icon="cancel"
+                )
+                return
+        else:
+            page_numbers = sorted(self.page_view.selected_pages)
+
+        self.proceed_command(self.document, page_numbers)
         self.destroy()
 
     def close(self):
@@ -100,73 +138,231 @@ class ImportWindow(ctk.CTkToplevel):
 
 
 class _DocumentPreview(_DocumentDisplay):
-    """Document preview widget."""
+    """
+    Virtualized document preview widget.
+
+    The grid is laid out from the page sizes alone and labels only exist for the rows in
+    sight. Their thumbnails are rendered in the background, so the preview of even a very
+    long document is usable immediately.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        """
+        Initialize the DocumentPreview.
+
+        Args:
+            *args: Variable length argument list.
+            **kwargs: Configuration arguments for DynamicScrollableFrame.
+        """
+        super().__init__(*args, **kwargs)
+        self.document = fitz.Document()
+        self._ratios: list[float] = []
+        self._cell_width = 0
+        self._img_width = 0
+
+        self._visible: dict[int, ctk.CTkLabel] = {}
+        self._spare_labels: list[ctk.CTkLabel] = []
+
+        # gives the frame the height of all rows, the labels are placed on top of it
+        self._spacer = ctk.CTkFrame(self, width=0, height=0, fg_color="transparent")
+        self._spacer.grid(column=0, row=0)
 
     def load_pages(self, document: fitz.Document) -> None:
         """
-        Display the document pages by creating new labels.
+        Display the document pages, rendering only the pages in sight.
 
         Args:
             document (fitz.Document): The document to display.
         """
         self.clear()
-        self._images = [self._convert_page(page) for page in document]
-        self._ctk_images = self._create_images(
-            self._images, self._get_img_size(self._images[0])
-        )
+        self.document = document
 
-        for image in self._ctk_images:
-            label = self._create_label(image)
-            label.configure(fg_color=COLOR_SELECTED_BLUE)
-            self._labels.append(label)
+        # the crop boxes are read without loading or rendering the pages
+        self._ratios = [
+            rect.width / max(rect.height, 1)
+            for rect in map(document.page_cropbox, range(document.page_count))
+        ]
 
         self.selected_pages = set(range(0, len(document)))
         self._last_selected = len(document) - 1
 
-        self._update_grid()
-
-        # updates the first few pages so the scrollbar wound overlaps with the images
-        if self.winfo_height() > self._parent_canvas.winfo_height():
-            self._update_pages_in_sight(document)
+        self._parent_canvas.update_idletasks()
+        self._layout()
+        self._show_pages_in_sight()
 
-    def _get_img_size(self, img: Image) -> tuple[int, int]:
-        """
-        Calculate the size of the image to fit within the canvas while preserving its aspect ratio.
+    def update_view(self) -> None:
+        """Update the layout when the window size changes and show the pages in sight."""
+        if not self._ratios:
+            return
 
-        Parameters:
-            img (Image): The image to be resized.
+        if self._parent_canvas.winfo_width() // self._columns != self._cell_width:
+            self._layout()
+            for page in list(self._visible):
+                self._hide_page(page)
 
-        Returns:
-            tuple[int, int]: A tuple containing the width and height of the resized image.
-        """
-        # Update the canvas to get the current dimensions
-        self._parent_canvas.update()
+        self._schedule_update()
 
-        # Calculate the aspect ratio of the image and canvas
-        img_ratio = img.size[0] / img.size[1]
+    def _layout(self) -> None:
+        """Calculate the grid layout from the page sizes."""
         canvas_width = self._parent_canvas.winfo_width()
 
-        rows = canvas_width // (
-            int(self.winfo_screenheight() / IMPORT_WINDOW_HEIGHT_RATIO) / 3
+        self._columns = max(
+            1,
+            int(
+                canvas_width
+                // (int(self.winfo_screenheight() / IMPORT_WINDOW_HEIGHT_RATIO) / 3)
+            ),
+        )
+        self._rows = math.ceil(len(self._ratios) / self._columns)
+        self._cell_width = canvas_width // self._columns
+        self._img_width = max(
+            1, self._cell_width - 2 * (PAGE_X_PADDING + PAGE_IPADDING)
+        )
+
+        self._row_index.rebuild(
+            self._layout_row_height(row) for row in range(self._rows)
+        )
+        self._spacer.configure(width=canvas_width, height=self._row_index.total())
+        self._parent_canvas.configure(
+            scrollregion=(0, 0, canvas_width, self._row_index.total())
         )
-        img_width = canvas_width / rows - 2 * (PAGE_X_PADDING + PAGE_IPADDING)
-        img_height = img_width / img_ratio
 
-        return int(img_width), int(img_height)
+    def _img_height(self, page: int) -> int:
+        """Get the height of the thumbnail of a page."""
+        return max(1, int(self._img_width / self._ratios[page]))
 
-    def update_view(self) -> None:
-        """Update pages when window size changes."""
-        # new_size = self._get_img_size(self._images[0])
-        #
-        # if new_size and self._ctk_images[0].cget("size") != new_size:
-        #     self._ctk_images = self._create_images(self._images, new_size)
-        #     for label, img in zip(self._labels, self._ctk_images):
-        #         label.configure(image=img)
-
-        columns, _ = self._get_grid_dimension(self._ctk_images[0])
-
-        if not columns == self._columns:
-            self._update_grid()
+    def _layout_row_height(self, row: int) -> int:
+        """Get the height of a grid row including the padding of its pages."""
+        pages = range(
+            row * self._columns, min((row + 1) * self._columns, len(self._ratios))
+        )
+        return max(map(self._img_height, pages)) + 2 * PAGE_IPADDING + PAGE_Y_PADDING
+
+    def _show_pages_in_sight(self) -> None:
+        """Create the labels of the rows in sight and remove the labels of all others."""
+        self._update_scheduled = False
+        if not self._ratios:
+            return
+
+        top = self._parent_canvas.canvasy(0)
+        bottom = top + self._parent_canvas.winfo_height()
+        first_row = max(self._row_index.row_at(top) - PREVIEW_ROW_MARGIN, 0)
+        last_row = min(
+            self._row_index.row_at(bottom) + PREVIEW_ROW_MARGIN, self._rows - 1
+        )
+        in_sight = range(
+            first_row * self._columns,
+            min((last_row + 1) * self._columns, len(self._ratios)),
+        )
+
+        for page in [page for page in self._visible if page not in in_sight]:
+            self._hide_page(page)
+
+        # the pages further down are requested first, so the ones on top render first
+        for page in reversed(in_sight):
+            if page not in self._visible:
+                self._show_page(page)
+
+    def _show_page(self, page: int) -> None:
+        """Show a placeholder for a page and request its thumbnail."""
+        if self._spare_labels:
+            label = self._spare_labels.pop()
+        else:
+            label = self._create_label(None)
+
+        size = (self._img_width, self._img_height(page))
+        label.configure(
+            image=self._placeholder(size),
+            fg_color=COLOR_SELECTED_BLUE
+            if page in self.selected_pages
+            else label.cget("bg_color"),
+        )
+        label.page_number = page
+        self._visible[page] = label
+        self._place_page(page, label)
+
+        self._renderer.request(
+            self.document, page, lambda image: self._show_thumbnail(page, image)
+        )
+
+    def _hide_page(self, page: int) -> None:
+        """Remove the label of a page and keep it for reuse."""
+        label = self._visible.pop(page)
+        self._renderer.cancel(self.document, page)
+        label.place_forget()
+        self._spare_labels.append(label)
+
+    def _place_page(self, page: int, label: ctk.CTkLabel) -> None:
+        """Size and place the label of a page in its grid cell."""
+        row, column = divmod(page, self._columns)
+        label.configure(
+            width=self._img_width + 2 * PAGE_IPADDING,
+            height=self._img_height(page) + 2 * PAGE_IPADDING,
+        )
+        label.place(
+            x=column * self._cell_width + PAGE_X_PADDING,
+            y=self._row_index.offset(row),
+        )
+
+    def _show_thumbnail(self, page: int, image: Image.Image) -> None:
+        """Replace the placeholder of a page with its rendered thumbnail."""
+        label = self._visible.get(page)
+        if label is None:
+            return
+
+        # the crop box doesn't account for rotated pages, their rows are laid out again
+        ratio = image.width / image.height
+        if abs(ratio - self._ratios[page]) > 0.01:
+            self._ratios[page] = ratio
+            row = page // self._columns
+            self._row_index.set(row, self._layout_row_height(row))
+            self._spacer.configure(height=self._row_index.total())
+            for visible_page, visible_label in self._visible.items():
+                self._place_page(visible_page, visible_label)
+
+        size = (self._img_width, self._img_height(page))
+        label.configure(
+            image=ctk.CTkImage(light_image=image, dark_image=image, size=size)
+        )
+
+    def _page_of_label(self, label: ctk.CTkLabel) -> int:
+        """Get the page number of a label."""
+        return label.page_number
+
+    def _select_pages_shift(self, event: tk.Event) -> None:
+        """Selection a range of pages by holding shift and clicking start and end."""
+        page_num = self._page_of_label(event.widget.master)
+
+        first, last = sorted((self._last_selected, page_num))
+        self.selected_pages.update(range(first, last + 1))
+
+        for page, label in self._visible.items():
+            if first <= page <= last:
+                label.configure(fg_color=COLOR_SELECTED_BLUE)
+
+    def clear_selection(self) -> None:
+        """Remove selected pages from selection and reset page background."""
+        for label in self._visible.values():
+            label.configure(fg_color=label.cget("bg_color"))
+        self._last_selected = 0
+        self.selected_pages.clear()
+
+    def clear(self) -> None:
+        """Remove all pages and reset data."""
+        self._renderer.clear()
+
+        for label in [*self._visible.values(), *self._spare_labels]:
+            label.destroy()
+
+        self._visible.clear()
+        self._spare_labels.clear()
+        self._placeholders.clear()
+        self._ratios = []
+        self.selected_pages.clear()
+        self._rows = 0
+        self._columns = 0
+        self._row_index.rebuild(())
+        self._spacer.configure(width=0, height=0)
 
 
 def __load_test_doc(window: ImportWindow, path: str):
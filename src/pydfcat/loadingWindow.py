@@ -1,35 +1,49 @@
 # -*- coding: utf-8 -*-
-from typing import Optional
+from typing import Callable, Optional
 
 import customtkinter as ctk
 
 
 class LoadingWindow(ctk.CTkToplevel):
     """
-    A custom loading window for indicating file loading progress.
+    A custom loading window for indicating file loading or saving progress.
 
     This class inherits from ctk.CTkToplevel, a custom Tkinter Toplevel class.
     """
 
-    def __init__(self, parent, file_name: str, **kwargs):
+    def __init__(
+        self,
+        parent,
+        file_name: str,
+        action: str = "Open file",
+        cancel_command: Optional[Callable[[], None]] = None,
+        **kwargs,
+    ):
         """
         Initialize the LoadingWindow.
 
         Args:
             parent: The parent widget.
             file_name (str): The name of the file being loaded.
+            action (str, optional): The action shown in the title, e.g. "Save file".
+                Default is "Open file".
+            cancel_command (Callable[[], None], optional): Called when the window is
+                closed, which is prevented if it isn't given. The caller still destroys
+                the window.
             **kwargs: Configuration arguments for CTkTopLevel.
         """
         super().__init__(master=parent, **kwargs)
 
         # window setup
-        self.title("Open file")
+        self.action = action
+        self.title(action)
         self.geometry("200x75")
         self.resizable(False, False)
 
-        # prevent closing the window
+        # prevent closing the window, unless the action can be cancelled
         self.protocol(
-            "WM_DELETE_WINDOW", lambda: print("Don't close the loading window")
+            "WM_DELETE_WINDOW",
+            cancel_command or (lambda: print("Don't close the loading window")),
         )
 
         # data
@@ -47,7 +61,7 @@ class LoadingWindow(ctk.CTkToplevel):
         else:
             text = file_name
 
-        ctk.CTkLabel(self, text=f"Open file {text}").pack(
+        ctk.CTkLabel(self, text=f"{action} {text}").pack(
             side="top", expand=True, fill="x", padx=10, pady=5
         )
 
@@ -67,5 +81,20 @@ class LoadingWindow(ctk.CTkToplevel):
         """Update the loading progress."""
         self.percentage += (1 / self.aimed_absolut) * self.aimed_percentage
 
+        self.set_progress(self.percentage)
+
+    def set_progress(self, percentage: float) -> None:
+        """
+        Set the loading progress directly.
+
+        Args:
+            percentage (float): The progress between 0 and 1.
+        """
+        self.percentage = percentage
+
         self.loading_bar.set(self.percentage)
-        self.title(f"Open file ({int(self.percentage * 100)}%)")
+        self.title(f"{self.action} ({int(self.percentage * 100)}%)")
+
+        # documents are loaded without returning to the main loop, so the progress is
+        # redrawn right away
+        self.update_idletasks()
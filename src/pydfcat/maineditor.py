@@ -1,13 +1,15 @@
 # -*- coding: utf-8 -*-
 import re
-from typing import Any, Callable, Optional
+import tkinter as tk
+from typing import Any, Callable, Optional, Sequence, Union
 
 import customtkinter as ctk
 import fitz  # PyMuPDF
 from CTkMessagebox import CTkMessagebox
 
 from .loadingWindow import LoadingWindow
-from .settings import COLOR_SELECTED_BLUE
+from .rendering import page_key
+from .settings import COLOR_SELECTED_BLUE, PAGE_DRAG_THRESHOLD
 from .widgets import _DocumentDisplay
 
 
@@ -15,7 +17,11 @@ class MainEditor(ctk.CTkFrame):
     """Main editor class to manage file pages."""
 
     def __init__(
-        self, parent: Any, open_file_command: Callable, scaling_variable: ctk.StringVar
+        self,
+        parent: Any,
+        open_file_command: Callable,
+        move_pages_command: Callable,
+        scaling_variable: ctk.StringVar,
     ) -> None:
         """
         Initialize the Main Editor.
@@ -23,6 +29,8 @@ class MainEditor(ctk.CTkFrame):
         Args:
             parent (Any): The parent widget.
             open_file_command (Callable): The command to open a file.
+            move_pages_command (Callable): The command to move pages in front of a position,
+                called when pages are dragged and dropped.
         """
         super().__init__(master=parent, fg_color="transparent")
 
@@ -43,7 +51,9 @@ class MainEditor(ctk.CTkFrame):
         self.open_file_button.grid(row=0, column=0, sticky="s", pady=5)
 
         # page view
-        self.document_view = _DocumentEditor(self, fg_color="transparent")
+        self.document_view = _DocumentEditor(
+            self, move_pages_command=move_pages_command, fg_color="transparent"
+        )
 
         # label for error message
         self.error_label = ctk.CTkLabel(
@@ -51,13 +61,16 @@ class MainEditor(ctk.CTkFrame):
         )
 
     def get_new_document(
-        self, document: fitz.Document, loading_window: LoadingWindow
+        self,
+        document: Union[fitz.Document, Sequence[fitz.Page]],
+        loading_window: LoadingWindow,
     ) -> None:
         """
         Load a new document into the Main Editor.
 
         Args:
-            document (fitz.Document): The document to load.
+            document (Union[fitz.Document, Sequence[fitz.Page]]):
+                The document or the pages to load.
             loading_window (LoadingWindow): A window with loadingbar.
         """
         # remove file-open-button and place page view
@@ -164,13 +177,22 @@ class MainEditor(ctk.CTkFrame):
         """
         self.document_view.duplicate_pages(page_numbers)
 
-    def insert_pages(self, position: int, pages: fitz.Document) -> None:
+    def reorder_pages(self, order: list[int]) -> None:
+        """
+        Rearrange the pages in the document view.
+
+        Args:
+            order (list[int]): The old page number of each page in the new order.
+        """
+        self.document_view.reorder_pages(order)
+
+    def insert_pages(self, position: int, pages: Sequence[fitz.Page]) -> None:
         """
         Insert pages from another document at a given position in the document view.
 
         Args:
             position (int): The position to insert the pages.
-            pages (fitz.Document): The pages to be inserted.
+            pages (Sequence[fitz.Page]): The pages to be inserted.
         """
         self.document_view.insert_pages(position, pages)
 
@@ -204,28 +226,130 @@ class MainEditor(ctk.CTkFrame):
 class _DocumentEditor(_DocumentDisplay):
     """Class to display file pages"""
 
+    def __init__(self, *args, move_pages_command: Callable, **kwargs) -> None:
+        """
+        Initialize the Document Editor.
+
+        Args:
+            *args: Variable length argument list.
+            move_pages_command (Callable): The command to move pages in front of a position.
+            **kwargs: Configuration arguments for _DocumentDisplay.
+        """
+        super().__init__(*args, **kwargs)
+
+        self._move_pages = move_pages_command
+        self._drag_origin: Optional[tuple[int, int]] = None
+        self._dragging = False
+        self._pressed_selected = False
+
+    def _create_label(self, image: ctk.CTkImage) -> ctk.CTkLabel:
+        """Create a CTkLabel for a given CTkImage with selection and drag bindings."""
+        label = super()._create_label(image)
+        label.bind("<B1-Motion>", command=self._drag_pages)
+        label.bind("<ButtonRelease-1>", command=self._drop_pages)
+        return label
+
+    def _select_page(self, event: tk.Event) -> None:
+        """Select page with a single click, keeping a selection that might be dragged."""
+        ctk_label: ctk.CTkLabel = event.widget.master
+
+        # a selected page may be the start of dragging the whole selection, so the
+        # selection is only reduced to this page when it is released without dragging
+        self._pressed_selected = self._page_of_label(ctk_label) in self.selected_pages
+        if not self._pressed_selected:
+            super()._select_page(event)
+
+    def _drag_pages(self, event: tk.Event) -> None:
+        """Drag the selected pages once the mouse moved far enough."""
+        if not self.selected_pages:
+            return
+
+        if self._drag_origin is None:
+            self._drag_origin = (event.x_root, event.y_root)
+            return
+
+        if not self._dragging:
+            distance = max(
+                abs(event.x_root - self._drag_origin[0]),
+                abs(event.y_root - self._drag_origin[1]),
+            )
+            if distance < PAGE_DRAG_THRESHOLD:
+                return
+
+            self._dragging = True
+            self.winfo_toplevel().configure(cursor="fleur")
+
+        # scroll when dragging over the edges of the view
+        canvas_y = event.y_root - self._parent_canvas.winfo_rooty()
+        if canvas_y < 0:
+            self._parent_canvas.yview_scroll(-1, "units")
+        elif canvas_y > self._parent_canvas.winfo_height():
+            self._parent_canvas.yview_scroll(1, "units")
+
+    def _drop_pages(self, event: tk.Event) -> None:
+        """Move the dragged pages in front of the page under the mouse."""
+        dragging = self._dragging
+        self._drag_origin = None
+        self._dragging = False
+
+        if dragging:
+            self.winfo_toplevel().configure(cursor="")
+            self._move_pages(sorted(self.selected_pages), self._drop_position(event))
+        elif self._pressed_selected:
+            super()._select_page(event)
+
+        self._pressed_selected = False
+
+    def _drop_position(self, event: tk.Event) -> int:
+        """
+        Get the position pages are dropped at from the mouse position.
+
+        Args:
+            event (tk.Event): The release event of the drag.
+
+        Returns:
+            int: The number of the page the pages are placed in front of.
+        """
+        x = event.x_root - self.winfo_rootx()
+        y = event.y_root - self.winfo_rooty()
+
+        if y >= self._row_index.total():
+            return len(self._labels)
+
+        row = self._row_index.row_at(max(y, 0))
+        column_width = max(self.grid_bbox(column=0, row=0)[2], 1)
+        # dropping on the right half of a page places the pages behind it
+        column = min(max(round(x / column_width), 0), self._columns)
+
+        return min(row * self._columns + column, len(self._labels))
+
     def load_pages(
-        self, document: fitz.Document, loading_window: LoadingWindow
+        self,
+        document: Union[fitz.Document, Sequence[fitz.Page]],
+        loading_window: LoadingWindow,
     ) -> None:
         """
         Display the document pages by creating new labels.
 
         Args:
-            document (fitz.Document): The document to display.
+            document (Union[fitz.Document, Sequence[fitz.Page]]):
+                The document or the pages to display.
             loading_window (LoadingWindow): Window for loading animation.
         """
         loading_window.aim(percentage=0.5, absolut=len(document) + 2)
 
         self.clear()
-        self._images = [self._convert_page(page) for page in document]
-        self._ctk_images = self._create_images(
-            self._images, self._get_img_size(self._images[0])
-        )
+        if not len(document):
+            return
+
+        # the view only keeps the cache keys of the pages, see `_show_pages_in_sight`
+        keys = [page_key(page) for page in document]
+        self._img_size = self._get_page_size(keys[0])
 
         loading_window.add()
 
-        for image in self._ctk_images:
-            label = self._create_label(image)
+        for key in keys:
+            label = self._create_page_label(key)
             self._labels.append(label)
 
             loading_window.add()
@@ -234,10 +358,6 @@ class _DocumentEditor(_DocumentDisplay):
 
         loading_window.add()
 
-        # updates the first few pages so the scrollbar wound overlaps with the images
-        if self.winfo_height() > self._parent_canvas.winfo_height():
-            self._update_pages_in_sight(document)
-
     def update_pages(self, new_scaling: Optional[float] = None) -> None:
         """
         Update the document pages with a new scaling factor or new image size.
@@ -245,22 +365,25 @@ class _DocumentEditor(_DocumentDisplay):
         Parameters:
             new_scaling (float, optional): The new scaling factor for the images.
         """
-        new_size = self._get_img_size(self._images[0])
-
         if new_scaling is not None:
             self.scale = new_scaling
 
-        if new_scaling is not None or (
-            new_size and self._ctk_images[0].cget("size") != new_size
-        ):
-            self._ctk_images = self._create_images(self._images, new_size)
-            for label, img in zip(self._labels, self._ctk_images):
-                label.configure(image=img)
+        if not self._labels:
+            return
 
-        columns, _ = self._get_grid_dimension(self._ctk_images[0])
+        new_size = self._get_page_size(self._labels[0].page_key)
+
+        resized = new_size != self._img_size
+        if resized:
+            self._set_page_size(new_size)
+
+        columns, _ = self._get_grid_dimension(self._img_size)
 
         if not columns == self._columns:
             self._update_grid()
+        elif resized:
+            self.update_idletasks()
+            self._update_row_index()
 
     def jump_to_page(self, page_num: int) -> None:
         """
@@ -269,10 +392,22 @@ class _DocumentEditor(_DocumentDisplay):
         Args:
             page_num (int): The page number to jump to.
         """
-        page_overlap = 1 if len(self._labels) % self._columns != 0 else 0
         row_num = page_num // self._columns
+        _, top, _, bottom = self._parent_canvas.bbox("all")
 
-        self._parent_canvas.yview_moveto(str(row_num / (self._rows + page_overlap)))
+        # the row offset is exact even when rows have different heights
+        self._parent_canvas.yview_moveto(
+            str(self._row_index.offset(row_num) / max(bottom - top, 1))
+        )
+
+    def page_in_sight(self) -> int:
+        """
+        Get the page at the top edge of the visible area.
+
+        Returns:
+            int: The number of the first visible page.
+        """
+        return self.page_at_offset(self._parent_canvas.canvasy(0))
 
     def delete_pages(self, page_nums: list[int]) -> None:
         """
@@ -282,11 +417,12 @@ class _DocumentEditor(_DocumentDisplay):
             page_nums (list[int]): The page numbers to delete.
         """
         for n, page_num in enumerate(page_nums):
-            self._labels.pop(page_num - n).grid_forget()
-            self._images.pop(page_num - n)
-            self._ctk_images.pop(page_num - n)
+            label = self._labels.pop(page_num - n)
+            self._thumbnails.discard(label)
+            label.destroy()
 
-        self._update_grid()
+        if page_nums:
+            self._update_grid(min(page_nums))
 
     def duplicate_pages(self, page_nums: list[int]) -> None:
         """
@@ -295,35 +431,48 @@ class _DocumentEditor(_DocumentDisplay):
         Args:
             page_nums (list[int]): The page numbers to duplicate.
         """
+        # the copies show the cached images of their pages
         position = max(page_nums) + 1
-        for n, page_num in enumerate(page_nums):
-            self._images.insert(position + n, self._images[page_num])
-            self._ctk_images.insert(position + n, self._ctk_images[page_num])
+        self._labels[position:position] = [
+            self._create_page_label(self._labels[num].page_key) for num in page_nums
+        ]
 
-            label = self._create_label(self._labels[page_num].cget("image"))
-            self._labels.insert(position + n, label)
+        self._update_grid(position)
 
-        self._update_grid()
+    def reorder_pages(self, order: list[int]) -> None:
+        """
+        Rearrange the pages in the view, reusing their labels and rendered images.
 
-    def insert_pages(self, pos: int, pages: fitz.Document) -> None:
+        Args:
+            order (list[int]): The old page number of each page in the new order.
+        """
+        self.clear_selection()
+
+        self._labels = [self._labels[index] for index in order]
+
+        moved = [position for position, index in enumerate(order) if position != index]
+        if moved:
+            self._update_grid(moved[0])
+
+    def insert_pages(self, pos: int, pages: Sequence[fitz.Page]) -> None:
         """
         Insert pages from another document at a given position in the view.
 
         Args:
             pos (int): The position to insert the pages.
-            pages (fitz.Document): The pages to be inserted.
+            pages (Sequence[fitz.Page]): The pages to be inserted.
         """
-        self._images[pos:pos] = [self._convert_page(page) for page in pages]
-        self._ctk_images[pos:pos] = self._create_images(
-            self._images[pos : pos + len(pages)],
-            self._get_img_size(self._images[0]),
-        )
+        if not pages:
+            return
 
-        for n, image in enumerate(self._ctk_images[pos : pos + len(pages)]):
-            label = self._create_label(image)
-            self._labels.insert(pos + n, label)
+        if not self._labels:
+            self._img_size = self._get_page_size(page_key(pages[0]))
 
-        self._update_grid()
+        self._labels[pos:pos] = [
+            self._create_page_label(page_key(page)) for page in pages
+        ]
+
+        self._update_grid(pos)
 
     def set_selection(self, index_range: range) -> None:
         """Select a given range of pages in the main editor."""
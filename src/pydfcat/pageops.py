@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+from typing import Iterable
+
+import fitz  # PyMuPDF
+
+
+def is_blank_page(page: fitz.Page) -> bool:
+    """
+    Check whether a page has no visible content.
+
+    Args:
+        page (fitz.Page): The page to check.
+
+    Returns:
+        bool: True if the page contains neither text, nor images, nor vector graphics.
+    """
+    if not page.read_contents().strip():
+        return True
+
+    return not (page.get_text().strip() or page.get_images() or page.get_drawings())
+
+
+def page_runs(page_numbers: Iterable[int]) -> list[tuple[int, int]]:
+    """
+    Split page numbers into runs of consecutive pages.
+
+    The order of the page numbers is preserved, so a run only continues while each page
+    number directly follows the previous one.
+
+    Args:
+        page_numbers (Iterable[int]): The page numbers to split.
+
+    Returns:
+        list[tuple[int, int]]: The first and last page number (inclusive) of each run.
+    """
+    runs: list[tuple[int, int]] = []
+
+    for page_number in page_numbers:
+        if runs and runs[-1][1] + 1 == page_number:
+            runs[-1] = (runs[-1][0], page_number)
+        else:
+            runs.append((page_number, page_number))
+
+    return runs
+
+
+def move_order(
+    page_count: int, page_numbers: Iterable[int], position: int
+) -> list[int]:
+    """
+    Get the page order that moves pages in front of a position.
+
+    Args:
+        page_count (int): The number of pages of the document.
+        page_numbers (Iterable[int]): The numbers of the pages to move, in the desired order.
+        position (int): The number of the page the moved pages are placed in front of,
+            before moving them. Use `page_count` to move them to the end.
+
+    Returns:
+        list[int]: The old page number of each page in the new order.
+    """
+    moved = list(dict.fromkeys(page_numbers))
+    remaining = set(moved)
+
+    return (
+        [page for page in range(position) if page not in remaining]
+        + moved
+        + [page for page in range(position, page_count) if page not in remaining]
+    )
+
+
+def inverse_order(order: list[int]) -> list[int]:
+    """
+    Get the page order that reverts a permutation.
+
+    Args:
+        order (list[int]): The old page number of each page in the new order.
+
+    Returns:
+        list[int]: The page order restoring the original order.
+    """
+    inverse = [0] * len(order)
+    for new_page, old_page in enumerate(order):
+        inverse[old_page] = new_page
+
+    return inverse
+
+
+def parse_page_ranges(expression: str, page_count: int) -> list[int]:
+    """
+    Resolve a page range expression like "1-20,45,100-" against a page count.
+
+    Page numbers in the expression start at 1. A range without a start begins at the first
+    page, a range without an end stops at the last page, and a range whose start is
+    greater than its end is taken in descending order.
+
+    Args:
+        expression (str): Comma separated page numbers and ranges.
+        page_count (int): The number of pages of the document.
+
+    Returns:
+        list[int]: The (zero-based) page numbers in the order of the expression.
+
+    Raises:
+        ValueError: If the expression is malformed or refers to pages out of range.
+    """
+    page_numbers: list[int] = []
+
+    for part in expression.split(","):
+        part = part.strip()
+        if not part:
+            raise ValueError(f"Empty page range in {expression!r}")
+
+        start, dash, end = (value.strip() for value in part.partition("-"))
+        try:
+            first = int(start) if start else 1
+            last = (int(end) if end else page_count) if dash else first
+        except ValueError:
+            raise ValueError(f"Invalid page range {part!r}") from None
+
+        for page in (first, last):
+            if not 1 <= page <= page_count:
+                raise ValueError(
+                    f"Page {page} of {part!r} is out of range (1-{page_count})"
+                )
+
+        step = 1 if first <= last else -1
+        page_numbers.extend(range(first - 1, last - 1 + step, step))
+
+    return page_numbers
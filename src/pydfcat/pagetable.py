@@ -0,0 +1,399 @@
+# -*- coding: utf-8 -*-
+import itertools
+from typing import Iterable, Iterator, NamedTuple, Optional, Sequence
+
+import fitz  # PyMuPDF
+
+from .pageops import page_runs
+
+# distinguishes deep copies of the same page from each other
+_copy_numbers = itertools.count(1)
+
+
+class PageRef(NamedTuple):
+    """
+    Reference to a single page of a source document.
+
+    Equal references are saved as one shared page object. A deep copy gets its own `copy`
+    number, so it is saved as an independent duplicate of the page.
+    """
+
+    document: fitz.Document
+    page: int
+    rotation: Optional[int] = None
+    copy: int = 0
+
+    def load(self) -> fitz.Page:
+        """
+        Load the referenced page from its source document.
+
+        Returns:
+            fitz.Page: The referenced page.
+        """
+        return self.document[self.page]
+
+    def original(self) -> "PageRef":
+        """Return the reference to the page this reference is a deep copy of."""
+        return self._replace(copy=0)
+
+    def deep_copy(self) -> "PageRef":
+        """Return a reference to a new, independent copy of the page."""
+        return self._replace(copy=next(_copy_numbers))
+
+
+class PageTable:
+    """
+    An ordered table of page references forming a virtual document.
+
+    Edits like rearranging, copying, duplicating and pasting pages only shuffle the small
+    `PageRef` records, independent of the size of the page contents. A real document is
+    only built by `materialize` in one pass, e.g. when saving.
+    """
+
+    def __init__(self, refs: Iterable[PageRef] = ()) -> None:
+        """
+        Initialize the PageTable.
+
+        Args:
+            refs (Iterable[PageRef], optional): The initial page references.
+        """
+        self._refs: list[PageRef] = list(refs)
+
+    @classmethod
+    def from_document(cls, document: fitz.Document) -> "PageTable":
+        """
+        Create a page table referencing all pages of a document.
+
+        Args:
+            document (fitz.Document): The source document.
+
+        Returns:
+            PageTable: A page table with one reference per page of the document.
+        """
+        return cls(PageRef(document, page) for page in range(document.page_count))
+
+    def __len__(self) -> int:
+        """Return the number of pages in the table."""
+        return len(self._refs)
+
+    def __iter__(self) -> Iterator[PageRef]:
+        """Iterate over the page references."""
+        return iter(self._refs)
+
+    def __getitem__(self, index: int) -> PageRef:
+        """Get the page reference at the given index."""
+        return self._refs[index]
+
+    def refs(self, indices: Iterable[int]) -> list[PageRef]:
+        """
+        Get the page references at the given indices.
+
+        Args:
+            indices (Iterable[int]): The indices of the pages.
+
+        Returns:
+            list[PageRef]: The page references in the order of the indices.
+        """
+        return [self._refs[index] for index in indices]
+
+    def pages(self, indices: Optional[Iterable[int]] = None) -> list[fitz.Page]:
+        """
+        Load the pages at the given indices from their source documents.
+
+        Args:
+            indices (Iterable[int], optional): The indices of the pages. Default is all pages.
+
+        Returns:
+            list[fitz.Page]: The loaded pages.
+        """
+        refs = self._refs if indices is None else self.refs(indices)
+        return load_pages(refs)
+
+    def insert(self, index: int, refs: Iterable[PageRef]) -> None:
+        """
+        Insert page references before the given index.
+
+        Args:
+            index (int): The index to insert the references at.
+            refs (Iterable[PageRef]): The references to insert.
+        """
+        self._refs[index:index] = refs
+
+    def insert_at(self, positions: Sequence[int], refs: Sequence[PageRef]) -> None:
+        """
+        Insert page references so that they end up at the given positions.
+
+        This is the inverse of `delete`. Each run of consecutive positions is inserted
+        with one slice assignment, so the references in front of the first position
+        aren't touched.
+
+        Args:
+            positions (Sequence[int]): The ascending positions of the references after
+                the insertion.
+            refs (Sequence[PageRef]): The references to insert, one per position.
+        """
+        inserted = 0
+        for first, last in page_runs(positions):
+            count = last - first + 1
+            self._refs[first:first] = refs[inserted : inserted + count]
+            inserted += count
+
+    def extend(self, refs: Iterable[PageRef]) -> None:
+        """
+        Append page references at the end of the table.
+
+        Args:
+            refs (Iterable[PageRef]): The references to append.
+        """
+        self._refs.extend(refs)
+
+    def delete(self, indices: Iterable[int]) -> list[PageRef]:
+        """
+        Remove the page references at the given indices.
+
+        Args:
+            indices (Iterable[int]): The indices of the pages to remove.
+
+        Returns:
+            list[PageRef]: The removed references in ascending order of their indices.
+        """
+        deleted = sorted(set(indices))
+        removed = [self._refs[index] for index in deleted]
+        # each run of consecutive indices is removed with one slice deletion, from the
+        # back so the indices of the other runs stay valid
+        for first, last in reversed(page_runs(deleted)):
+            del self._refs[first : last + 1]
+        return removed
+
+    def duplicate(self, indices: list[int], deep: bool = False) -> list[PageRef]:
+        """
+        Duplicate page references and insert the copies behind the last of them.
+
+        Args:
+            indices (list[int]): The indices of the pages to duplicate, in the desired order.
+            deep (bool, optional): Whether to insert deep copies, which are saved as
+                independent pages instead of sharing the page objects. Default is False.
+
+        Returns:
+            list[PageRef]: The inserted references.
+        """
+        if not indices:
+            return []
+
+        copies = self.refs(indices)
+        if deep:
+            copies = [ref.deep_copy() for ref in copies]
+
+        self.insert(max(indices) + 1, copies)
+        return copies
+
+    def permute(self, order: Sequence[int]) -> None:
+        """
+        Rearrange the page references.
+
+        Args:
+            order (Sequence[int]): The old index of each reference in the new order.
+        """
+        self._refs = [self._refs[index] for index in order]
+
+    def clear(self) -> None:
+        """Remove all page references."""
+        self._refs.clear()
+
+    def materialize(self) -> fitz.Document:
+        """
+        Build a new document from the page references in one pass.
+
+        Returns:
+            fitz.Document: A new document containing the referenced pages in order.
+        """
+        document = fitz.Document()
+        for _ in arrange_refs(document, self._refs):
+            pass
+
+        return document
+
+
+def arrange_refs(
+    document: fitz.Document,
+    refs: Sequence[PageRef],
+    positions: Optional[dict[PageRef, int]] = None,
+    chunk_pages: int = 0,
+) -> Iterator[int]:
+    """
+    Make a document consist of exactly the referenced pages, in order.
+
+    Each missing page is copied into the document only once with `insert_refs`, deep
+    copies are duplicated with `fullcopy_page`, and a single `select` finally brings the
+    pages into order. Repeated references therefore share one page object.
+
+    Args:
+        document (fitz.Document): The document to arrange.
+        refs (Sequence[PageRef]): The references of the pages the document should contain.
+        positions (dict[PageRef, int], optional): The page numbers of references the
+            document already contains. Default is none.
+        chunk_pages (int, optional): Split transfers into chunks of at most this many pages,
+            see `insert_refs`. Default is 0 to never split them.
+
+    Yields:
+        int: The number of pages processed so far.
+    """
+    originals, plan = plan_pages(refs, positions, document.page_count)
+    yield from insert_refs(document, originals, chunk_pages)
+    apply_page_plan(document, plan)
+    yield len(refs)
+
+
+def plan_pages(
+    refs: Sequence[PageRef],
+    positions: Optional[dict[PageRef, int]] = None,
+    first_page: int = 0,
+) -> tuple[list[PageRef], list[tuple[int, int]]]:
+    """
+    Plan how a document is made to consist of exactly the referenced pages, see
+    `arrange_refs`.
+
+    The plan only consists of numbers, so it can be applied in another process.
+
+    Args:
+        refs (Sequence[PageRef]): The references of the pages the document should contain.
+        positions (dict[PageRef, int], optional): The page numbers of references the
+            document already contains. Default is none.
+        first_page (int, optional): The page number the missing pages are appended at,
+            i.e. the page count of the document. Default is 0.
+
+    Returns:
+        tuple[list[PageRef], list[tuple[int, int]]]: The references of the pages to append
+            to the document, and the page number and copy number of each referenced page
+            afterward, see `apply_page_plan`.
+    """
+    positions = dict(positions or {})
+
+    missing = [ref for ref in dict.fromkeys(refs) if ref not in positions]
+    originals = list(
+        dict.fromkeys(
+            ref.original() for ref in missing if ref.original() not in positions
+        )
+    )
+    for page, ref in enumerate(originals, start=first_page):
+        positions[ref] = page
+
+    plan = [
+        (positions[ref], 0)
+        if ref in positions
+        else (positions[ref.original()], ref.copy)
+        for ref in refs
+    ]
+    return originals, plan
+
+
+def apply_page_plan(document: fitz.Document, plan: Sequence[tuple[int, int]]) -> None:
+    """
+    Rearrange a document according to a plan of `plan_pages`.
+
+    Args:
+        document (fitz.Document): The document, containing the appended pages.
+        plan (Sequence[tuple[int, int]]): The page number of each page of the arranged
+            document, and its copy number, see `PageRef.copy`. Each deep copy is
+            duplicated only once, however often it is repeated.
+    """
+    copies: dict[tuple[int, int], int] = {}
+    order = []
+    for page, copy in plan:
+        if copy:
+            if (page, copy) not in copies:
+                document.fullcopy_page(page)
+                copies[page, copy] = document.page_count - 1
+            page = copies[page, copy]
+        order.append(page)
+
+    if order != list(range(document.page_count)):
+        document.select(order)
+
+
+def insert_refs(
+    document: fitz.Document, refs: Sequence[PageRef], chunk_pages: int = 0
+) -> Iterator[int]:
+    """
+    Append referenced pages to a document, one `insert_pdf` call per run.
+
+    Consecutive references into the same source document are transferred with a single
+    `insert_pdf` call. The map of already copied objects of each source is kept until
+    its last transfer, so shared resources are copied only once.
+
+    Args:
+        document (fitz.Document): The document to append the pages to.
+        refs (Sequence[PageRef]): The references of the pages to append.
+        chunk_pages (int, optional): Split runs into transfers of at most this many pages,
+            so callers can interleave other work. Default is 0 to never split runs.
+
+    Yields:
+        int: The number of pages appended so far, after each transfer.
+    """
+    runs = []
+    for source, from_page, to_page, rotation in ref_runs(refs):
+        step = chunk_pages or to_page - from_page + 1
+        for chunk_start in range(from_page, to_page + 1, step):
+            chunk_end = min(chunk_start + step - 1, to_page)
+            runs.append((source, chunk_start, chunk_end, rotation))
+
+    last_run = {}
+    for n, (source, _, _, _) in enumerate(runs):
+        last_run[id(source)] = n
+
+    inserted = 0
+    for n, (source, from_page, to_page, rotation) in enumerate(runs):
+        document.insert_pdf(
+            source,
+            from_page=from_page,
+            to_page=to_page,
+            rotate=-1 if rotation is None else rotation,
+            final=last_run[id(source)] == n,
+        )
+        inserted += to_page - from_page + 1
+        yield inserted
+
+
+def ref_runs(
+    refs: Iterable[PageRef],
+) -> list[tuple[fitz.Document, int, int, Optional[int]]]:
+    """
+    Split page references into runs of consecutive pages of the same source document.
+
+    Args:
+        refs (Iterable[PageRef]): The page references to split.
+
+    Returns:
+        list[tuple[fitz.Document, int, int, Optional[int]]]:
+            The source document, first and last page number (inclusive) and rotation of
+            each run.
+    """
+    runs: list[tuple[fitz.Document, int, int, Optional[int]]] = []
+
+    for ref in refs:
+        if runs:
+            source, from_page, to_page, rotation = runs[-1]
+            if (
+                source is ref.document
+                and to_page + 1 == ref.page
+                and rotation == ref.rotation
+            ):
+                runs[-1] = (source, from_page, ref.page, rotation)
+                continue
+
+        runs.append((ref.document, ref.page, ref.page, ref.rotation))
+
+    return runs
+
+
+def load_pages(refs: Iterable[PageRef]) -> list[fitz.Page]:
+    """
+    Load the referenced pages from their source documents.
+
+    Args:
+        refs (Iterable[PageRef]): The page references to load.
+
+    Returns:
+        list[fitz.Page]: The loaded pages.
+    """
+    return [ref.load() for ref in refs]
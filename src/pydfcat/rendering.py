@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+import fitz  # PyMuPDF
+from PIL import Image
+
+from .settings import PAGE_IMAGE_CACHE_BYTES, RENDER_TIME_SLICE
+
+
+class PageImageCache:
+    """
+    A bounded cache of rendered page images, evicting the least recently used first.
+
+    All views of all open documents render through one cache, so a page that is shown
+    in the editor, the navigator and the clipboard, or in several documents, is rasterized
+    only once.
+    """
+
+    def __init__(self, max_bytes: int = PAGE_IMAGE_CACHE_BYTES) -> None:
+        """
+        Initialize the PageImageCache.
+
+        Args:
+            max_bytes (int, optional): The maximum size of the cached images in bytes.
+        """
+        self.max_bytes = max_bytes
+        self.size = 0
+
+        self._images: OrderedDict[Hashable, Image.Image] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return the number of cached images."""
+        return len(self._images)
+
+    def get(self, key: Hashable) -> Optional[Image.Image]:
+        """
+        Get a cached image and mark it as recently used.
+
+        Args:
+            key (Hashable): The key of the page, see `page_key`.
+
+        Returns:
+            Optional[Image.Image]: The cached image or None if it isn't cached.
+        """
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+        return image
+
+    def put(self, key: Hashable, image: Image.Image) -> None:
+        """
+        Add an image to the cache, evicting the least recently used images if necessary.
+
+        Args:
+            key (Hashable): The key of the page, see `page_key`.
+            image (Image.Image): The rendered page.
+        """
+        self.discard(key)
+
+        self._images[key] = image
+        self.size += _image_size(image)
+
+        while self.size > self.max_bytes and len(self._images) > 1:
+            _, evicted = self._images.popitem(last=False)
+            self.size -= _image_size(evicted)
+
+    def discard(self, key: Hashable) -> None:
+        """
+        Remove an image from the cache, if it is cached.
+
+        Args:
+            key (Hashable): The key of the page, see `page_key`.
+        """
+        image = self._images.pop(key, None)
+        if image is not None:
+            self.size -= _image_size(image)
+
+    def discard_document(self, document: fitz.Document) -> None:
+        """
+        Remove all images of a document from the cache.
+
+        Args:
+            document (fitz.Document): The document whose pages are removed.
+        """
+        for key in [key for key in self._images if key[0] is document]:
+            self.discard(key)
+
+    def clear(self) -> None:
+        """Remove all images from the cache."""
+        self._images.clear()
+        self.size = 0
+
+
+# the cache shared by all views and documents of the application
+page_images = PageImageCache()
+
+
+def page_key(page: fitz.Page) -> tuple[fitz.Document, int]:
+    """
+    Get the cache key of a page.
+
+    Args:
+        page (fitz.Page): The page.
+
+    Returns:
+        tuple[fitz.Document, int]: The document and number of the page.
+    """
+    return page.parent, page.number
+
+
+def render_page(page: fitz.Page, cache: PageImageCache = page_images) -> Image.Image:
+    """
+    Render a page to an image, reusing a cached image if possible.
+
+    Args:
+        page (fitz.Page): The page to render.
+        cache (PageImageCache, optional): The cache to use. Default is the shared cache.
+
+    Returns:
+        Image.Image: The rendered page.
+    """
+    key = page_key(page)
+
+    image = cache.get(key)
+    if image is None:
+        pix = page.get_pixmap()
+        mode = "RGBA" if pix.alpha else "RGB"
+        image = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+        cache.put(key, image)
+
+    return image
+
+
+class RenderScheduler:
+    """
+    Renders requested pages in short time slices between the events of a GUI loop.
+
+    The most recent requests are rendered first, so the pages just scrolled into view
+    appear before the ones scrolled past, and requests for pages that left the view can
+    be cancelled before they cost anything.
+    """
+
+    def __init__(
+        self,
+        call_later: Callable[[int, Callable[[], None]], Any],
+        time_slice: float = RENDER_TIME_SLICE,
+        cache: PageImageCache = page_images,
+    ) -> None:
+        """
+        Initialize the RenderScheduler.
+
+        Args:
+            call_later (Callable[[int, Callable[[], None]], Any]): A function running a
+                callback after a delay in milliseconds, e.g. the `after` method of a widget.
+            time_slice (float, optional): The time in seconds spent rendering at a time.
+            cache (PageImageCache, optional): The cache to use. Default is the shared cache.
+        """
+        self._call_later = call_later
+        self.time_slice = time_slice
+        self.cache = cache
+
+        self._pending: OrderedDict[
+            tuple[fitz.Document, int], list[Callable[[Image.Image], None]]
+        ] = OrderedDict()
+        self._scheduled = False
+
+    def __len__(self) -> int:
+        """Return the number of pages waiting to be rendered."""
+        return len(self._pending)
+
+    def request(
+        self,
+        document: fitz.Document,
+        page: int,
+        callback: Callable[[Image.Image], None],
+    ) -> None:
+        """
+        Request a page to be rendered, moving it to the front of the queue.
+
+        Cached pages are passed to the callback immediately. Several callbacks may wait
+        for the same page, e.g. for labels showing the same page twice.
+
+        Args:
+            document (fitz.Document): The document of the page.
+            page (int): The number of the page.
+            callback (Callable[[Image.Image], None]): A function receiving the image.
+        """
+        key = (document, page)
+
+        image = self.cache.get(key)
+        if image is not None:
+            callback(image)
+            return
+
+        callbacks = self._pending.pop(key, [])
+        callbacks.append(callback)
+        self._pending[key] = callbacks
+
+        if not self._scheduled:
+            self._scheduled = True
+            self._call_later(1, self._render_slice)
+
+    def cancel(self, document: fitz.Document, page: int) -> None:
+        """
+        Cancel all requests for a page, if they are still pending.
+
+        Args:
+            document (fitz.Document): The document of the page.
+            page (int): The number of the page.
+        """
+        self._pending.pop((document, page), None)
+
+    def clear(self) -> None:
+        """Cancel all pending requests."""
+        self._pending.clear()
+
+    def _render_slice(self) -> None:
+        """Render pending pages until the time slice is used up."""
+        deadline = time.perf_counter() + self.time_slice
+
+        while self._pending and time.perf_counter() < deadline:
+            (document, page), callbacks = self._pending.popitem()
+            image = render_page(document[page], self.cache)
+            for callback in callbacks:
+                callback(image)
+
+        self._scheduled = bool(self._pending)
+        if self._scheduled:
+            self._call_later(1, self._render_slice)
+
+
+def _image_size(image: Image.Image) -> int:
+    """Get the size of the pixel data of an image in bytes."""
+    return image.width * image.height * len(image.getbands())
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+import random
+from typing import Iterable, Optional
+
+
+class _Row:
+    """A node of the tree, holding one row and the sums of its subtree."""
+
+    __slots__ = ("height", "total", "size", "priority", "left", "right")
+
+    def __init__(self, height: int) -> None:
+        """Initialize a node without children."""
+        self.height = height
+        self.total = height
+        self.size = 1
+        self.priority = random.random()
+        self.left: Optional[_Row] = None
+        self.right: Optional[_Row] = None
+
+    def update(self) -> None:
+        """Recompute the sums of the subtree from the children."""
+        self.total = self.height
+        self.size = 1
+        for child in (self.left, self.right):
+            if child is not None:
+                self.total += child.total
+                self.size += child.size
+
+
+class RowOffsetIndex:
+    """
+    Prefix sums of row heights stored in a treap (a randomly balanced binary tree).
+
+    The rows are the in-order nodes of the tree, each node keeping the number of rows and
+    the sum of the heights of its subtree. The index maps a row number to its vertical
+    offset and an offset back to its row, changes the height of a row and inserts or
+    removes rows, all in O(log n) expected time. The views update it along with their
+    labels and only `rebuild` it in O(n) when they lay out all rows again, e.g. when
+    the number of columns changes.
+    """
+
+    def __init__(self, heights: Iterable[int] = ()) -> None:
+        """
+        Initialize the RowOffsetIndex.
+
+        Args:
+            heights (Iterable[int], optional): The initial row heights.
+        """
+        self._root: Optional[_Row] = None
+        self.rebuild(heights)
+
+    def __len__(self) -> int:
+        """Return the number of rows in the index."""
+        return self._root.size if self._root is not None else 0
+
+    def rebuild(self, heights: Iterable[int]) -> None:
+        """
+        Replace all row heights and build the tree in linear time.
+
+        Args:
+            heights (Iterable[int]): The new row heights.
+        """
+        self._root = _build(heights)
+
+    def insert(self, row: int, heights: Iterable[int]) -> None:
+        """
+        Insert rows in front of a row.
+
+        Args:
+            row (int): The row number of the first inserted row. Values beyond the last
+                row append the rows.
+            heights (Iterable[int]): The heights of the inserted rows.
+        """
+        inserted = _build(heights)
+        if inserted is None:
+            return
+
+        front, back = _split(self._root, min(max(row, 0), len(self)))
+        self._root = _merge(_merge(front, inserted), back)
+
+    def delete(self, rows: Iterable[int]) -> None:
+        """
+        Remove rows from the index, each run of consecutive rows with two splits.
+
+        Args:
+            rows (Iterable[int]): The row numbers to remove.
+        """
+        runs: list[list[int]] = []
+        for row in sorted(set(rows), reverse=True):
+            if runs and runs[-1][0] == row + 1:
+                runs[-1][0] = row
+            else:
+                runs.append([row, row + 1])
+
+        # removing the runs from the back keeps the numbers of the other runs valid
+        for start, end in runs:
+            front, rest = _split(self._root, start)
+            _, back = _split(rest, end - start)
+            self._root = _merge(front, back)
+
+    def set(self, row: int, height: int) -> None:
+        """
+        Change the height of a single row.
+
+        Args:
+            row (int): The row number.
+            height (int): The new height of the row.
+        """
+        path = []
+        node = self._root
+        while node is not None:
+            path.append(node)
+            left_size = node.left.size if node.left is not None else 0
+            if row < left_size:
+                node = node.left
+            elif row > left_size:
+                row -= left_size + 1
+                node = node.right
+            else:
+                break
+        else:
+            raise IndexError("row out of range")
+
+        delta = int(height) - node.height
+        node.height = int(height)
+        for ancestor in path:
+            ancestor.total += delta
+
+    def offset(self, row: int) -> int:
+        """
+        Get the vertical offset of a row, i.e. the sum of all heights above it.
+
+        Args:
+            row (int): The row number. Values beyond the last row return the total height.
+
+        Returns:
+            int: The offset of the row's top edge.
+        """
+        index = min(max(row, 0), len(self))
+        total = 0
+        node = self._root
+        while node is not None:
+            left = node.left
+            left_size = left.size if left is not None else 0
+            if index < left_size:
+                node = left
+                continue
+
+            total += left.total if left is not None else 0
+            if index == left_size:
+                break
+            total += node.height
+            index -= left_size + 1
+            node = node.right
+        return total
+
+    def total(self) -> int:
+        """Return the sum of all row heights."""
+        return self._root.total if self._root is not None else 0
+
+    def row_at(self, offset: float) -> int:
+        """
+        Find the row containing the given vertical offset.
+
+        Args:
+            offset (float): The offset from the top edge of the first row.
+
+        Returns:
+            int: The row number, clamped to the valid rows.
+        """
+        if self._root is None:
+            return 0
+
+        row = 0
+        remaining = offset
+        node = self._root
+        while node is not None:
+            left = node.left
+            left_total = left.total if left is not None else 0
+            if remaining < left_total:
+                node = left
+                continue
+
+            remaining -= left_total
+            row += left.size if left is not None else 0
+            if remaining < node.height:
+                break
+            remaining -= node.height
+            row += 1
+            node = node.right
+
+        return min(row, len(self) - 1)
+
+
+def _build(heights: Iterable[int]) -> Optional[_Row]:
+    """Build a tree of the given rows in linear time and return its root."""
+    # the nodes on the right edge of the tree built so far, the root first
+    edge: list[_Row] = []
+    for height in heights:
+        node = _Row(int(height))
+        last = None
+        while edge and edge[-1].priority < node.priority:
+            last = edge.pop()
+            last.update()
+        node.left = last
+        if edge:
+            edge[-1].right = node
+        edge.append(node)
+
+    root = edge[0] if edge else None
+    while edge:
+        edge.pop().update()
+    return root
+
+
+def _split(node: Optional[_Row], count: int) -> tuple[Optional[_Row], Optional[_Row]]:
+    """Split a tree into the first `count` rows and the remaining rows."""
+    if node is None:
+        return None, None
+
+    left_size = node.left.size if node.left is not None else 0
+    if count <= left_size:
+        front, node.left = _split(node.left, count)
+        node.update()
+        return front, node
+
+    node.right, back = _split(node.right, count - left_size - 1)
+    node.update()
+    return node, back
+
+
+def _merge(front: Optional[_Row], back: Optional[_Row]) -> Optional[_Row]:
+    """Join two trees, the rows of the first one in front of the ones of the second."""
+    if front is None:
+        return back
+    if back is None:
+        return front
+
+    if front.priority > back.priority:
+        front.right = _merge(front.right, back)
+        front.update()
+        return front
+
+    back.left = _merge(front, back.left)
+    back.update()
+    return back
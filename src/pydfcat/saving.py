@@ -0,0 +1,578 @@
+# -*- coding: utf-8 -*-
+import contextlib
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+import traceback
+from multiprocessing.connection import Connection
+from typing import Callable, Iterator, NamedTuple, Optional, Sequence
+
+import fitz  # PyMuPDF
+
+from .pagetable import (
+    PageRef,
+    PageTable,
+    apply_page_plan,
+    arrange_refs,
+    insert_refs,
+    plan_pages,
+)
+from .settings import (
+    SAVE_CHUNK_PAGES,
+    SAVE_DEFAULT_PROFILE,
+    SAVE_PROFILES,
+    WORKER_START_METHOD,
+)
+
+
+class SaveReport(NamedTuple):
+    """Summary of a finished save."""
+
+    file_name: str
+    profile: str
+    incremental: bool
+    seconds: float
+    size_before: int
+    size_after: int
+
+    def __str__(self) -> str:
+        """Describe the save in a single line."""
+        if self.incremental:
+            method = "incrementally"
+        else:
+            method = f"with the {self.profile} profile"
+
+        return (
+            f"Saved {os.path.basename(self.file_name)} {method} in {self.seconds:.2f} s, "
+            f"{_format_size(self.size_before)} -> {_format_size(self.size_after)}"
+        )
+
+
+def save_options(profile: str = SAVE_DEFAULT_PROFILE, **options) -> dict:
+    """
+    Get the options of a save profile.
+
+    Args:
+        profile (str, optional): The name of the profile, one of the keys of
+            `SAVE_PROFILES`. Default is `SAVE_DEFAULT_PROFILE`.
+        **options: Options overriding the ones of the profile.
+
+    Returns:
+        dict: The options for `fitz.Document.save`, plus `subset_fonts` to subset the
+            embedded fonts before saving.
+
+    Raises:
+        ValueError: If the profile doesn't exist.
+    """
+    if profile not in SAVE_PROFILES:
+        raise ValueError(
+            f"Unknown save profile {profile!r}, choose one of {', '.join(SAVE_PROFILES)}"
+        )
+
+    return {**SAVE_PROFILES[profile], **options}
+
+
+def save_incremental(
+    table: PageTable, file_name: str, saved_refs: Sequence[PageRef]
+) -> Optional[SaveReport]:
+    """
+    Save a page table back into the file it was last saved to or opened from.
+
+    Only the changed objects are appended to the file: pages that are already part of the
+    file are reordered with a single `select`, and only pages from other sources are
+    copied into it. Pages removed from the document stay in the file as unused objects
+    until it is compacted with `save_full`.
+
+    Args:
+        table (PageTable): The page table to save.
+        file_name (str): The file to update.
+        saved_refs (Sequence[PageRef]): The page references the file currently contains,
+            in the order of its pages.
+
+    Returns:
+        Optional[SaveReport]: The report of the save, None if a full rewrite is required
+            instead.
+    """
+    start = time.perf_counter()
+    size_before = _file_size(file_name)
+
+    refs = list(table)
+    if not _is_unchanged(refs, file_name, saved_refs):
+        target = _open_incremental_target(refs, file_name, saved_refs)
+        if target is None:
+            return None
+
+        try:
+            for _ in _prepare_incremental_target(target, refs, saved_refs):
+                pass
+            _write_incremental(target, file_name)
+        finally:
+            target.close()
+
+    return SaveReport(
+        file_name,
+        "",
+        True,
+        time.perf_counter() - start,
+        size_before,
+        _file_size(file_name),
+    )
+
+
+def save_full(
+    table: PageTable,
+    file_name: str,
+    profile: str = SAVE_DEFAULT_PROFILE,
+    progress: Optional[Callable[[float], None]] = None,
+    **options,
+) -> SaveReport:
+    """
+    Build a new document from a page table and write it to a file.
+
+    The document is written to a temporary file next to the destination, which then
+    atomically replaces the destination. Documents still reading from the old file are
+    therefore not affected, and an interrupted save leaves the old file intact.
+
+    Args:
+        table (PageTable): The page table to save.
+        file_name (str): The destination file.
+        profile (str, optional): The save profile, "fast", "balanced" or "smallest".
+            Default is `SAVE_DEFAULT_PROFILE`.
+        progress (Callable[[float], None], optional): Called with the fraction of pages
+            copied so far, before the document is written. Default is None.
+        **options: Options for `fitz.Document.save` overriding the profile, e.g. `garbage=4`.
+
+    Returns:
+        SaveReport: The report of the save.
+    """
+    options = save_options(profile, **options)
+    start = time.perf_counter()
+    refs = list(table)
+    size_before = _file_size(file_name) or _estimate_size(refs)
+
+    document = fitz.Document()
+    try:
+        for inserted in arrange_refs(document, refs, chunk_pages=SAVE_CHUNK_PAGES):
+            if progress is not None:
+                progress(inserted / max(len(refs), 1))
+        _write_atomically(document, file_name, options)
+    finally:
+        document.close()
+
+    return SaveReport(
+        file_name,
+        profile,
+        False,
+        time.perf_counter() - start,
+        size_before,
+        _file_size(file_name),
+    )
+
+
+class SaveJob:
+    """
+    Save a snapshot of a page table without blocking the caller.
+
+    The job is advanced by repeatedly calling `step`, e.g. from the event loop of the GUI.
+    It first copies the pages the file doesn't contain yet into a new document in small
+    chunks and stores it in a temporary file, then a separate process arranges them with
+    the file, see `plan_pages`, and writes the result, as PyMuPDF holds the GIL while
+    writing. The worker is started fresh instead of forked from the multithreaded GUI, so
+    it only receives file names and the plan. Edits of the page table after the job was
+    created don't affect the saved file.
+    """
+
+    def __init__(
+        self,
+        table: PageTable,
+        file_name: str,
+        saved_refs: Sequence[PageRef] = (),
+        incremental: bool = True,
+        profile: str = SAVE_DEFAULT_PROFILE,
+        **options,
+    ) -> None:
+        """
+        Initialize the SaveJob.
+
+        Args:
+            table (PageTable): The page table to save, its current state is the snapshot.
+            file_name (str): The destination file.
+            saved_refs (Sequence[PageRef], optional): The page references the destination
+                currently contains, used to update the file incrementally.
+            incremental (bool, optional): Whether to try an incremental save. Default is True.
+            profile (str, optional): The save profile in case of a full rewrite.
+                Default is `SAVE_DEFAULT_PROFILE`.
+            **options: Options for `fitz.Document.save` overriding the profile.
+        """
+        self.file_name = file_name
+        self.refs = list(table)
+        self.profile = profile
+        self.options = save_options(profile, **options)
+        self.incremental = False
+        self.progress = 0.0
+        self.error: Optional[str] = None
+        self.report: Optional[SaveReport] = None
+
+        self._saved_refs = list(saved_refs) if incremental else []
+        self._document: Optional[fitz.Document] = None
+        self._steps: Optional[Iterator[int]] = None
+        self._plan: list[tuple[int, int]] = []
+        self._appended_pages = 0
+        self._pages_name = ""
+        self._process: Optional[multiprocessing.Process] = None
+        self._connection: Optional[Connection] = None
+        self._original_size = 0
+        self._temp_name = ""
+        self._estimated_size = _estimate_size(self.refs)
+        self._size_before = _file_size(file_name)
+        self._start_time = time.perf_counter()
+
+    @property
+    def writing(self) -> bool:
+        """Whether the document is currently written by the worker process."""
+        return self._process is not None
+
+    def step(self) -> bool:
+        """
+        Advance the save by one step.
+
+        Returns:
+            bool: True if the job has finished, successfully or with an error.
+        """
+        try:
+            if self._process is not None:
+                return self._poll_writer()
+
+            if self._steps is None:
+                if _is_unchanged(self.refs, self.file_name, self._saved_refs):
+                    self.incremental = True
+                    self._finish()
+                    return True
+                self._start()
+
+            try:
+                inserted = next(self._steps)
+                self.progress = 0.5 * inserted / max(self._appended_pages, 1)
+            except StopIteration:
+                self._start_writer()
+        except Exception as error:  # pylint: disable=broad-except
+            self.error = str(error)
+            self._close_document()
+            self._remove_temp_files()
+            return True
+
+        return False
+
+    def _start(self) -> None:
+        """Plan the save and create the document the missing pages are copied into."""
+        target = _open_incremental_target(self.refs, self.file_name, self._saved_refs)
+
+        positions: dict[PageRef, int] = {}
+        page_count = 0
+        if target is not None:
+            self.incremental = True
+            self._original_size = os.path.getsize(self.file_name)
+            positions = _saved_positions(self._saved_refs)
+            page_count = target.page_count
+            target.close()
+
+        originals, self._plan = plan_pages(self.refs, positions, page_count)
+        self._appended_pages = len(originals)
+        self._document = fitz.Document()
+        self._steps = insert_refs(self._document, originals, SAVE_CHUNK_PAGES)
+
+    def _start_writer(self) -> None:
+        """Store the copied pages and write the file in a worker process."""
+        if self._document.page_count:
+            self._pages_name = _create_temp_file(self.file_name)
+            # stored as copied, the worker applies the options of the profile
+            self._document.save(self._pages_name)
+        self._close_document()
+
+        if not self.incremental:
+            self._temp_name = _create_temp_file(self.file_name)
+
+        context = multiprocessing.get_context(WORKER_START_METHOD)
+        self._connection, child_connection = context.Pipe(duplex=False)
+        self._process = context.Process(
+            target=_write_in_worker,
+            args=(
+                self.file_name,
+                self._temp_name,
+                self._pages_name,
+                self._plan,
+                self._original_size,
+                self.options,
+                child_connection,
+            ),
+        )
+        self._process.start()
+        child_connection.close()
+
+        self.progress = 0.5
+
+    def _poll_writer(self) -> bool:
+        """Check on the worker process and update the progress."""
+        if self._process.is_alive():
+            if self.incremental:
+                written = _file_size(self.file_name) - self._original_size
+            else:
+                written = _file_size(self._temp_name)
+            if self._estimated_size:
+                self.progress = 0.5 + 0.49 * min(written / self._estimated_size, 1.0)
+            return False
+
+        self._process.join()
+        try:
+            # the worker only sends a message if the save failed
+            self.error = self._connection.recv()
+        except EOFError:
+            pass
+
+        if self.error is None and self._process.exitcode != 0:
+            self.error = f"The save process exited with code {self._process.exitcode}"
+            if self.incremental:
+                # the worker died while appending the update
+                _truncate(self.file_name, self._original_size)
+
+        self._connection.close()
+        self._process = None
+        self._remove_temp_files()
+        if not self.error:
+            self._finish()
+        return True
+
+    def _finish(self) -> None:
+        """Complete the progress and create the report of the save."""
+        self.progress = 1.0
+        self.report = SaveReport(
+            self.file_name,
+            self.profile,
+            self.incremental,
+            time.perf_counter() - self._start_time,
+            self._size_before or self._estimated_size,
+            _file_size(self.file_name),
+        )
+
+    def _close_document(self) -> None:
+        """Release the document of the copied pages."""
+        if self._document is not None:
+            self._document.close()
+            self._document = None
+
+    def _remove_temp_files(self) -> None:
+        """Remove the stored pages and a temporary file left behind by a failed save."""
+        for temp_name in (self._pages_name, self._temp_name):
+            if temp_name:
+                with contextlib.suppress(OSError):
+                    os.remove(temp_name)
+
+
+def _is_unchanged(
+    refs: Sequence[PageRef], file_name: str, saved_refs: Sequence[PageRef]
+) -> bool:
+    """Check whether the file already contains exactly the given pages."""
+    return (
+        bool(saved_refs)
+        and list(refs) == list(saved_refs)
+        and os.path.isfile(file_name)
+    )
+
+
+def _open_incremental_target(
+    refs: Sequence[PageRef], file_name: str, saved_refs: Sequence[PageRef]
+) -> Optional[fitz.Document]:
+    """
+    Open the file to update incrementally, if possible.
+
+    Returns:
+        Optional[fitz.Document]: The opened file or None if it has to be rewritten.
+    """
+    if not saved_refs or not refs or not os.path.isfile(file_name):
+        return None
+
+    target = fitz.Document(file_name)
+    if (
+        not target.can_save_incrementally()
+        or target.is_repaired
+        or target.page_count != len(saved_refs)
+    ):
+        target.close()
+        return None
+
+    return target
+
+
+def _prepare_incremental_target(
+    target: fitz.Document, refs: Sequence[PageRef], saved_refs: Sequence[PageRef]
+) -> Iterator[int]:
+    """
+    Rearrange an opened file to contain the given pages.
+
+    Pages of other sources are appended behind the existing pages, then all pages are
+    brought into order with a single `select`.
+
+    Yields:
+        int: The number of pages processed so far.
+    """
+    positions = _saved_positions(saved_refs)
+    yield from arrange_refs(target, refs, positions, SAVE_CHUNK_PAGES)
+
+
+def _saved_positions(saved_refs: Sequence[PageRef]) -> dict[PageRef, int]:
+    """Get the page number of each reference a file already contains."""
+    positions: dict[PageRef, int] = {}
+    for position, ref in enumerate(saved_refs):
+        positions.setdefault(ref, position)
+    return positions
+
+
+def _write_incremental(document: fitz.Document, file_name: str) -> None:
+    """Append the changes of a document to its file and flush them to the disk."""
+    document.save(file_name, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP)
+    _fsync(file_name)
+
+
+def _write_atomically(
+    document: fitz.Document,
+    file_name: str,
+    options: dict,
+    temp_name: Optional[str] = None,
+) -> None:
+    """Write a document to a temporary file, flush it and rename it to the destination."""
+    directory = os.path.dirname(os.path.abspath(file_name))
+    if temp_name is None:
+        temp_name = _create_temp_file(file_name)
+
+    options = dict(options)
+    try:
+        if options.pop("subset_fonts", False):
+            document.subset_fonts()
+        document.save(temp_name, **options)
+        _fsync(temp_name)
+        _copy_file_mode(file_name, temp_name)
+        os.replace(temp_name, file_name)
+    except BaseException:
+        # a failing cleanup mustn't hide the original error
+        with contextlib.suppress(OSError):
+            os.remove(temp_name)
+        raise
+
+    # persist the rename itself
+    dir_fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def _write_in_worker(
+    file_name: str,
+    temp_name: str,
+    pages_name: str,
+    plan: list[tuple[int, int]],
+    original_size: int,
+    options: dict,
+    connection: Connection,
+) -> None:
+    """
+    Arrange the stored pages according to the plan, with the pages of the file if it is
+    updated incrementally, write the result and report errors to the parent.
+    """
+    try:
+        if temp_name:
+            document = fitz.Document(pages_name or None)
+        else:
+            if _file_size(file_name) != original_size:
+                raise ValueError(f"{file_name} has been changed in the meantime")
+            document = fitz.Document(file_name)
+            if pages_name:
+                pages = fitz.Document(pages_name)
+                try:
+                    document.insert_pdf(pages)
+                finally:
+                    pages.close()
+
+        try:
+            apply_page_plan(document, plan)
+            if temp_name:
+                _write_atomically(document, file_name, options, temp_name)
+            else:
+                try:
+                    _write_incremental(document, file_name)
+                except BaseException:
+                    # drop a partially appended update so the file stays as it was
+                    _truncate(file_name, original_size)
+                    raise
+        finally:
+            document.close()
+    except Exception:  # pylint: disable=broad-except
+        connection.send(traceback.format_exc(limit=1))
+    finally:
+        connection.close()
+
+
+def _create_temp_file(file_name: str) -> str:
+    """Create an empty temporary file next to the given file."""
+    fd, temp_name = tempfile.mkstemp(
+        suffix=".pdf", dir=os.path.dirname(os.path.abspath(file_name))
+    )
+    os.close(fd)
+    return temp_name
+
+
+def _truncate(file_name: str, size: int) -> None:
+    """Cut a file back to the given size."""
+    with open(file_name, "rb+") as file:
+        file.truncate(size)
+
+
+def _fsync(file_name: str) -> None:
+    """Flush a file to the disk."""
+    with open(file_name, "rb+") as file:
+        os.fsync(file.fileno())
+
+
+def _copy_file_mode(file_name: str, temp_name: str) -> None:
+    """Give the temporary file the permissions of the file it replaces."""
+    if os.path.exists(file_name):
+        shutil.copymode(file_name, temp_name)
+    else:
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temp_name, 0o666 & ~umask)
+
+
+def _estimate_size(refs: Sequence[PageRef]) -> int:
+    """Estimate the size of a saved document from the sizes of its source files."""
+    pages_per_source: dict[int, tuple[fitz.Document, int]] = {}
+    for ref in refs:
+        source, pages = pages_per_source.get(id(ref.document), (ref.document, 0))
+        pages_per_source[id(ref.document)] = (source, pages + 1)
+
+    size = 0
+    for source, pages in pages_per_source.values():
+        if source.name and os.path.isfile(source.name) and source.page_count:
+            size += os.path.getsize(source.name) * pages // source.page_count
+
+    return size
+
+
+def _file_size(file_name: str) -> int:
+    """Get the size of a file, or 0 if it doesn't exist (anymore)."""
+    try:
+        return os.path.getsize(file_name)
+    except OSError:
+        return 0
+
+
+def _format_size(size: int) -> str:
+    """Format a file size in bytes for humans."""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+    return f"{size:.1f} GB"
@@ -1,9 +1,13 @@
 # -*- coding: utf-8 -*-
+import multiprocessing
 import os
 
 
 DIRNAME = os.path.dirname(__file__)
 
+# subcommands running without the GUI
+CLI_COMMANDS = ("merge", "select", "delete", "duplicate", "insert", "run", "info")
+
 # windows properties
 WINDOW_RATIO = 0.9423076923076923
 WINDOW_MIN_WIDTH_FACTOR = 0.62
@@ -12,11 +16,72 @@ WINDOW_MIN_HEIGHT_FACTOR = 0.56
 # import window properties
 IMPORT_WINDOW_HEIGHT_RATIO = 2.057
 
+# rendered page images shared by all views and documents
+PAGE_IMAGE_CACHE_BYTES = 512 * 1024**2
+# pages are rendered in the background in slices of at most this many seconds
+RENDER_TIME_SLICE = 0.02
+
+# undo and redo history
+HISTORY_MAX_PAGE_REFS = 100_000
+HISTORY_COALESCE_TIME = 1.0
+
+# saving
+SAVE_CHUNK_PAGES = 50
+# worker processes mustn't be forked from the multithreaded GUI process
+WORKER_START_METHOD = (
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+SAVE_POLL_INTERVAL = 100
+# options for fitz.Document.save, "subset_fonts" subsets the embedded fonts beforehand
+SAVE_PROFILES = {
+    "fast": {"garbage": 0},
+    "balanced": {"garbage": 3, "deflate": True},
+    "smallest": {
+        "garbage": 4,
+        "deflate": True,
+        "deflate_images": True,
+        "deflate_fonts": True,
+        "use_objstms": True,
+        "subset_fonts": True,
+    },
+}
+SAVE_DEFAULT_PROFILE = "balanced"
+
+# importing files, validated or converted to PDF pages in worker processes
+JPEG_EXTENSIONS = ("jpg", "jpeg")
+IMAGE_EXTENSIONS = JPEG_EXTENSIONS + ("png", "tif", "tiff", "bmp", "gif")
+CONVERTIBLE_EXTENSIONS = ("xps", "oxps", "epub", "cbz", "fb2")
+IMPORT_FILE_FILTER = {
+    "PDF-Files": "*.pdf",
+    "Images": [f"*.{extension}" for extension in IMAGE_EXTENSIONS],
+    "Documents": [f"*.{extension}" for extension in CONVERTIBLE_EXTENSIONS],
+}
+IMPORT_POLL_INTERVAL = 50
+# imported files collected at a time
+IMPORT_CHUNK_FILES = 20
+
+# watched files are checked every WATCH_POLL_INTERVAL milliseconds and reloaded once
+# they haven't changed for WATCH_SETTLE_TIME seconds
+WATCH_POLL_INTERVAL = 500
+WATCH_SETTLE_TIME = 1.0
+# bytes compared at the start and the end of a spooled copy, to tell whether its file
+# has only been appended to
+SPOOL_PROBE_SIZE = 64 * 1024
+
+# pages shared between instances over a local socket, one per user, placed in
+# $XDG_RUNTIME_DIR or the temporary directory
+CLIPBOARD_SOCKET_NAME = "pydfcat-{user}.sock"
+CLIPBOARD_SOCKET_TIMEOUT = 2.0
+
 # widgets properties
 # page view
 PAGE_X_PADDING = 5
 PAGE_Y_PADDING = 7
 PAGE_IPADDING = 5
+# distance in pixels the mouse has to move before pages are dragged
+PAGE_DRAG_THRESHOLD = 5
+# rows of the import preview rendered ahead above and below the visible ones
+PREVIEW_ROW_MARGIN = 1
 
 # toolbar
 TOOLBAR_HEIGHT = 40
@@ -54,3 +119,4 @@ CLIPB_TOOLBAR_IMAGE_HEIGHT = (
 # colors
 COLOR_CLOSE_RED = ("#C04C4B", "#A51F27")
 COLOR_SELECTED_BLUE = ("#3B8ED0", "#1F6AA5")
+COLOR_PLACEHOLDER_GRAY = ("#D0D0D0", "#404040")
@@ -1,39 +1,31 @@
 # -*- coding: utf-8 -*-
-import math
 import tkinter as tk
-from typing import Any, Callable
+from typing import Any, Callable, Sequence, Union
 
 import customtkinter as ctk
 import fitz  # PyMuPDF
-import os
 from PIL import Image
 
+from .icons import CLIPBOARD_ICONS
 from .loadingWindow import LoadingWindow
+from .rendering import RenderScheduler, page_key
+from .rowindex import RowOffsetIndex
 from .settings import (
-    CLIPB_TOOLBAR_IMAGE_HEIGHT,
-    CLIPB_TOOLBAR_IMAGE_WIDTH,
     CLIPB_TOOLBAR_PADDING,
     CLIPB_TOOLBAR_WIDGET_BORDER_SPACING,
     CLIPB_TOOLBAR_WIDGET_HEIGHT,
     CLIPB_TOOLBAR_WIDGET_WIDTH,
     COLOR_CLOSE_RED,
+    COLOR_PLACEHOLDER_GRAY,
     COLOR_SELECTED_BLUE,
-    DIRNAME,
     PAGE_IPADDING,
     PAGE_X_PADDING,
     PAGE_Y_PADDING,
 )
+from .tooltips import add_tooltip, bind_tooltip
 from .widgets import CollapsableFrame, DynamicScrollableFrame
 
 
-try:
-    from CTkToolTip import CTkToolTip
-
-    tooltip = True
-except ModuleNotFoundError:
-    tooltip = False
-
-
 class _PageView(DynamicScrollableFrame):
     """A class for displaying document pages within a scrollable frame."""
 
@@ -49,63 +41,263 @@ class _PageView(DynamicScrollableFrame):
 
         # data
         self._labels: list[ctk.CTkLabel] = []
+        self._row_index = RowOffsetIndex()
 
-    def _convert_page(self, page: fitz.Page) -> ctk.CTkImage:
+        # only the labels in sight hold a rendered image, all others a shared placeholder
+        self._thumbnails: set[ctk.CTkLabel] = set()
+        self._placeholders: dict[tuple[int, int], ctk.CTkImage] = {}
+        self._img_width = 0
+        self._update_scheduled = False
+
+        # the root outlives the view, so no callback is left behind when it closes
+        self._renderer = RenderScheduler(self._root().after)
+
+    def _create_page_label(
+        self, key: tuple[fitz.Document, int], rect: fitz.Rect
+    ) -> ctk.CTkLabel:
         """
-        Convert a given page object to a displayable Image.
+        Create a label showing a placeholder in the size of a page.
+
+        The page is only rendered while its label is in sight, see `_show_pages_in_sight`.
 
         Args:
-            page (fitz.Page): The page to convert to a CTkImage.
+            key (tuple[fitz.Document, int]): The document and number of the page, see
+                `page_key`.
+            rect (fitz.Rect): The size of the page.
 
         Returns:
-            ctk.CTkImage: The converted image.
+            ctk.CTkLabel: The label of the page.
         """
-        pix = page.get_pixmap()
-        mode = "RGBA" if pix.alpha else "RGB"
-        img = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+        if not self._img_width:
+            self._parent_canvas.update()
+            self._img_width = self._get_img_width()
 
-        self._parent_canvas.update()
-
-        ratio = img.size[0] / img.size[1]
-        img_width = self._parent_canvas.winfo_width() - 2 * (
-            PAGE_IPADDING + PAGE_X_PADDING
-        )
-        img_height = img_width / ratio
+        label = self._create_label(self._placeholder(rect))
+        label.page_key = key
+        label.page_rect = rect
+        return label
 
-        ctk_img = ctk.CTkImage(
-            light_image=img, dark_image=img, size=(int(img_width), int(img_height))
+    def _get_img_width(self) -> int:
+        """Get the width available for a page image within the canvas."""
+        return max(
+            1, self._parent_canvas.winfo_width() - 2 * (PAGE_IPADDING + PAGE_X_PADDING)
         )
 
-        return ctk_img
-
     def _place_label(self):
         """Pack all CTkLabels after clearing the scrollable frame."""
         for widget in self.winfo_children():
             widget.pack_forget()
 
         for label in self._labels:
-            label.pack(
-                expand=True,
-                fill="x",
-                ipadx=PAGE_IPADDING,
-                ipady=PAGE_IPADDING,
-                padx=PAGE_X_PADDING,
-                pady=(0, PAGE_Y_PADDING),
+            self._pack_label(label)
+        self.update()
+
+        self._update_row_index()
+        self._schedule_update()
+
+    @staticmethod
+    def _pack_label(label: ctk.CTkLabel, **kwargs) -> None:
+        """Pack a CTkLabel, e.g. `before` another label."""
+        label.pack(
+            expand=True,
+            fill="x",
+            ipadx=PAGE_IPADDING,
+            ipady=PAGE_IPADDING,
+            padx=PAGE_X_PADDING,
+            pady=(0, PAGE_Y_PADDING),
+            **kwargs,
+        )
+
+    def _placeholder(self, rect: fitz.Rect) -> ctk.CTkImage:
+        """Get a blank image in the size of a page, shared by all pages of that size."""
+        size = (
+            self._img_width,
+            max(1, int(self._img_width * rect.height / rect.width)),
+        )
+
+        if size not in self._placeholders:
+            light, dark = COLOR_PLACEHOLDER_GRAY
+            self._placeholders[size] = ctk.CTkImage(
+                light_image=Image.new("RGB", (1, 1), light),
+                dark_image=Image.new("RGB", (1, 1), dark),
+                size=size,
+            )
+        return self._placeholders[size]
+
+    def _schedule_update(self) -> None:
+        """Show the pages in sight once the pending events are handled."""
+        if not self._update_scheduled:
+            self._update_scheduled = True
+            self.after_idle(self._show_pages_in_sight)
+
+    def _show_pages_in_sight(self) -> None:
+        """
+        Render the pages in sight and release the images of all others.
+
+        The images stay in the shared page image cache, so scrolling back only renders
+        them again if the cache had to make room for other pages.
+        """
+        self._update_scheduled = False
+        if not self._labels:
+            return
+
+        # the width changes e.g. when the scrollbar appears
+        if self._get_img_width() != self._img_width:
+            self._img_width = self._get_img_width()
+            self._thumbnails.clear()
+            for label in self._labels:
+                label.configure(image=self._placeholder(label.page_rect))
+            self.update_idletasks()
+            self._update_row_index()
+
+        top = self._parent_canvas.canvasy(0)
+        bottom = top + self._parent_canvas.winfo_height()
+        in_sight = self._labels[
+            self._row_index.row_at(top) : self._row_index.row_at(bottom) + 1
+        ]
+        wanted = {label.page_key for label in in_sight}
+
+        for label in self._thumbnails.difference(in_sight):
+            label.configure(image=self._placeholder(label.page_rect))
+            if label.page_key not in wanted:
+                self._renderer.cancel(*label.page_key)
+        self._thumbnails.intersection_update(in_sight)
+
+        # the pages further down are requested first, so the ones on top render first
+        for label in reversed(in_sight):
+            if label not in self._thumbnails:
+                self._thumbnails.add(label)
+                self._renderer.request(
+                    *label.page_key,
+                    lambda image, label=label: self._show_thumbnail(label, image),
+                )
+
+    def _show_thumbnail(self, label: ctk.CTkLabel, image: Image.Image) -> None:
+        """Replace the placeholder of a page in sight with its rendered image."""
+        if label in self._thumbnails:
+            size = label.cget("image").cget("size")
+            label.configure(
+                image=ctk.CTkImage(light_image=image, dark_image=image, size=size)
             )
-            self.update()
+
+    def _dynamic_vertical_scrollbar(self, x: float, y: float) -> None:
+        """
+        Dynamically handle the vertical scrollbar and render the pages scrolled into sight.
+
+        Parameters:
+            x (float): The x-coordinate.
+            y (float): The y-coordinate.
+        """
+        super()._dynamic_vertical_scrollbar(x, y)
+        self._schedule_update()
+
+    def _row_height(self, label: ctk.CTkLabel) -> int:
+        """Get the height a packed label takes up including its padding."""
+        return label.winfo_height() + round(self._apply_widget_scaling(PAGE_Y_PADDING))
+
+    def _update_row_index(self) -> None:
+        """Rebuild the row offset index from the packed labels."""
+        self._row_index.rebuild(self._row_height(label) for label in self._labels)
+
+    def _page_of_label(self, label: ctk.CTkLabel) -> int:
+        """Get the page number of a label from its offset in O(log n)."""
+        return self._row_index.row_at(label.winfo_y())
+
+    def reorder_pages(self, order: list[int]) -> None:
+        """
+        Rearrange the pages in the view, reusing their labels and rendered images.
+
+        Args:
+            order (list[int]): The old page number of each page in the new order.
+        """
+        self.clear_selection()
+
+        self._labels = [self._labels[index] for index in order]
+        self._place_label()
+
+    def delete_pages(self, page_nums: list[int]) -> None:
+        """
+        Delete specific pages from the view.
+
+        Args:
+            page_nums (list[int]): The page numbers to delete.
+        """
+        for n, page_num in enumerate(sorted(page_nums)):
+            label = self._labels.pop(page_num - n)
+            self._thumbnails.discard(label)
+            label.destroy()
+
+        self._row_index.delete(page_nums)
+        self._schedule_update()
+
+    def insert_pages(self, pos: int, pages: Sequence[fitz.Page]) -> None:
+        """
+        Insert pages at a given position in the view.
+
+        The pages are shown as placeholders of their size, only the pages in sight are
+        rendered.
+
+        Args:
+            pos (int): The position to insert the pages.
+                Use -1 to insert at the end.
+            pages (Sequence[fitz.Page]): The pages to be inserted.
+        """
+        labels = [self._create_page_label(page_key(page), page.rect) for page in pages]
+        if not labels:
+            return
+
+        if pos == -1:
+            pos = len(self._labels)
+        # only the new labels are packed, in front of the label now following them
+        following = {"before": self._labels[pos]} if pos < len(self._labels) else {}
+        for label in labels:
+            self._pack_label(label, **following)
+        self._labels[pos:pos] = labels
+        self.update_idletasks()
+
+        self._row_index.insert(pos, [self._row_height(label) for label in labels])
+        self._schedule_update()
+
+    def clear(self) -> None:
+        """Clear all child widgets from the container."""
+        self._renderer.clear()
+        self._thumbnails.clear()
+        self._placeholders.clear()
+        self._img_width = 0
+
+        for widget in self.winfo_children():
+            widget.destroy()
+
+        self._labels.clear()
+        self._row_index.rebuild(())
+
+        self.update_idletasks()
+
+    def destroy(self) -> None:
+        """Cancel the pending page images and destroy the widget."""
+        self._renderer.clear()
+        super().destroy()
 
 
 class SidePanel(CollapsableFrame):
     """Side panel to preview the file and the selection."""
 
     def __init__(
-        self, parent: Any, jump_to_page_command: Callable, import_file_command: Callable
+        self,
+        parent: Any,
+        jump_to_page_command: Callable,
+        import_file_command: Callable,
+        import_folder_command: Callable,
     ):
         """
         Initialize the Side Panel.
 
         Args:
             parent (Any): The parent widget.
+            jump_to_page_command (Callable): A function jumping to a page in the editor.
+            import_file_command (Callable): A function importing a file to the clipboard.
+            import_folder_command (Callable): A function importing a folder of images to
+                the clipboard.
         """
         super().__init__(parent=parent, alignment="left", fg_color="transparent")
 
@@ -124,18 +316,23 @@ class SidePanel(CollapsableFrame):
 
         # clipboard tab
         self.clipboard = _ClipboardPanel(
-            parent=self.tabview.tab("Clipboard"), open_file_command=import_file_command
+            parent=self.tabview.tab("Clipboard"),
+            open_file_command=import_file_command,
+            open_folder_command=import_folder_command,
         )
         self.clipboard.pack(expand=True, fill="both")
 
     def get_new_document(
-        self, document: fitz.Document, loading_window: LoadingWindow
+        self,
+        document: Union[fitz.Document, Sequence[fitz.Page]],
+        loading_window: LoadingWindow,
     ) -> None:
         """
         Load a new PDF document in the Side Panel.
 
         Args:
-            document (fitz.Document): The PDF document to load.
+            document (Union[fitz.Document, Sequence[fitz.Page]]):
+                The PDF document or the pages to load.
             loading_window (LoadingWindow): Window for loading animation.
         """
         self.tabview.set("Navigator")
@@ -158,13 +355,16 @@ class _NavigatorPanel(ctk.CTkFrame):
         self.document_view = _NavigatorPageView(self, jump_to_page_command)
 
     def get_new_document(
-        self, document: fitz.Document, loading_window: LoadingWindow
+        self,
+        document: Union[fitz.Document, Sequence[fitz.Page]],
+        loading_window: LoadingWindow,
     ) -> None:
         """
         Load a new PDF document.
 
         Args:
-            document (fitz.Document): The PDF document to load.
+            document (Union[fitz.Document, Sequence[fitz.Page]]):
+                The PDF document or the pages to load.
             loading_window (LoadingWindow): Window for loading animation.
         """
         # place page view widget
@@ -190,13 +390,22 @@ class _NavigatorPanel(ctk.CTkFrame):
         """
         self.document_view.duplicate_pages(page_numbers)
 
-    def insert_pages(self, position: int, pages: fitz.Document) -> None:
+    def reorder_pages(self, order: list[int]) -> None:
+        """
+        Rearrange the pages in the document view.
+
+        Args:
+            order (list[int]): The old page number of each page in the new order.
+        """
+        self.document_view.reorder_pages(order)
+
+    def insert_pages(self, position: int, pages: Sequence[fitz.Page]) -> None:
         """
         Insert pages from another document at a given position in the document view.
 
         Args:
             position (int): The position to insert the pages.
-            pages (fitz.Document): The pages to be inserted.
+            pages (Sequence[fitz.Page]): The pages to be inserted.
         """
         self.document_view.insert_pages(position, pages)
 
@@ -230,24 +439,24 @@ class _NavigatorPageView(_PageView):
         self._jump_to_page = jump_page_command
 
     def load_pages(
-        self, document: fitz.Document, loading_window: LoadingWindow
+        self,
+        document: Union[fitz.Document, Sequence[fitz.Page]],
+        loading_window: LoadingWindow,
     ) -> None:
         """
         Load and display the pages of a document.
 
         Parameters:
-            document (fitz.Document): The document to load the pages from.
+            document (Union[fitz.Document, Sequence[fitz.Page]]):
+                The document or the pages to load.
             loading_window (LoadingWindow): Window for loading animation.
         """
         loading_window.aim(percentage=0.5, absolut=len(document) + 1)
         self.clear()
 
         for page in document:
-            # Convert the page to an image
-            image = self._convert_page(page)
-
-            # Create a labeled image widget and pack it
-            label = self._create_label(image)
+            # Create a labeled placeholder of the page, it is rendered once it is in sight
+            label = self._create_page_label(page_key(page), page.rect)
 
             self._labels.append(label)
 
@@ -261,31 +470,12 @@ class _NavigatorPageView(_PageView):
 
         loading_window.add()
 
-        # updates the first few pages so the scrollbar wound overlaps with the images
-        if self.winfo_height() > self._parent_canvas.winfo_height():
-            self._update_pages_in_sight(document)
-
     def _create_label(self, image: ctk.CTkImage) -> ctk.CTkLabel:
         """Create a CTkLabel for the given CTkImage along with corresponding bindings."""
         label = ctk.CTkLabel(self, image=image, text="")
         label.bind("<Button-1>", command=self._select_page)
         return label
 
-    def _update_pages_in_sight(self, document: fitz.Document) -> None:
-        """
-        Update the visible pages based on the current canvas size and document content.
-
-        Args:
-            document (fitz.Document): The document whose pages are being displayed.
-        """
-        page_in_sight = math.ceil(
-            self._parent_canvas.winfo_height() / self.winfo_children()[0].winfo_height()
-        )
-
-        for index in range(page_in_sight):
-            img = self._convert_page(document[index])
-            self._labels[index].configure(image=img)
-
     def _select_page(self, event: tk.Event) -> None:
         """Select a page with a single click and jumps to it in the main editor."""
         self.clear_selection()
@@ -294,20 +484,10 @@ class _NavigatorPageView(_PageView):
 
         ctk_label.configure(fg_color=COLOR_SELECTED_BLUE)
 
-        page_num = ctk_label.winfo_y() // ctk_label.winfo_height()
+        page_num = self._page_of_label(ctk_label)
 
         self._jump_to_page(page_num)
 
-    def delete_pages(self, page_nums: list[int]) -> None:
-        """
-        Delete specific pages from the view.
-
-        Args:
-            page_nums (list[int]): The page numbers to delete.
-        """
-        for n, page_num in enumerate(page_nums):
-            self._labels.pop(page_num - n).pack_forget()
-
     def duplicate_pages(self, page_nums: list[int]) -> None:
         """
         Duplicate specific pages in the view.
@@ -315,23 +495,14 @@ class _NavigatorPageView(_PageView):
         Args:
             page_nums (list[int]): The page numbers to duplicate.
         """
-        # TODO: What if page numbers aren't contiguous?
+        # the copies are inserted behind the last page, so the labels of the duplicated
+        # pages keep their positions even if the page numbers aren't contiguous
         position = max(page_nums) + 1
-        for n, page_num in enumerate(page_nums):
-            label = self._create_label(self._labels[page_num].cget("image"))
-            self._labels.insert(position + n, label)
-        self._place_label()
-
-    def insert_pages(self, pos: int, pages: fitz.Document) -> None:
-        """
-        Insert pages from another document at a given position in the view.
-
-        Args:
-            pos (int): The position to insert the pages.
-            pages (fitz.Document): The pages to be inserted.
-        """
-        self._labels[pos:pos] = [
-            self._create_label(self._convert_page(page)) for page in pages
+        self._labels[position:position] = [
+            self._create_page_label(
+                self._labels[num].page_key, self._labels[num].page_rect
+            )
+            for num in page_nums
         ]
         self._place_label()
 
@@ -340,15 +511,6 @@ class _NavigatorPageView(_PageView):
         for widget in self.winfo_children():
             widget.configure(fg_color=widget.cget("bg_color"))
 
-    def clear(self) -> None:
-        """Clear all child widgets from the container."""
-        for widget in self.winfo_children():
-            widget.destroy()
-
-        self._labels.clear()
-
-        self.update_idletasks()
-
 
 class _ClipboardPanel(ctk.CTkFrame):
     """
@@ -358,12 +520,21 @@ class _ClipboardPanel(ctk.CTkFrame):
     It's intended to be used internally within the Clipboard class.
     """
 
-    def __init__(self, parent: Any, open_file_command: Callable, **kwargs):
+    def __init__(
+        self,
+        parent: Any,
+        open_file_command: Callable,
+        open_folder_command: Callable,
+        **kwargs,
+    ):
         """
         Initialize the _ClipboardPanel.
 
         Args:
             parent: The parent widget.
+            open_file_command (Callable): A function opening a file to the clipboard.
+            open_folder_command (Callable): A function opening a folder of images to the
+                clipboard, executed on shift-click of the open button.
             **kwargs: Configuration arguments for ctk.CTkFrame.
         """
         super().__init__(master=parent, **kwargs, fg_color="transparent")
@@ -380,9 +551,12 @@ class _ClipboardPanel(ctk.CTkFrame):
         self.open_file_button = ClipboardToolBarButton(
             self.toolbar,
             button_type="open",
-            tooltip_message="open file to clipboard",
+            tooltip_message="open file to clipboard (shift: folder of images)",
             command=open_file_command,
         )
+        self.open_file_button.bind(
+            "<Shift-Button-1>", lambda _: self._open_folder(open_folder_command)
+        )
         self.open_file_button.pack(
             side="left",
             expand=True,
@@ -433,6 +607,11 @@ class _ClipboardPanel(ctk.CTkFrame):
             pady=CLIPB_TOOLBAR_PADDING,
         )
 
+    def _open_folder(self, open_folder_command: Callable) -> None:
+        """Open a folder of images to the clipboard, if opening files is enabled."""
+        if self.open_file_button.cget("state") != "disabled":
+            open_folder_command()
+
     def get_selection(self) -> set[int]:
         """
         Get the selected pages from the page view.
@@ -451,13 +630,22 @@ class _ClipboardPanel(ctk.CTkFrame):
         """
         self.page_view.delete_pages(page_numbers)
 
-    def insert_pages(self, position: int, pages: fitz.Document) -> None:
+    def reorder_pages(self, order: list[int]) -> None:
+        """
+        Rearrange the pages in the page view.
+
+        Args:
+            order (list[int]): The old page number of each page in the new order.
+        """
+        self.page_view.reorder_pages(order)
+
+    def insert_pages(self, position: int, pages: Sequence[fitz.Page]) -> None:
         """
         Insert pages from another document at a given position in the page view.
 
         Args:
             position (int): The position to insert the pages.
-            pages (fitz.Document): The pages to be inserted.
+            pages (Sequence[fitz.Page]): The pages to be inserted.
         """
         self.page_view.insert_pages(position, pages)
 
@@ -495,6 +683,16 @@ class _ClipboardPageView(_PageView):
     selected_pages: set[int] = set()
     _last_selected = 0
 
+    def __init__(self, parent, **kwargs) -> None:
+        """
+        Initialize the _ClipboardPageView.
+
+        Args:
+            parent: The parent widget.
+            **kwargs: Configuration arguments for DynamicScrollableFrame.
+        """
+        super().__init__(parent, **kwargs)
+
     def _create_label(self, image: ctk.CTkImage) -> ctk.CTkLabel:
         """Create CTkLabel for given CTkImage along corresponding bindings."""
         label = ctk.CTkLabel(self, image=image, text="")
@@ -511,7 +709,7 @@ class _ClipboardPageView(_PageView):
 
         ctk_label.configure(fg_color=COLOR_SELECTED_BLUE)
 
-        page_num = ctk_label.winfo_y() // ctk_label.winfo_height()
+        page_num = self._page_of_label(ctk_label)
 
         self._last_selected = page_num
         self.selected_pages.add(page_num)
@@ -520,7 +718,7 @@ class _ClipboardPageView(_PageView):
         """Select multiple pages by holding control."""
         ctk_label: ctk.CTkLabel = event.widget.master
 
-        page_num = ctk_label.winfo_y() // ctk_label.winfo_height()
+        page_num = self._page_of_label(ctk_label)
 
         if page_num in self.selected_pages:
             self._last_selected = 0
@@ -535,7 +733,7 @@ class _ClipboardPageView(_PageView):
         """Selection a range of pages by holding shift and clicking start and end."""
         ctk_label: ctk.CTkLabel = event.widget.master
 
-        page_num = ctk_label.winfo_y() // ctk_label.winfo_height()
+        page_num = self._page_of_label(ctk_label)
 
         if self._last_selected < page_num + 1:
             for label in self.winfo_children()[self._last_selected : page_num + 1]:
@@ -573,66 +771,8 @@ class _ClipboardPageView(_PageView):
         Args:
             page_nums (list[int]): The page numbers to delete.
         """
-        raise NotImplementedError()
-
-    def insert_pages(self, pos: int, pages: fitz.Document) -> None:
-        """
-        Insert pages from another document at a given position in the view.
-
-        Args:
-            pos (int): The position to insert the pages.
-                Use -1 to insert at the end.
-            pages (fitz.Document): The pages to be inserted.
-        """
-        for i, page in enumerate(pages):
-            label = self._create_label(self._convert_page(page))
-            if pos == -1:
-                self._labels.append(label)
-            else:
-                self._labels.insert(pos + i, label)
-        self._place_label()
-
-        # Updates the first few pages so the scrollbar would overlap with the images
-        if (
-            len(self._labels)
-            == self._parent_canvas.winfo_height() // label.winfo_height() + 1
-        ):
-            self._update_pages_in_sight()
-
-    def _update_pages_in_sight(self) -> None:
-        """Update the visible pages based on the current canvas size and clipboard content."""
-        page_in_sight = math.ceil(
-            self._parent_canvas.winfo_height() / self.winfo_children()[0].winfo_height()
-        )
-
-        images = [
-            self.__update_image_size(label.cget("image"))
-            for label in self._labels[:page_in_sight]
-        ]
-
-        for label, img in zip(self._labels[:page_in_sight], images):
-            label.configure(image=img)
-
-    def __update_image_size(self, img: ctk.CTkImage) -> ctk.CTkImage:
-        """
-        Update the size of a given CTkImage to fit the available canvas space.
-
-        Args:
-            img (ctk.CTkImage): The CTkImage to update.
-
-        Returns:
-            ctk.CTkImage: The updated CTkImage.
-        """
-        self._parent_canvas.update()
-        ratio = img.cget("size")[0] / img.cget("size")[1]
-        img_width = self._parent_canvas.winfo_width() - 2 * (
-            PAGE_IPADDING + PAGE_X_PADDING
-        )
-        img_height = img_width / ratio
-
-        img.configure(size=(int(img_width), int(img_height)))
-
-        return img
+        self.clear_selection()
+        super().delete_pages(page_nums)
 
     def clear(self):
         """
@@ -641,16 +781,12 @@ class _ClipboardPageView(_PageView):
         This method clears the view by destroying all child widgets (labels) and
         resetting data like selected pages and last selected page number.
         """
-        for widget in self.winfo_children():
-            widget.destroy()
-        self._labels.clear()
+        super().clear()
 
         # Clear data
         self.selected_pages.clear()
         self._last_selected = 0
 
-        self.update_idletasks()
-
 
 class ClipboardToolBarButton(ctk.CTkButton):
     """
@@ -681,65 +817,29 @@ class ClipboardToolBarButton(ctk.CTkButton):
         )
 
         self._type = button_type
-        if tooltip:
-            self.tooltip = CTkToolTip(self, message=tooltip_message)
+        # decoded once for all buttons, so toggling the state reads no files
+        self._icons = CLIPBOARD_ICONS.button(button_type)
+        add_tooltip(self, tooltip_message)
 
         self.disable()
 
     def enable(self):
         """Enable the button."""
-        img_outline = Image.open(
-            os.path.join(
-                DIRNAME,
-                f"assets/clipboard_icons/{self._type}/{self._type}-outline.png",
-            )
-        )
-        ctk_img_outline = ctk.CTkImage(
-            img_outline,
-            img_outline,
-            size=(CLIPB_TOOLBAR_IMAGE_WIDTH, CLIPB_TOOLBAR_IMAGE_HEIGHT),
-        )
-        img_solid = Image.open(
-            os.path.join(
-                DIRNAME,
-                f"assets/clipboard_icons/{self._type}/{self._type}-solid.png",
-            )
-        )
-        ctk_img_solid = ctk.CTkImage(
-            img_solid,
-            img_solid,
-            size=(CLIPB_TOOLBAR_IMAGE_WIDTH, CLIPB_TOOLBAR_IMAGE_HEIGHT),
-        )
+        icons = self._icons
 
-        self.configure(image=ctk_img_outline, state="normal")
-        self.bind("<Enter>", lambda _: self.configure(image=ctk_img_solid), add="+")
-        self.bind("<Leave>", lambda _: self.configure(image=ctk_img_outline), add="+")
+        self.configure(image=icons.outline, state="normal")
+        # replace the bindings of a previous call instead of adding to them
+        self.unbind("<Enter>")
+        self.unbind("<Leave>")
+        self.bind("<Enter>", lambda _: self.configure(image=icons.solid), add="+")
+        self.bind("<Leave>", lambda _: self.configure(image=icons.outline), add="+")
+        bind_tooltip(self)
 
     def disable(self):
         """Disable the button."""
-        img_disabled_light = Image.open(
-            os.path.join(
-                DIRNAME,
-                f"assets/clipboard_icons/{self._type}/{self._type}-disabled-light.png",
-            )
-        )
-        img_disabled_dark = Image.open(
-            os.path.join(
-                DIRNAME,
-                f"assets/clipboard_icons/{self._type}/{self._type}-disabled-dark.png",
-            )
-        )
-        ctk_img_outline_disabled = ctk.CTkImage(
-            img_disabled_light,
-            img_disabled_dark,
-            size=(CLIPB_TOOLBAR_IMAGE_WIDTH, CLIPB_TOOLBAR_IMAGE_HEIGHT),
-        )
-
-        self.configure(image=ctk_img_outline_disabled, state="disabled")
+        self.configure(image=self._icons.disabled, state="disabled")
         self.unbind("<Enter>")
         self.unbind("<Leave>")
 
         # the methods above also unbind the tooltip, so it has to be rebound
-        if tooltip:
-            self.bind("<Enter>", self.tooltip.on_enter)
-            self.bind("<Leave>", self.tooltip.on_leave)
+        bind_tooltip(self)
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import tempfile
+from typing import Iterable, Optional
+
+import fitz  # PyMuPDF
+
+from .pagetable import PageRef
+from .settings import SPOOL_PROBE_SIZE
+
+
+class DocumentSpool:
+    """
+    Moves documents that only exist in memory into temporary files.
+
+    MuPDF reads the pages of a file-backed document on demand, so the pages of a spooled
+    document only occupy memory while they are used, e.g. when they are pasted, rendered
+    or saved. The amount of pages kept, e.g. in the clipboard, is then limited by the
+    disk instead of the memory.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the DocumentSpool, the temporary directory is created on demand."""
+        self._directory: Optional[tempfile.TemporaryDirectory] = None
+        # the number of open documents using each temporary file
+        self._users: dict[str, int] = {}
+
+    def spool(self, document: fitz.Document) -> fitz.Document:
+        """
+        Move a document into a temporary file, if it only exists in memory.
+
+        Args:
+            document (fitz.Document): The document to spool.
+
+        Returns:
+            fitz.Document: The document reopened from the temporary file, or the given
+                document if it is already backed by a file.
+        """
+        if document.name:
+            return document
+
+        file_name = self._temp_file()
+        document.save(file_name)
+        return self._open(file_name)
+
+    def spool_file(self, file_name: str) -> fitz.Document:
+        """
+        Open a copy of a file, which isn't affected when the file is changed afterward.
+
+        Args:
+            file_name (str): The file to copy.
+
+        Returns:
+            fitz.Document: The document opened from the copy.
+        """
+        copy_name = self._temp_file()
+        shutil.copyfile(file_name, copy_name)
+        return self._open(copy_name)
+
+    def update_file(
+        self, copy: fitz.Document, file_name: str
+    ) -> Optional[tuple[fitz.Document, bytes]]:
+        """
+        Update the copy of a file, if the file has only been appended to since.
+
+        PDF files are extended by incremental updates, e.g. when a scanner adds pages,
+        which never change the bytes already written. Only the appended bytes are then
+        copied, and the updated copy shares its temporary file with the given copy, which
+        stays valid, since it only reads the bytes it was opened with.
+
+        The file is taken as appended to if it isn't shorter than the copy and starts and
+        ends the copied part with the same bytes, which include the trailer of the copy.
+
+        Args:
+            copy (fitz.Document): The latest copy of the file, returned by `spool_file`
+                or `update_file`.
+            file_name (str): The file the copy was made of.
+
+        Returns:
+            Optional[tuple[fitz.Document, bytes]]: The document opened from the updated
+                copy and the appended bytes, or None if the file was changed otherwise
+                or its update can't be read completely, e.g. while it is being written.
+        """
+        copy_name = copy.name
+        copied_size = os.path.getsize(copy_name)
+
+        with open(file_name, "rb") as file, open(copy_name, "rb+") as copied:
+            file_size = os.fstat(file.fileno()).st_size
+            if file_size < copied_size:
+                return None
+
+            for offset in {0, max(copied_size - SPOOL_PROBE_SIZE, 0)}:
+                size = min(SPOOL_PROBE_SIZE, copied_size - offset)
+                file.seek(offset)
+                copied.seek(offset)
+                if file.read(size) != copied.read(size):
+                    return None
+
+            file.seek(copied_size)
+            appended = file.read(file_size - copied_size)
+            copied.seek(copied_size)
+            copied.write(appended)
+
+        document = self._open(copy_name)
+        if document.needs_pass or document.is_repaired:
+            # the copy is restored, so it keeps mirroring the beginning of the file
+            self._close(document)
+            os.truncate(copy_name, copied_size)
+            return None
+
+        return document, appended
+
+    def spool_refs(self, refs: Iterable[PageRef]) -> list[PageRef]:
+        """
+        Spool the source documents of page references.
+
+        Args:
+            refs (Iterable[PageRef]): The page references.
+
+        Returns:
+            list[PageRef]: The references to the same pages in the spooled documents.
+        """
+        spooled: dict[fitz.Document, fitz.Document] = {}
+
+        result = []
+        for ref in refs:
+            if ref.document not in spooled:
+                spooled[ref.document] = self.spool(ref.document)
+            result.append(ref._replace(document=spooled[ref.document]))
+
+        return result
+
+    def release(self, document: fitz.Document) -> None:
+        """
+        Close a spooled document that isn't used anymore and remove its temporary file.
+
+        Args:
+            document (fitz.Document): The document returned by `spool` or `spool_file`.
+        """
+        file_name = document.name
+        if self._close(document):
+            return
+
+        try:
+            os.remove(file_name)
+        except OSError:
+            # e.g. still opened by another document on Windows, left to `clear`
+            pass
+
+    def _open(self, file_name: str) -> fitz.Document:
+        """Open a temporary file and count the document as one of its users."""
+        document = fitz.Document(file_name)
+        self._users[file_name] = self._users.get(file_name, 0) + 1
+        return document
+
+    def _close(self, document: fitz.Document) -> int:
+        """Close a spooled document and return the number of remaining users of its file."""
+        file_name = document.name
+        document.close()
+
+        users = self._users.pop(file_name, 1) - 1
+        if users:
+            self._users[file_name] = users
+        return users
+
+    def _temp_file(self) -> str:
+        """Create a new temporary file, in the temporary directory of the spool."""
+        if self._directory is None:
+            # open documents can't be removed on Windows, they are left to the system
+            self._directory = tempfile.TemporaryDirectory(
+                prefix="pydfcat-", ignore_cleanup_errors=True
+            )
+
+        handle, file_name = tempfile.mkstemp(suffix=".pdf", dir=self._directory.name)
+        os.close(handle)
+        return file_name
+
+    def clear(self) -> None:
+        """Remove the temporary files, the spooled documents mustn't be used afterward."""
+        if self._directory is not None:
+            self._directory.cleanup()
+            self._directory = None
+        self._users.clear()
@@ -2,31 +2,22 @@
 from typing import Any, Callable
 
 import customtkinter as ctk
-import os
 from CTkMessagebox import CTkMessagebox
-from PIL import Image, ImageTk
+from PIL import ImageTk
 
+from .icons import TOOLBAR_ICONS
 from .settings import (
     COLOR_CLOSE_RED,
-    DIRNAME,
+    SAVE_PROFILES,
     SCALING_FACTORS,
     TOOLBAR_COMBOBOX_WIDTH,
-    TOOLBAR_IMAGE_HEIGHT,
-    TOOLBAR_IMAGE_WIDTH,
     TOOLBAR_WIDGET_BORDER_SPACING,
     TOOLBAR_WIDGET_HEIGHT,
     TOOLBAR_WIDGET_WIDTH,
     TOOLBAR_X_PADDING,
     TOOLBAR_Y_PADDING,
 )
-
-
-try:
-    from CTkToolTip import CTkToolTip
-
-    tooltip = True
-except ModuleNotFoundError:
-    tooltip = False
+from .tooltips import add_tooltip, bind_tooltip
 
 
 class ToolBar(ctk.CTkFrame):
@@ -40,6 +31,8 @@ class ToolBar(ctk.CTkFrame):
         close_file_command: Callable,
         scale_page_command: Callable,
         scaling_variable: ctk.StringVar,
+        undo_command: Callable,
+        redo_command: Callable,
         cut_command: Callable,
         copy_command: Callable,
         past_command: Callable,
@@ -56,6 +49,8 @@ class ToolBar(ctk.CTkFrame):
             open_file_command (Callable): The command to open a file.
             scale_page_command (Callable): The command to scale the page.
             scaling_variable (ctk.StringVar): The variable for scaling selection.
+            undo_command (Callable): The command to undo the last edit.
+            redo_command (Callable): The command to redo the last undone edit.
             **kwargs: Configuration arguments for ctk.CTkFrame.
         """
         super().__init__(master=parent, **kwargs)
@@ -63,10 +58,23 @@ class ToolBar(ctk.CTkFrame):
         # functions
         self.close_file_command = close_file_command
 
+        # data
+        self._can_undo = False
+        self._can_redo = False
+
         # file widgets
         # Open button
         self.open_button = ToolBarButton(
-            self, "open", command=open_file_command, tooltip_message="open file"
+            self,
+            "open",
+            command=open_file_command,
+            tooltip_message="open file (shift: reload when it changes)",
+        )
+        self.open_button.bind(
+            "<Shift-Button-1>",
+            lambda _: self._shift_click(
+                self.open_button, open_file_command, watch=True
+            ),
         )
         self.open_button.pack(
             side="left", padx=TOOLBAR_X_PADDING, pady=TOOLBAR_Y_PADDING
@@ -84,7 +92,7 @@ class ToolBar(ctk.CTkFrame):
         self.undo_button = ToolBarButton(
             self,
             "undo",
-            command=lambda: print("undone"),
+            command=undo_command,
             state="disabled",
             tooltip_message="undo",
         )
@@ -96,7 +104,7 @@ class ToolBar(ctk.CTkFrame):
         self.redo_button = ToolBarButton(
             self,
             "redo",
-            command=lambda: print("redo_button"),
+            command=redo_command,
             state="disabled",
             tooltip_message="redo",
         )
@@ -115,8 +123,7 @@ class ToolBar(ctk.CTkFrame):
             width=TOOLBAR_COMBOBOX_WIDTH,
         )
         self.scaling_combobox.set(scaling_variable.get())
-        if tooltip:
-            CTkToolTip(self.scaling_combobox, message="page scaling")
+        add_tooltip(self.scaling_combobox, "page scaling")
         self.scaling_combobox.bind(
             "<Return>", lambda event: scale_page_command(scaling_variable.get())
         )
@@ -148,7 +155,11 @@ class ToolBar(ctk.CTkFrame):
             "copy",
             command=copy_command,
             state="disabled",
-            tooltip_message="copy to clipboard",
+            tooltip_message="copy to clipboard (shift: share with other windows)",
+        )
+        self.copy_button.bind(
+            "<Shift-Button-1>",
+            lambda _: self._shift_click(self.copy_button, copy_command, shared=True),
         )
         self.copy_button.pack(
             side="left", padx=TOOLBAR_X_PADDING, pady=TOOLBAR_Y_PADDING
@@ -160,7 +171,11 @@ class ToolBar(ctk.CTkFrame):
             "past",
             command=past_command,
             state="disabled",
-            tooltip_message="past from clipboard",
+            tooltip_message="past from clipboard (shift: from other windows)",
+        )
+        self.past_button.bind(
+            "<Shift-Button-1>",
+            lambda _: self._shift_click(self.past_button, past_command, shared=True),
         )
         self.past_button.pack(
             side="left", padx=TOOLBAR_X_PADDING, pady=TOOLBAR_Y_PADDING
@@ -172,7 +187,13 @@ class ToolBar(ctk.CTkFrame):
             "duplicate",
             command=duplicate_command,
             state="disabled",
-            tooltip_message="duplicate selection",
+            tooltip_message="duplicate selection (shift: independent copies)",
+        )
+        self.duplicate_button.bind(
+            "<Shift-Button-1>",
+            lambda _: self._shift_click(
+                self.duplicate_button, duplicate_command, deep=True
+            ),
         )
         self.duplicate_button.pack(
             side="left", padx=TOOLBAR_X_PADDING, pady=TOOLBAR_Y_PADDING
@@ -204,6 +225,12 @@ class ToolBar(ctk.CTkFrame):
             tooltip_message="close document",
         )
 
+    @staticmethod
+    def _shift_click(button: ctk.CTkButton, command: Callable, **kwargs) -> None:
+        """Execute the shift-click variant of a command, if its button is enabled."""
+        if button.cget("state") != "disabled":
+            command(**kwargs)
+
     def _ask_close_file(self):
         """Opens a message to confirm closing."""
         msg = CTkMessagebox(
@@ -223,8 +250,7 @@ class ToolBar(ctk.CTkFrame):
         self.open_button.enable()
         self.save_option_menu.enable()
 
-        self.undo_button.enable()
-        self.redo_button.enable()
+        self.update_history_buttons(self._can_undo, self._can_redo)
         self.scaling_combobox.configure(state="normal")
 
         self.cut_button.enable()
@@ -236,6 +262,26 @@ class ToolBar(ctk.CTkFrame):
             side="right", padx=TOOLBAR_X_PADDING, pady=TOOLBAR_Y_PADDING
         )
 
+    def update_history_buttons(self, can_undo: bool, can_redo: bool) -> None:
+        """
+        Enable or disable the undo and redo buttons according to the edit history.
+
+        Args:
+            can_undo (bool): Whether there is an edit to undo.
+            can_redo (bool): Whether there is an edit to redo.
+        """
+        self._can_undo = can_undo
+        self._can_redo = can_redo
+
+        for button, available in (
+            (self.undo_button, can_undo),
+            (self.redo_button, can_redo),
+        ):
+            if available and button.cget("state") == "disabled":
+                button.enable()
+            elif not available and button.cget("state") == "normal":
+                button.disable()
+
     def disable_all_except_open(self):
         """Disable the toolbar tools except the open button."""
         self.save_option_menu.disable()
@@ -288,77 +334,36 @@ class ToolBarButton(ctk.CTkButton):
         )
 
         self._button_type = button_type
+        # decoded once for all buttons, so toggling the state reads no files
+        self._icons = TOOLBAR_ICONS.button(button_type)
         self._tooltip_message = tooltip_message
-        if tooltip:
-            self.tooltip: CTkToolTip = CTkToolTip(self, message=self._tooltip_message)
+        add_tooltip(self, self._tooltip_message)
 
         if "state" in kwargs and kwargs["state"] == "disabled":
             self.disable()
         else:
             self.enable()
 
-            # bind tooltips to the icons
-            if tooltip:
-                self.bind("<Enter>", self.tooltip.on_enter)
-                self.bind("<Leave>", self.tooltip.on_leave)
-
     def enable(self):
         """Enable the button."""
-        img_outline = Image.open(
-            os.path.join(
-                DIRNAME,
-                f"assets/toolbar_icons/{self._button_type}/{self._button_type}-outline.png",
-            )
-        )
-        ctk_img_outline = ctk.CTkImage(
-            img_outline,
-            img_outline,
-            size=(TOOLBAR_IMAGE_WIDTH, TOOLBAR_IMAGE_HEIGHT),
-        )
-        img_solid = Image.open(
-            os.path.join(
-                DIRNAME,
-                f"assets/toolbar_icons/{self._button_type}/{self._button_type}-solid.png",
-            )
-        )
-        ctk_img_solid = ctk.CTkImage(
-            img_solid,
-            img_solid,
-            size=(TOOLBAR_IMAGE_WIDTH, TOOLBAR_IMAGE_HEIGHT),
-        )
+        icons = self._icons
 
-        self.configure(image=ctk_img_outline, state="normal")
-        self.bind("<Enter>", lambda _: self.configure(image=ctk_img_solid), add="+")
-        self.bind("<Leave>", lambda _: self.configure(image=ctk_img_outline), add="+")
+        self.configure(image=icons.outline, state="normal")
+        # replace the bindings of a previous call instead of adding to them
+        self.unbind("<Enter>")
+        self.unbind("<Leave>")
+        self.bind("<Enter>", lambda _: self.configure(image=icons.solid), add="+")
+        self.bind("<Leave>", lambda _: self.configure(image=icons.outline), add="+")
+        bind_tooltip(self)
 
     def disable(self):
         """Disable the button."""
-        img_disabled_light = Image.open(
-            os.path.join(
-                DIRNAME,
-                f"assets/toolbar_icons/{self._button_type}/{self._button_type}-disabled-light.png",
-            )
-        )
-        img_disabled_dark = Image.open(
-            os.path.join(
-                DIRNAME,
-                f"assets/toolbar_icons/{self._button_type}/{self._button_type}-disabled-dark.png",
-            )
-        )
-        ctk_img_outline_disabled = ctk.CTkImage(
-            img_disabled_light,
-            img_disabled_dark,
-            size=(TOOLBAR_IMAGE_WIDTH, TOOLBAR_IMAGE_HEIGHT),
-        )
-
-        self.configure(image=ctk_img_outline_disabled, state="disabled")
+        self.configure(image=self._icons.disabled, state="disabled")
         self.unbind("<Enter>")
         self.unbind("<Leave>")
 
         # the methods above also unbind the tooltip, so it has to be rebound
-        if tooltip:
-            self.bind("<Enter>", self.tooltip.on_enter)
-            self.bind("<Leave>", self.tooltip.on_leave)
+        bind_tooltip(self)
 
 
 class SaveOptionMenu(ctk.CTkOptionMenu):
@@ -381,14 +386,14 @@ class SaveOptionMenu(ctk.CTkOptionMenu):
         """
         super().__init__(
             master=parent,
-            values=["save", "save as"],
+            values=["save", "save as"]
+            + [f"save {profile}" for profile in SAVE_PROFILES],
             command=command,
             width=TOOLBAR_WIDGET_WIDTH,
             height=TOOLBAR_WIDGET_HEIGHT,
         )
 
-        if tooltip:
-            self.tooltip: CTkToolTip = CTkToolTip(self, message=tooltip_message)
+        add_tooltip(self, tooltip_message)
 
         self.disable()
 
@@ -400,20 +405,9 @@ class SaveOptionMenu(ctk.CTkOptionMenu):
     def enable(self):
         """Enable the option menu."""
         self.configure(state="normal")
-        img_save_solid = Image.open(
-            os.path.join(DIRNAME, "assets/toolbar_icons/save/save-outline.png")
-        )
-        img_save_solid = img_save_solid.resize(
-            (TOOLBAR_IMAGE_WIDTH, TOOLBAR_IMAGE_HEIGHT)
-        )
-        tk_img_save_outline = ImageTk.PhotoImage(img_save_solid)
-        img_save_solid = Image.open(
-            os.path.join(DIRNAME, "assets/toolbar_icons/save/save-solid.png")
-        )
-        img_save_solid = img_save_solid.resize(
-            (TOOLBAR_IMAGE_WIDTH, TOOLBAR_IMAGE_HEIGHT)
-        )
-        tk_img_save_solid = ImageTk.PhotoImage(img_save_solid)
+        tk_img_save_outline = TOOLBAR_ICONS.photo("save", "outline")
+        tk_img_save_solid = TOOLBAR_ICONS.photo("save", "solid")
+
         self._add_image_to_tk_label(tk_img_save_outline)
         self.bind(
             "<Enter>",
@@ -429,26 +423,12 @@ class SaveOptionMenu(ctk.CTkOptionMenu):
         self.configure(state="disabled")
 
         if ctk.get_appearance_mode() == "light":
-            img_save_disabled = Image.open(
-                os.path.join(
-                    DIRNAME, "assets/toolbar_icons/save/save-disabled-light.png"
-                )
-            )
+            tk_img_save_disabled = TOOLBAR_ICONS.photo("save", "disabled-light")
         else:
-            img_save_disabled = Image.open(
-                os.path.join(
-                    DIRNAME, "assets/toolbar_icons/save/save-disabled-dark.png"
-                )
-            )
-        img_save_disabled = img_save_disabled.resize(
-            (TOOLBAR_IMAGE_WIDTH, TOOLBAR_IMAGE_HEIGHT)
-        )
-        tk_img_save_disabled = ImageTk.PhotoImage(img_save_disabled)
+            tk_img_save_disabled = TOOLBAR_ICONS.photo("save", "disabled-dark")
         self._add_image_to_tk_label(tk_img_save_disabled)
         self.unbind("<Enter>")
         self.unbind("<Leave>")
 
         # the methods above also unbind the tooltip
-        if tooltip:
-            self.bind("<Enter>", self.tooltip.on_enter)
-            self.bind("<Leave>", self.tooltip.on_leave)
+        bind_tooltip(self)
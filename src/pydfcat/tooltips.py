@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+from typing import Any
+
+# the optional CTkToolTip package is only imported by `load_tooltips`, after the window has
+# been shown; None until then, False if the package isn't installed
+_tooltip_class: Any = None
+_pending: list[tuple[Any, str]] = []
+
+
+def add_tooltip(widget: Any, message: str) -> None:
+    """
+    Show a tooltip on a widget, as soon as tooltips have been loaded.
+
+    The tooltip is stored as the `tooltip` attribute of the widget.
+
+    Args:
+        widget (Any): The widget to show the tooltip on.
+        message (str): The tooltip message.
+    """
+    if _tooltip_class is None:
+        _pending.append((widget, message))
+    elif _tooltip_class:
+        widget.tooltip = _tooltip_class(widget, message=message)
+
+
+def bind_tooltip(widget: Any) -> None:
+    """
+    Bind the tooltip of a widget again, after its <Enter> and <Leave> events were unbound.
+
+    Args:
+        widget (Any): The widget with the tooltip.
+    """
+    tooltip = getattr(widget, "tooltip", None)
+    if tooltip is not None:
+        widget.bind("<Enter>", tooltip.on_enter, add="+")
+        widget.bind("<Leave>", tooltip.on_leave, add="+")
+
+
+def load_tooltips() -> None:
+    """Import the optional tooltip package and create the tooltips added so far."""
+    global _tooltip_class  # pylint: disable=global-statement
+
+    if _tooltip_class is not None:
+        return
+
+    try:
+        from CTkToolTip import CTkToolTip
+
+        _tooltip_class = CTkToolTip
+    except ModuleNotFoundError:
+        _tooltip_class = False
+
+    for widget, message in _pending:
+        if widget.winfo_exists():
+            add_tooltip(widget, message)
+    _pending.clear()
@@ -8,7 +8,10 @@ import customtkinter as ctk
 import fitz  # PyMuPDF
 from PIL import Image, ImageTk
 
+from .rendering import RenderScheduler, render_page
+from .rowindex import RowOffsetIndex
 from .settings import (
+    COLOR_PLACEHOLDER_GRAY,
     COLOR_SELECTED_BLUE,
     PAGE_IPADDING,
     PAGE_X_PADDING,
@@ -430,56 +433,67 @@ class _DocumentDisplay(DynamicScrollableFrame):
             **kwargs: Configuration arguments for DynamicScrollableFrame.
         """
         super().__init__(*args, **kwargs, orientation="vertical")
-        self._images: list[Image] = []
-        self._ctk_images: list[ctk.CTkImage] = []
         self._labels: list[ctk.CTkLabel] = []
         self.selected_pages: set[int] = set()
         self._last_selected = 0
         self._rows = 0
         self._columns = 0
+        self._row_index = RowOffsetIndex()
         self.scale = 1.0
 
-    @staticmethod
-    def _convert_page(page: fitz.Page) -> Image:
+        # all pages are shown in one size, only the labels in sight hold a rendered image
+        # and all others a shared placeholder
+        self._img_size = (0, 0)
+        self._thumbnails: set[ctk.CTkLabel] = set()
+        self._placeholders: dict[tuple[int, int], ctk.CTkImage] = {}
+        self._update_scheduled = False
+
+        # the root outlives the view, so no callback is left behind when it closes
+        self._renderer = RenderScheduler(self._root().after)
+
+    def _create_page_label(self, key: tuple[fitz.Document, int]) -> ctk.CTkLabel:
         """
-        Convert a PyMuPDF page to a PIL.Image.
+        Create a label showing a placeholder for a page.
 
-        Parameters:
-            page (fitz.Page): The PyMuPDF page to convert.
+        The page is only rendered while its label is in sight, see `_show_pages_in_sight`.
+
+        Args:
+            key (tuple[fitz.Document, int]): The document and number of the page, see
+                `page_key`.
 
         Returns:
-            Image: The PIL.Image representation of the page.
+            ctk.CTkLabel: The label of the page.
         """
-        pix = page.get_pixmap()
-        mode = "RGBA" if pix.alpha else "RGB"
-        img = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
-
-        return img
+        label = self._create_label(self._placeholder(self._img_size))
+        label.page_key = key
+        return label
 
-    def _create_images(
-        self, images: list[Image], size: tuple[int, int]
-    ) -> list[ctk.CTkImage]:
+    def _get_page_size(self, key: tuple[fitz.Document, int]) -> tuple[int, int]:
         """
-        Create a list of ctk.CTkImage objects from a list of PIL.Image objects.
+        Get the size all pages are shown in, fitting a page into the canvas and scaled.
 
-        Parameters:
-            images (list[Image]): The list of PIL.Image objects to be converted.
-            size (tuple[int, int]): The target size of the images.
+        Args:
+            key (tuple[fitz.Document, int]): The document and number of the page, see
+                `page_key`.
 
         Returns:
-            list[ctk.CTkImage]: A list of ctk.CTkImage objects created from the input images.
+            tuple[int, int]: The width and height of the page images.
         """
-        img_list = []
+        document, number = key
+        width, height = self._get_img_size(render_page(document[number]))
+        return max(1, int(width * self.scale)), max(1, int(height * self.scale))
 
-        for img in images:
-            ctk_img = ctk.CTkImage(
-                light_image=img,
-                dark_image=img,
-                size=(int(size[0] * self.scale), int(size[1] * self.scale)),
-            )
-            img_list.append(ctk_img)
+    def _set_page_size(self, size: tuple[int, int]) -> None:
+        """Show all pages in a new size, rendering the pages in sight again."""
+        self._img_size = size
+        self._renderer.clear()
+        self._thumbnails.clear()
+        self._placeholders.clear()
 
-        return img_list
+        placeholder = self._placeholder(size)
+        for label in self._labels:
+            label.configure(image=placeholder)
+        self._schedule_update()
 
     def _get_img_size(self, img: Image) -> tuple[int, int]:
         """
@@ -520,17 +534,27 @@ class _DocumentDisplay(DynamicScrollableFrame):
         label.bind("<Shift-Button-1>", command=self._select_pages_shift)
         return label
 
-    def _update_grid(self) -> None:
-        """Update the grid layout and labels based on the images."""
-        columns, _ = self._get_grid_dimension(self._ctk_images[0])
+    def _update_grid(self, start: int = 0) -> None:
+        """
+        Update the grid layout and labels based on the images.
+
+        Args:
+            start (int, optional): The first page whose label may have changed its cell,
+                the labels in front of it keep theirs unless the number of columns
+                changes. Default is 0.
+        """
+        columns, _ = self._get_grid_dimension(self._img_size)
+        relayout = max(1, columns) != self._columns
         self._columns = max(1, columns)
-        self._rows = max(len(self._images) // self._columns, 1)
+        self._rows = max(len(self._labels) // self._columns, 1)
 
         self.update()
         self.rowconfigure(tuple(range(self._columns)), weight=1)
         self.columnconfigure(tuple(range(self._rows)), weight=1)
 
-        for index, label in enumerate(self._labels):
+        start = 0 if relayout else start
+        for index in range(start, len(self._labels)):
+            label = self._labels[index]
             label.grid(
                 column=index % self._columns,
                 row=index // self._columns,
@@ -542,45 +566,146 @@ class _DocumentDisplay(DynamicScrollableFrame):
         self.update_idletasks()
 
         self._parent_canvas.configure(scrollregion=self._parent_canvas.bbox("all"))
+        if relayout:
+            self._update_row_index()
+        else:
+            self._update_row_count()
+        self._schedule_update()
+
+    def _row_height(self, row: int) -> int:
+        """Get the height of a grid row including the padding of its pages."""
+        return self.grid_bbox(column=0, row=row)[3]
+
+    def _grid_rows(self) -> int:
+        """Get the number of grid rows the labels take up."""
+        return math.ceil(len(self._labels) / self._columns) if self._columns else 0
+
+    def _update_row_index(self) -> None:
+        """Rebuild the row offset index from the current grid layout."""
+        self._row_index.rebuild(
+            self._row_height(row) for row in range(self._grid_rows())
+        )
+
+    def _update_row_count(self) -> None:
+        """
+        Add or remove the rows at the end of the row offset index after pages were
+        inserted or deleted, all pages being shown in the same size.
+        """
+        rows = self._grid_rows()
+        indexed = len(self._row_index)
+        if rows > indexed:
+            self._row_index.insert(
+                indexed, [self._row_height(row) for row in range(indexed, rows)]
+            )
+        elif rows < indexed:
+            self._row_index.delete(range(rows, indexed))
 
-    def _get_grid_dimension(self, img: ctk.CTkImage) -> tuple[int, int]:
+    def page_at_offset(self, offset: float) -> int:
+        """
+        Get the page at a vertical offset within the view in O(log n).
+
+        Args:
+            offset (float): The offset from the top edge of the first row.
+
+        Returns:
+            int: The number of the first page in the row at the given offset.
+        """
+        return self._row_index.row_at(offset) * self._columns
+
+    def _page_of_label(self, label: ctk.CTkLabel) -> int:
+        """Get the page number of a label from its position in the grid in O(log n)."""
+        row_num = self._row_index.row_at(label.winfo_y())
+        column_num = label.winfo_x() // label.winfo_width()
+        return row_num * self._columns + column_num
+
+    def _get_grid_dimension(self, size: tuple[int, int]) -> tuple[int, int]:
         """
         Get the grid dimensions based on the parent canvas size.
 
         Args:
-            img (ctk.CTkImage): The image object.
+            size (tuple[int, int]): The size of the page images.
 
         Returns:
             tuple[int, int]: The grid dimensions.
         """
         self._parent_canvas.update()
         return (
-            self._parent_canvas.winfo_width() // img.cget("size")[0],
-            self._parent_canvas.winfo_height() // img.cget("size")[1],
+            self._parent_canvas.winfo_width() // size[0],
+            self._parent_canvas.winfo_height() // size[1],
         )
 
-    def _update_pages_in_sight(self, document: fitz.Document) -> None:
-        """
-        Update the visible pages based on the current canvas size and document content.
-
-        Args:
-            document (fitz.Document): The document whose pages are being displayed.
-        """
-        page_in_sight = (
-            math.ceil(
-                self._parent_canvas.winfo_height()
-                / self.winfo_children()[0].winfo_height()
+    def _placeholder(self, size: tuple[int, int]) -> ctk.CTkImage:
+        """Get a blank image of the given size, shared by all pages of that size."""
+        if size not in self._placeholders:
+            light, dark = COLOR_PLACEHOLDER_GRAY
+            self._placeholders[size] = ctk.CTkImage(
+                light_image=Image.new("RGB", (1, 1), light),
+                dark_image=Image.new("RGB", (1, 1), dark),
+                size=size,
+            )
+        return self._placeholders[size]
+
+    def _schedule_update(self) -> None:
+        """Show the pages in sight once the pending events are handled."""
+        if not self._update_scheduled:
+            self._update_scheduled = True
+            self.after_idle(self._show_pages_in_sight)
+
+    def _show_pages_in_sight(self) -> None:
+        """
+        Render the pages in sight and release the images of all others.
+
+        The images stay in the shared page image cache, so scrolling back only renders
+        them again if the cache had to make room for other pages.
+        """
+        self._update_scheduled = False
+        if not self._labels or not self._columns:
+            return
+
+        top = self._parent_canvas.canvasy(0)
+        bottom = top + self._parent_canvas.winfo_height()
+        first_row = self._row_index.row_at(top)
+        last_row = self._row_index.row_at(bottom)
+        in_sight = self._labels[
+            first_row * self._columns : (last_row + 1) * self._columns
+        ]
+        wanted = {label.page_key for label in in_sight}
+
+        placeholder = self._placeholder(self._img_size)
+        for label in self._thumbnails.difference(in_sight):
+            label.configure(image=placeholder)
+            if label.page_key not in wanted:
+                self._renderer.cancel(*label.page_key)
+        self._thumbnails.intersection_update(in_sight)
+
+        # the pages further down are requested first, so the ones on top render first
+        for label in reversed(in_sight):
+            if label not in self._thumbnails:
+                self._thumbnails.add(label)
+                self._renderer.request(
+                    *label.page_key,
+                    lambda image, label=label: self._show_thumbnail(label, image),
+                )
+
+    def _show_thumbnail(self, label: ctk.CTkLabel, image: Image.Image) -> None:
+        """Replace the placeholder of a page in sight with its rendered image."""
+        if label in self._thumbnails:
+            label.configure(
+                image=ctk.CTkImage(
+                    light_image=image, dark_image=image, size=self._img_size
+                )
             )
-            * self._columns
-        )
 
-        self._images[:page_in_sight] = [self._convert_page(page) for page in document]
+    def _dynamic_vertical_scrollbar(self, x: float, y: float) -> None:
+        """
+        Dynamically handle the vertical scrollbar and show the pages scrolled into sight.
 
-        self._ctk_images[:page_in_sight] = self._create_images(
-            self._images[:page_in_sight], self._get_img_size(self._images[0])
-        )
-        for index, label in enumerate(self._labels[:page_in_sight]):
-            label.configure(image=self._ctk_images[index])
+        Parameters:
+            x (float): The x-coordinate.
+            y (float): The y-coordinate.
+        """
+        super()._dynamic_vertical_scrollbar(x, y)
+        self._schedule_update()
 
     def _select_page(self, event: tk.Event) -> None:
         """Select page with a single click."""
@@ -590,9 +715,7 @@ class _DocumentDisplay(DynamicScrollableFrame):
 
         ctk_label.configure(fg_color=COLOR_SELECTED_BLUE)
 
-        row_num = ctk_label.winfo_y() // ctk_label.winfo_height()
-        column_num = ctk_label.winfo_x() // ctk_label.winfo_width()
-        page_num = row_num * self._columns + column_num
+        page_num = self._page_of_label(ctk_label)
 
         self._last_selected = page_num
         self.selected_pages.add(page_num)
@@ -601,9 +724,7 @@ class _DocumentDisplay(DynamicScrollableFrame):
         """Select multiple pages by holding control."""
         ctk_label: ctk.CTkLabel = event.widget.master
 
-        row_num = ctk_label.winfo_y() // ctk_label.winfo_height()
-        column_num = ctk_label.winfo_x() // ctk_label.winfo_width()
-        page_num = row_num * self._columns + column_num
+        page_num = self._page_of_label(ctk_label)
 
         if page_num in self.selected_pages:
             self._last_selected = 0
@@ -618,15 +739,13 @@ class _DocumentDisplay(DynamicScrollableFrame):
         """Selection a range of pages by holding shift and clicking start and end."""
         ctk_label: ctk.CTkLabel = event.widget.master
 
-        row_num = ctk_label.winfo_y() // ctk_label.winfo_height()
-        column_num = ctk_label.winfo_x() // ctk_label.winfo_width()
-        page_num = row_num * self._columns + column_num
+        page_num = self._page_of_label(ctk_label)
 
         if self._last_selected < page_num + 1:
-            for label in self.winfo_children()[self._last_selected : page_num + 1]:
+            for label in self._labels[self._last_selected : page_num + 1]:
                 label.configure(fg_color=COLOR_SELECTED_BLUE)
         else:
-            for label in self.winfo_children()[page_num : self._last_selected]:
+            for label in self._labels[page_num : self._last_selected]:
                 label.configure(fg_color=COLOR_SELECTED_BLUE)
 
         self.selected_pages.update(set(range(self._last_selected, page_num + 1)))
@@ -640,17 +759,26 @@ class _DocumentDisplay(DynamicScrollableFrame):
 
     def clear(self) -> None:
         """Remove all widgets within the frame and reset data."""
+        self._renderer.clear()
+        self._thumbnails.clear()
+        self._placeholders.clear()
+        self._img_size = (0, 0)
+
         for widget in self.winfo_children():
             widget.destroy()
 
-        self._images.clear()
-        self._ctk_images.clear()
         self._labels.clear()
         self._rows = 0
         self._columns = 0
+        self._row_index.rebuild(())
 
         self.update_idletasks()
 
+    def destroy(self) -> None:
+        """Cancel the pending page images and destroy the widget."""
+        self._renderer.clear()
+        super().destroy()
+
 
 if __name__ == "__main__":
     window = ctk.CTk()
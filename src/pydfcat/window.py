@@ -1,22 +1,43 @@
 # -*- coding: utf-8 -*-
-import crossfiledialog
 import customtkinter as ctk
 import fitz  # PyMuPDF
 import os
-from io import BytesIO
+from typing import TYPE_CHECKING, Optional
 
-from .importWIndow import ImportWindow
+from CTkMessagebox import CTkMessagebox
+
+from .core import Editor
+from .history import Change, PagePermutation
 from .loadingWindow import LoadingWindow
 from .maineditor import MainEditor
+from .pageops import page_runs, parse_page_ranges
+from .pagetable import PageRef, PageTable, load_pages
+from .rendering import page_images
 from .settings import (
+    IMPORT_FILE_FILTER,
+    IMPORT_POLL_INTERVAL,
+    SAVE_DEFAULT_PROFILE,
+    SAVE_POLL_INTERVAL,
+    SAVE_PROFILES,
     TOOLBAR_HEIGHT,
     TOOLBAR_PADDING,
+    WATCH_POLL_INTERVAL,
     WINDOW_MIN_HEIGHT_FACTOR,
     WINDOW_MIN_WIDTH_FACTOR,
     WINDOW_RATIO,
 )
 from .sidepanel import SidePanel
 from .toolbar import ToolBar
+from .tooltips import load_tooltips
+from .workspace import DocumentSession
+
+# modules only needed by some actions are imported on their first use, so the window
+# shows up as early as possible
+if TYPE_CHECKING:
+    from .broker import ClipboardBroker
+    from .fileimport import ImportJob
+    from .filewatch import FileWatcher
+    from .saving import SaveJob
 
 
 class ApplicationWindow(ctk.CTk):
@@ -27,9 +48,21 @@ class ApplicationWindow(ctk.CTk):
         super().__init__()
 
         # data
-        self.file_name = ""
-        self.main_document = fitz.Document()
-        self.clipboard_document = fitz.Document()
+        # the documents, clipboard and history, the views follow their changes
+        self.editor = Editor()
+        self.editor.subscribe(self._show_change)
+        self.workspace = self.editor.workspace
+        self.save_profile = SAVE_DEFAULT_PROFILE
+        self._save_job: Optional["SaveJob"] = None
+        self._save_session: Optional[DocumentSession] = None
+        self._save_window: Optional[LoadingWindow] = None
+        self._tab_sessions: dict[str, DocumentSession] = {}
+        # pages shared with other instances of the application, see `clipboard_broker`
+        self._clipboard_broker: Optional["ClipboardBroker"] = None
+        # documents reloaded when their files change, see `watch_file`
+        self._watchers: dict[DocumentSession, "FileWatcher"] = {}
+        self._outdated: set[DocumentSession] = set()
+        self._watch_poll: Optional[str] = None
 
         # window properties
         WINDOW_HEIGHT = self.winfo_screenheight()
@@ -45,7 +78,8 @@ class ApplicationWindow(ctk.CTk):
 
         # layout
         self.rowconfigure(0, minsize=TOOLBAR_HEIGHT + 2 * TOOLBAR_PADDING, weight=0)
-        self.rowconfigure(1, weight=1)
+        self.rowconfigure(1, weight=0)
+        self.rowconfigure(2, weight=1)
         self.columnconfigure(0, weight=0)
         self.columnconfigure(1, weight=1)
 
@@ -56,17 +90,24 @@ class ApplicationWindow(ctk.CTk):
         self.main_editor = MainEditor(
             self,
             open_file_command=self.open_file_command,
+            move_pages_command=self.move_pages,
             scaling_variable=scaling_variable,
         )
-        self.main_editor.grid(column=1, row=1, sticky="news", padx=10, pady=10)
+        self.main_editor.grid(column=1, row=2, sticky="news", padx=10, pady=10)
+
+        # tabs of the open documents (only shown while documents are open)
+        self.document_tabs = ctk.CTkSegmentedButton(
+            self, values=[], command=self._switch_to_tab
+        )
 
         # sidebar
         self.sidebar = SidePanel(
             self,
             jump_to_page_command=self.main_editor.jump_to_page,
             import_file_command=self.import_file_to_clipboard,
+            import_folder_command=self.import_folder_to_clipboard,
         )
-        self.sidebar.grid(column=0, row=1, sticky="news", padx=10, pady=10)
+        self.sidebar.grid(column=0, row=1, rowspan=2, sticky="news", padx=10, pady=10)
 
         # toolbar
         self.toolbar = ToolBar(
@@ -76,6 +117,8 @@ class ApplicationWindow(ctk.CTk):
             close_file_command=self.close_file,
             scale_page_command=self.main_editor.update_scaling,
             scaling_variable=scaling_variable,
+            undo_command=self.undo,
+            redo_command=self.redo,
             cut_command=self.cut_selection,
             copy_command=self.copy_selection,
             past_command=self.past_selection,
@@ -92,8 +135,48 @@ class ApplicationWindow(ctk.CTk):
             sticky="news",
         )
 
-    def open_file_command(self) -> None:
-        """Open a PDF file and load it into the PDF editor application."""
+        # optional dependencies are loaded once the first frame has been painted
+        self.after_idle(self.after, 0, load_tooltips)
+
+    @property
+    def main_document(self) -> fitz.Document:
+        """The source document of the active tab."""
+        return self.workspace.active.document
+
+    @property
+    def main_pages(self) -> PageTable:
+        """The page table of the document in the active tab."""
+        return self.workspace.active.pages
+
+    @property
+    def clipboard_broker(self) -> "ClipboardBroker":
+        """The broker sharing pages with other instances, started on first use."""
+        if self._clipboard_broker is None:
+            from .broker import ClipboardBroker
+
+            self._clipboard_broker = ClipboardBroker()
+        return self._clipboard_broker
+
+    @property
+    def clipboard_pages(self) -> PageTable:
+        """The page table of the clipboard, shared by all open documents."""
+        return self.editor.clipboard
+
+    @property
+    def file_name(self) -> str:
+        """The file name of the document in the active tab."""
+        return self.workspace.active.file_name
+
+    def open_file_command(self, watch: bool = False) -> None:
+        """
+        Open a PDF file and load it into the PDF editor application.
+
+        Args:
+            watch (bool, optional): Whether to reload the document whenever the file is
+                changed by another program, see `watch_file`. Default is False.
+        """
+        import crossfiledialog
+
         self.toolbar.disable_all()
         self.sidebar.clipboard.disable_tools()
 
@@ -103,51 +186,213 @@ class ApplicationWindow(ctk.CTk):
         )
 
         if file_name:
-            self.open_file(file_name)
+            self.open_file(file_name, watch)
+        elif self.workspace:
+            self.enable_tools()
         else:
             self.toolbar.open_button.enable()
 
-    def open_file(self, file_name: str) -> None:
-        """Opens and distributes the given document to the panels of the editor."""
+    def open_file(self, file_name: str, watch: bool = False) -> None:
+        """
+        Opens the given document in a new tab and distributes it to the panels of the editor.
+
+        If the file is already open, its tab is shown instead.
+
+        Args:
+            file_name (str): The path of the file.
+            watch (bool, optional): Whether to reload the document whenever the file is
+                changed by another program, see `watch_file`. Default is False.
+        """
         if has_file_extension(file_name, "pdf"):
-            # Load the selected PDF file using fitz
-            pdf_document = fitz.Document(file_name)
+            session = self.editor.open(file_name)
+            if watch:
+                self.watch_file(session)
+            self._show_session(session, "Open file")
+        else:
+            # user selected a non-pdf file
+            self.main_editor.open_file_error()
+            if self.workspace:
+                self.enable_tools()
+            else:
+                self.toolbar.open_button.enable()
+
+    def open_file_when_shown(self, file_name: str, watch: bool = False) -> None:
+        """
+        Open a file once the main loop has painted the window, e.g. a file given on the
+        command line.
+
+        The file is loaded like one chosen in the file dialog, so the window appears
+        immediately and the loading window shows the progress, however large the
+        document is. The tools stay disabled until the file is shown.
 
-            loading_window = LoadingWindow(self, os.path.basename(file_name))
+        Args:
+            file_name (str): The path of the file.
+            watch (bool, optional): Whether to reload the document whenever the file is
+                changed by another program, see `watch_file`. Default is False.
+        """
+        self.toolbar.disable_all()
+        self.sidebar.clipboard.disable_tools()
 
-            # Update the PDF document in the main editor and sidebar
-            self.main_editor.get_new_document(pdf_document, loading_window)
-            self.sidebar.get_new_document(pdf_document, loading_window)
+        self.after_idle(self.after, 0, self.open_file, file_name, watch)
 
-            loading_window.destroy()
+    def watch_file(self, session: DocumentSession) -> None:
+        """
+        Reload a document whenever its file is changed by another program.
 
-            self.main_document = pdf_document
-            self.clipboard_document = fitz.Document()
+        Changes are noticed with inotify where available, otherwise by polling the file.
+        Only the changed and added pages are updated in the editor and the navigator, see
+        `Editor.reload`. Documents in other tabs are reloaded when their tab is shown.
 
-            # Update the application title with the file name
-            self.title(f"PyDFCat - Editing: {os.path.basename(file_name)}")
-            self.toolbar.enable_all()
-            self.sidebar.clipboard.enable_all()
+        Args:
+            session (DocumentSession): The document to watch.
+        """
+        from .filewatch import FileWatcher
+
+        if session in self._watchers:
+            return
+
+        self._watchers[session] = FileWatcher(session.file_name)
+        if self._watch_poll is None:
+            self._watch_poll = self.after(WATCH_POLL_INTERVAL, self._poll_watchers)
+
+    def _poll_watchers(self) -> None:
+        """Reload the watched documents whose files have changed and reschedule itself."""
+        if not self._watchers:
+            self._watch_poll = None
+            return
+
+        for session, watcher in self._watchers.items():
+            if watcher.poll():
+                self._outdated.add(session)
+
+        # the file is also changed by saving it, which is only compared afterward
+        if self.workspace.active in self._outdated and self._save_job is None:
+            self._reload(self.workspace.active)
+
+        self._watch_poll = self.after(WATCH_POLL_INTERVAL, self._poll_watchers)
+
+    def _reload(self, session: DocumentSession) -> None:
+        """Update a document to the current content of its file."""
+        self._outdated.discard(session)
+        try:
+            self.editor.reload(session)
+        except (OSError, RuntimeError, ValueError):
+            # e.g. the file is still incomplete, it is reloaded after the next change
+            pass
+
+    def _unwatch_file(self, session: DocumentSession) -> None:
+        """Stop watching the file of a document."""
+        watcher = self._watchers.pop(session, None)
+        if watcher is not None:
+            watcher.close()
+        self._outdated.discard(session)
+
+    def _show_session(self, session: DocumentSession, action: str) -> None:
+        """
+        Make a document the active one and load its pages into the editor and sidebar.
+
+        Pages that were shown before are taken from the shared page image cache, so
+        switching between documents doesn't render them again.
+
+        Args:
+            session (DocumentSession): The document to show.
+            action (str): The action shown in the loading window.
+        """
+        self.workspace.active = session
+        pages = session.pages.pages()
+
+        loading_window = LoadingWindow(self, session.title, action=action)
+
+        # Update the PDF document in the main editor and sidebar
+        self.main_editor.get_new_document(pages, loading_window)
+        self.sidebar.get_new_document(pages, loading_window)
+
+        loading_window.destroy()
+
+        self._update_tabs()
+
+        # Update the application title with the file name
+        watching = " (watching)" if session in self._watchers else ""
+        self.title(f"PyDFCat - Editing: {session.title}{watching}")
+        self.enable_tools()
+
+    def _switch_to_tab(self, tab: str) -> None:
+        """
+        Show the document of a tab.
+
+        Args:
+            tab (str): The name of the tab.
+        """
+        session = self._tab_sessions[tab]
+        if session is not self.workspace.active:
+            self.main_editor.clear_selection()
+            self._show_session(session, "Show")
+
+            if session in self._outdated and self._save_job is None:
+                self._reload(session)
+
+    def _update_tabs(self) -> None:
+        """Update the document tabs to the open documents and select the active one."""
+        self._tab_sessions.clear()
+        active_tab = ""
+
+        for session in self.workspace:
+            # tabs need unique names, even for files with the same name
+            tab = session.title
+            number = 2
+            while tab in self._tab_sessions:
+                tab = f"{session.title} ({number})"
+                number += 1
+
+            self._tab_sessions[tab] = session
+            if session is self.workspace.active:
+                active_tab = tab
+
+        self.document_tabs.configure(values=list(self._tab_sessions))
+        self.document_tabs.set(active_tab)
+
+        if self._tab_sessions:
+            self.document_tabs.grid(column=1, row=1, sticky="w", padx=10)
         else:
-            # user selected a non-pdf file
-            self.main_editor.open_file_error()
-            self.toolbar.open_button.enable()
+            self.document_tabs.grid_forget()
 
     def save_file_command(self, mode: str) -> None:
         """
         Save or prompt for a file name and location based on the chosen mode.
 
         Args:
-            mode (str): The save mode, either "save" or "save as" to prompt for a new file name.
+            mode (str): The save mode, either "save", "save as" to prompt for a new file name
+                or "save <profile>" to rewrite the file with a profile of `SAVE_PROFILES`,
+                e.g. "save smallest".
 
-        If mode is "save" and a file name is already assigned, the document is saved without
-        prompting.
+        If mode isn't "save as" and a file name is already assigned, the document is saved
+        without prompting.
         If mode is "save as" or no file name is assigned, a file dialog is shown for the user
         to choose a file name and location.
 
+        Saving back to the same file only appends the changes to it if possible, otherwise
+        the file is rewritten completely with the last chosen profile. Saving with a profile
+        always rewrites the whole file and makes it the profile for later saves.
+        The time and file sizes of the save are reported when it has finished.
+
+        The document is saved in the background from a snapshot of its current pages, so it
+        can be edited further while the save is in progress.
+
         The file is saved in PDF format.
         """
-        if not (mode == "save" and self.file_name):
+        if self._save_job is not None:
+            return
+
+        profile = mode.removeprefix("save ")
+        rewrite = profile in SAVE_PROFILES
+        if rewrite:
+            self.save_profile = profile
+
+        from .saving import SaveJob
+
+        if not (mode != "save as" and self.file_name):
+            import crossfiledialog
+
             file_name = crossfiledialog.save_file(
                 title="Choose a file name and location for your file:"
             )
@@ -156,78 +401,153 @@ class ApplicationWindow(ctk.CTk):
 
             if not os.path.splitext(file_name)[1] == ".pdf":
                 file_name += ".pdf"
-            self.file_name = file_name
 
-        self.main_document.save(self.file_name, garbage=4)
+            session = self.workspace.active
+            if file_name != session.file_name:
+                # the content of another file is unknown, so it has to be rewritten
+                session.saved_refs = []
+                # and it isn't the watched file anymore
+                self._unwatch_file(session)
+            session.file_name = file_name
+
+            self._update_tabs()
+            self.title(f"PyDFCat - Editing: {session.title}")
+
+        self._save_session = self.workspace.active
+        self._save_job = SaveJob(
+            self._save_session.pages,
+            self._save_session.file_name,
+            self._save_session.saved_refs,
+            incremental=not rewrite,
+            profile=self.save_profile,
+        )
 
-    def copy_selection(self) -> None:
+        # the save still reads the pages of the open documents and their spooled copies
+        self.toolbar.save_option_menu.disable()
+        self.toolbar.close_button.disable()
+        self._save_window = LoadingWindow(
+            self, os.path.basename(self.file_name), action="Save file"
+        )
+        self.after_idle(self._continue_save)
+
+    def _continue_save(self) -> None:
+        """Advance the running save job and reschedule itself until it has finished."""
+        job = self._save_job
+
+        if not job.step():
+            self._save_window.set_progress(job.progress)
+            # the worker process is only polled, copying pages continues right away
+            self.after(SAVE_POLL_INTERVAL if job.writing else 1, self._continue_save)
+            return
+
+        session = self._save_session
+
+        self._save_window.destroy()
+        self._save_window = None
+        self._save_job = None
+        self._save_session = None
+        self.toolbar.save_option_menu.enable()
+        self.toolbar.close_button.enable()
+
+        if job.error:
+            CTkMessagebox(
+                title="Save failed",
+                message=f"The file could not be saved:\n{job.error}",
+                icon="cancel",
+            )
+        else:
+            if job.file_name == session.file_name:
+                self.editor.mark_saved(session, job.refs)
+
+                # the file now contains the saved pages, which aren't reloaded
+                if session in self._watchers:
+                    self._watchers[session].ignore_changes()
+                    self._outdated.discard(session)
+
+            CTkMessagebox(title="File saved", message=str(job.report), icon="check")
+
+    def copy_selection(self, shared: bool = False) -> None:
         """
         Copy the selected content from the main editor to the clipboard.
 
-        This method copies the selected pages from the main document and inserts them
-        into the clipboard document, updating the clipboard and switching to the
-        Clipboard tab in the sidebar.
+        This method copies the references to the selected pages into the clipboard,
+        updating the clipboard and switching to the Clipboard tab in the sidebar.
+
+        Args:
+            shared (bool, optional): Whether to also share the pages with other instances
+                of the application, see `ClipboardBroker`. Default is False.
         """
         # Get the page numbers of the selected content
         page_numbers = sorted(self.main_editor.get_selection())
 
         if page_numbers:
-            # Get document pages and make a document copy
-            doc_buffer = BytesIO(self.main_document.write(garbage=4))
-            pages = fitz.Document(stream=doc_buffer, filetype="pdf")
-            pages.select(page_numbers)
-
-            # Insert selected pages into the clipboard document
-            self.clipboard_document.insert_pdf(pages)
+            # Copy the page references into the clipboard, the clipboard view follows
+            refs = self.editor.copy(page_numbers)
 
             # Switch to the Clipboard tab in the sidebar
             self.sidebar.tabview.set("Clipboard")
 
-            # Update the clipboard with the copied pages
-            self.sidebar.clipboard.insert_pages(-1, pages)
-
             # Clear the selection in the main editor
             self.main_editor.clear_selection()
 
+            if shared:
+                self._share_pages(refs)
+
+    def _share_pages(self, refs: list[PageRef]) -> None:
+        """
+        Share pages with other instances of the application.
+
+        Args:
+            refs (list[PageRef]): The references to the pages to share.
+        """
+        if not self.clipboard_broker.available():
+            CTkMessagebox(
+                title="Sharing failed",
+                message="Sharing pages isn't supported on this system.",
+                icon="cancel",
+            )
+            return
+
+        try:
+            self.clipboard_broker.publish(refs)
+        except OSError as error:
+            CTkMessagebox(
+                title="Sharing failed",
+                message=f"The pages could not be shared:\n{error}",
+                icon="cancel",
+            )
+
     def cut_selection(self) -> None:
         """
         Cut the selected content from the main editor and place it in the clipboard.
 
-        This method cuts the selected pages from the main document, inserts them into
-        the clipboard document, and updates the editors and navigators accordingly.
+        This method moves the references to the selected pages from the main document
+        into the clipboard, and updates the editors and navigators accordingly.
         """
         # Get the page numbers of the selected content
         page_numbers = sorted(self.main_editor.get_selection())
 
         if page_numbers:
-            # Get document pages and make a document copy
-            doc_buffer = BytesIO(self.main_document.write(garbage=4))
-            pages = fitz.Document(stream=doc_buffer, filetype="pdf")
-            pages.select(page_numbers)
-
-            # Insert selected pages into the clipboard document
-            self.clipboard_document.insert_pdf(pages)
-
-            # Delete the selected pages from the main document
-            self.main_document.delete_pages(page_numbers)
+            # Move the page references from the main document into the clipboard, the
+            # main editor, navigator and clipboard follow
+            self.editor.cut(page_numbers)
 
             # Switch to the Clipboard tab in the sidebar
             self.sidebar.tabview.set("Clipboard")
 
-            # Update the main editor, navigator, and clipboard
-            self.main_editor.delete_pages(page_numbers)
-            self.sidebar.navigator.delete_pages(page_numbers)
-            self.sidebar.clipboard.insert_pages(-1, pages)
-
             # Clear the selection in the main editor
             self.main_editor.clear_selection()
 
-    def past_selection(self) -> None:
+    def past_selection(self, shared: bool = False) -> None:
         """
         Paste the selected content from the clipboard into the main document.
 
         This method selects content from the clipboard, inserts it into the
         main document, and updates the editors accordingly.
+
+        Args:
+            shared (bool, optional): Whether to paste the pages shared by another instance
+                of the application instead, see `ClipboardBroker`. Default is False.
         """
         # Get the selected content from the main editor
         main_page_numbers = self.main_editor.get_selection()
@@ -238,53 +558,63 @@ class ApplicationWindow(ctk.CTk):
 
         # Determine the insert index for the clipboard content
         insert_index = max(main_page_numbers) + 1
-        clipboard_page_numbers = sorted(self.sidebar.clipboard.get_selection())
 
-        if clipboard_page_numbers:
-            # Get document pages from the clipboard and make a document copy
-            doc_buffer = BytesIO(self.clipboard_document.write(garbage=4))
-            pages = fitz.Document(stream=doc_buffer, filetype="pdf")
-            pages.select(clipboard_page_numbers)
-
-            # Insert clipboard pages into the main document
-            self.main_document.insert_pdf(pages, start_at=insert_index)
-
-            # Update the main editor with the inserted pages
-            self.main_editor.insert_pages(insert_index, pages)
+        if shared:
+            refs = self._fetch_shared_pages()
+        else:
+            refs = self.clipboard_pages.refs(
+                sorted(self.sidebar.clipboard.get_selection())
+            )
 
-            # Update the navigator in the sidebar
-            self.sidebar.navigator.insert_pages(insert_index, pages)
+        if refs:
+            # Insert the clipboard page references into the main document, the main
+            # editor and navigator follow
+            self.editor.paste(insert_index, refs)
 
             # Select the inserted range in the main editor
-            self.main_editor.select_range(
-                insert_index, insert_index + len(clipboard_page_numbers)
-            )
+            self.main_editor.select_range(insert_index, insert_index + len(refs))
 
             # Jump to the page where the clipboard content was inserted
             self.main_editor.jump_to_page(insert_index)
 
         return None
 
-    def duplicate_selection(self):
+    def _fetch_shared_pages(self) -> list[PageRef]:
+        """
+        Get the pages shared by another instance of the application.
+
+        Returns:
+            list[PageRef]: References to the shared pages, empty if there are none or they
+                could not be fetched.
+        """
+        try:
+            return self.clipboard_broker.fetch()
+        except (OSError, ValueError) as error:
+            CTkMessagebox(
+                title="Pasting failed",
+                message=f"The shared pages could not be pasted:\n{error}",
+                icon="cancel",
+            )
+            return []
+
+    def duplicate_selection(self, deep: bool = False):
         """
         Duplicate the selected content in the main editor.
 
-        This method duplicates the selected pages in the main document and updates
-        the editors and navigators accordingly.
+        This method duplicates the selected pages in the main document in one batch and
+        updates the editors and navigators accordingly.
+
+        Args:
+            deep (bool, optional): Whether to save the copies as independent pages instead
+                of sharing the page objects of the duplicated pages. Default is False.
         """
         # Get the page numbers of the selected content
         page_numbers = sorted(self.main_editor.get_selection())
 
         if page_numbers:
-            # Duplicate the selected pages in the main document
-            for page_number, n in enumerate(page_numbers):
-                self.main_document.fullcopy_page(page_number + n, page_number + n + 1)
-
-            # Update the main editor with duplicated pages
-            self.main_editor.duplicate_pages(page_numbers)
-
-            # Duplicate the pages in the sidebar navigator
-            self.sidebar.navigator.duplicate_pages(page_numbers)
+            # Duplicate the selected page references in the main document, the main
+            # editor and navigator follow
+            self.editor.duplicate(page_numbers, deep=deep)
 
             # Clear the selection in the main editor
             self.main_editor.clear_selection()
@@ -300,41 +630,85 @@ class ApplicationWindow(ctk.CTk):
         page_numbers = sorted(self.main_editor.get_selection())
 
         if page_numbers:
-            # Delete the selected pages from the main document
-            self.main_document.delete_pages(page_numbers)
-
-            # Update the main editor with the deleted pages
-            self.main_editor.delete_pages(page_numbers)
-
-            # Delete the pages from the sidebar navigator
-            self.sidebar.navigator.delete_pages(page_numbers)
+            # Delete the selected page references from the main document, the main
+            # editor and navigator follow
+            self.editor.delete(page_numbers)
 
             # Clear the selection in the main editor
             self.main_editor.clear_selection()
 
-    def import_file_to_clipboard(self):
+    def move_pages(self, page_numbers: list[int], position: int) -> None:
+        """
+        Move pages of the main document in front of a position.
+
+        The move is applied as a single permutation of the page table, and the views only
+        rearrange their existing page images instead of rendering the pages again.
+
+        Args:
+            page_numbers (list[int]): The numbers of the pages to move, in the desired order.
+            position (int): The number of the page the moved pages are placed in front of,
+                before moving them. Use the page count to move them to the end.
+        """
+        if not self.editor.move(page_numbers, position):
+            return
+
+        # keep the moved pages selected at their new position
+        start = position - sum(1 for page in set(page_numbers) if page < position)
+        self.main_editor.select_range(start, start + len(set(page_numbers)))
+
+    def import_file_to_clipboard(
+        self, file_name: str = "", page_ranges: str = ""
+    ) -> None:
         """
-        Open a file dialog to select a PDF file for import to the clipboard.
+        Import pages of one or more files to the clipboard.
 
-        This method opens a file dialog, allowing the user to select a PDF file for import
-        to the clipboard.
-        If a valid PDF file is selected, it creates an `ImportWindow` to select pages and
-        initiates the import process.
+        Without a file name, this method opens a file dialog, allowing the user to select
+        any number of PDF files, images and other documents for import to the clipboard.
+        Several files are imported as a whole with `import_files_to_clipboard`.
+        For a single PDF file without a page range expression, it creates an `ImportWindow`
+        to select pages and initiates the import process. An expression like
+        "1-20,45,100-" is resolved against the page count instead, so the pages are
+        imported without rendering them.
 
         It also disables relevant tools in the toolbar and clipboard to prevent actions
         during the import process.
+
+        Args:
+            file_name (str, optional): The path of the file to import.
+            page_ranges (str, optional): The pages to import, see `parse_page_ranges`.
         """
+        import crossfiledialog
+
+        from .importWIndow import ImportWindow
+
         self.toolbar.disable_all()
         self.sidebar.clipboard.disable_tools()
 
-        # Open file dialog to select a PDF file
-        file_name = crossfiledialog.open_file(
-            title="Choose your PDF you want to import to your clipboard:",
-            filter={"PDF-Files": "*.pdf"},
-        )
-
-        if file_name and has_file_extension(file_name, "pdf"):
-            import_doc = fitz.Document(file_name)
+        # Open file dialog to select PDF files, images or other documents
+        if file_name:
+            file_names = [file_name]
+        else:
+            file_names = crossfiledialog.open_multiple(
+                title="Choose the files you want to import to your clipboard:",
+                filter=IMPORT_FILE_FILTER,
+            )
+            file_names = [name for name in file_names or [] if name]
+
+        if len(file_names) == 1 and has_file_extension(file_names[0], "pdf"):
+            import_doc = fitz.Document(file_names[0])
+
+            if page_ranges:
+                try:
+                    page_numbers = parse_page_ranges(page_ranges, import_doc.page_count)
+                except ValueError as error:
+                    CTkMessagebox(
+                        title="Invalid page range", message=str(error), icon="cancel"
+                    )
+                    self.enable_tools()
+                    return
+
+                self.import_file_to_clipboard_command(import_doc, page_numbers)
+                return
 
             import_window = ImportWindow(
                 self,
@@ -342,36 +716,225 @@ class ApplicationWindow(ctk.CTk):
                 self.enable_tools,
             )
             import_window.load_pages(import_doc)
+        elif file_names:
+            self.import_files_to_clipboard(file_names)
         else:
             self.enable_tools()
 
-    def import_file_to_clipboard_command(self, pages: fitz.Document) -> None:
+    def import_folder_to_clipboard(self) -> None:
+        """
+        Open a folder dialog and import all images and documents of the chosen folder to
+        the clipboard, in the order of their names.
+        """
+        import crossfiledialog
+
+        from .fileimport import convertible_files
+
+        self.toolbar.disable_all()
+        self.sidebar.clipboard.disable_tools()
+
+        folder = crossfiledialog.choose_folder(
+            title="Choose the folder of images you want to import to your clipboard:"
+        )
+        file_names = convertible_files(folder) if folder else []
+
+        if file_names:
+            self.import_files_to_clipboard(file_names)
+        else:
+            self.enable_tools()
+
+    def import_files_to_clipboard(self, file_names: list[str]) -> None:
+        """
+        Import all pages of several files to the clipboard at once.
+
+        The files are opened and validated, or converted to PDF pages, in parallel worker
+        processes while the window stays responsive. JPEG files are embedded without
+        re-encoding them. All pages are then added to the clipboard in a single step.
+
+        Args:
+            file_names (list[str]): The paths of the files to import, in order.
+        """
+        from .fileimport import ImportJob
+
+        self.toolbar.disable_all()
+        self.sidebar.clipboard.disable_tools()
+
+        job = ImportJob(file_names)
+        # closing the loading window cancels the import, keeping the files imported so far
+        loading_window = LoadingWindow(
+            self,
+            f"{len(file_names)} file(s)",
+            action="Import",
+            cancel_command=job.cancel,
+        )
+        self.after_idle(self._continue_import, job, loading_window)
+
+    def _continue_import(self, job: "ImportJob", loading_window: LoadingWindow) -> None:
+        """Advance a running import and add its pages once it has finished."""
+        if not job.step():
+            loading_window.set_progress(job.progress)
+            self.after(IMPORT_POLL_INTERVAL, self._continue_import, job, loading_window)
+            return
+
+        loading_window.destroy()
+
+        if job.failed:
+            CTkMessagebox(
+                title="Import incomplete",
+                message="These files could not be imported:\n"
+                + "\n".join(
+                    f"{os.path.basename(file_name)}: {error}"
+                    for file_name, error in job.failed
+                ),
+                icon="warning",
+            )
+
+        self._import_refs(job.refs)
+
+    def import_file_to_clipboard_command(
+        self, document: fitz.Document, page_numbers: list[int]
+    ) -> None:
         """
         Command to import selected pages into the clipboard.
 
         Args:
-            pages (fitz.Document): The selected pages to import into the clipboard.
+            document (fitz.Document): The document to import the pages from.
+            page_numbers (list[int]): The numbers of the pages to import, in order.
+        """
+        self._import_refs([PageRef(document, page) for page in page_numbers])
+
+    def _import_refs(self, refs: list[PageRef]) -> None:
         """
-        # Import into clipboard
-        self.sidebar.clipboard.insert_pages(-1, pages)
+        Append imported pages to the clipboard as one step.
+
+        Only references to the pages are added, see `Editor.import_pages`, and the
+        clipboard view follows.
+
+        Args:
+            refs (list[PageRef]): The references to the imported pages.
+        """
+        self.editor.import_pages(refs)
 
         # Cleanup
         self.enable_tools()
 
+    def undo(self) -> None:
+        """Undo the last edit of the main document or the clipboard."""
+        self.main_editor.clear_selection()
+        self.sidebar.clipboard.clear_selection()
+
+        self.editor.undo()
+        self._update_history_tools()
+
+    def redo(self) -> None:
+        """Redo the last undone edit of the main document or the clipboard."""
+        self.main_editor.clear_selection()
+        self.sidebar.clipboard.clear_selection()
+
+        self.editor.redo()
+        self._update_history_tools()
+
+    def _update_history_tools(self) -> None:
+        """Enable the undo and redo buttons according to the history."""
+        self.toolbar.update_history_buttons(
+            self.editor.history.can_undo, self.editor.history.can_redo
+        )
+
+    def _show_change(self, delta: Change) -> None:
+        """
+        Update the views to a delta the editor has applied to a page table.
+
+        The views are updated once per run of consecutive positions, so the cost is
+        proportional to the number of pages the delta touches. Permutations only
+        rearrange the existing pages of the views.
+
+        Args:
+            delta (Change): The applied delta.
+        """
+        self._update_history_tools()
+
+        if (
+            delta.table is not self.main_pages
+            and delta.table is not self.clipboard_pages
+        ):
+            # the delta belongs to the document of another tab, which is shown with it
+            session = self.workspace.owner(delta.table)
+            if session is not None:
+                self._show_session(session, "Show")
+            return
+
+        if isinstance(delta, PagePermutation):
+            order = delta.order
+            if delta.table is self.main_pages:
+                self.main_editor.reorder_pages(order)
+                self.sidebar.navigator.reorder_pages(order)
+            else:
+                self.sidebar.clipboard.reorder_pages(order)
+        elif delta.inserted:
+            refs = iter(delta.refs)
+            for from_page, to_page in page_runs(delta.positions):
+                pages = load_pages(next(refs) for _ in range(to_page - from_page + 1))
+
+                if delta.table is self.main_pages:
+                    self.main_editor.insert_pages(from_page, pages)
+                    self.sidebar.navigator.insert_pages(from_page, pages)
+                else:
+                    self.sidebar.clipboard.insert_pages(from_page, pages)
+        else:
+            if delta.table is self.main_pages:
+                self.main_editor.delete_pages(list(delta.positions))
+                self.sidebar.navigator.delete_pages(list(delta.positions))
+            else:
+                self.sidebar.clipboard.delete_pages(list(delta.positions))
+
     def enable_tools(self):
         """Enable the disabled tools in the toolbar and clipboard."""
         self.toolbar.enable_all()
         self.sidebar.clipboard.enable_all()
 
     def close_file(self):
-        """CLose the file and discard all changes."""
+        """
+        Close the document of the active tab and discard its changes.
+
+        The next open document is shown afterward. Closing the last document also clears
+        the clipboard and the history. Documents can't be closed while a save is running.
+        """
+        if self._save_job is not None:
+            return
+
+        session = self.workspace.active
+        self._unwatch_file(session)
+        self.editor.close(session)
+        self._update_history_tools()
+
+        # pages of the document may still be in the clipboard or other documents,
+        # so only its rendered images are released
+        page_images.discard_document(session.document)
+
+        if self.workspace:
+            self.main_editor.clear_selection()
+            self._show_session(self.workspace.active, "Show")
+            return
+
         self.main_editor.close_document()
         self.sidebar.navigator.close_document()
         self.sidebar.clipboard.close_document()
         self.toolbar.disable_all_except_open()
+        self._update_tabs()
+
+        # the editor has released the page sources
+        page_images.clear()
 
         self.title("PyDFCat")
 
+    def destroy(self) -> None:
+        """Stop sharing pages with other instances and destroy the window."""
+        if self._clipboard_broker is not None:
+            self._clipboard_broker.close()
+        for session in list(self._watchers):
+            self._unwatch_file(session)
+        super().destroy()
+
 
 def has_file_extension(file_name: str, extension: str) -> bool:
     """
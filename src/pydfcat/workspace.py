@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+import os
+from typing import Iterator, Optional
+
+import fitz  # PyMuPDF
+
+from .pagetable import PageRef, PageTable
+
+
+class DocumentSession:
+    """An open document of the workspace together with its editing state."""
+
+    def __init__(
+        self, document: Optional[fitz.Document] = None, file_name: str = ""
+    ) -> None:
+        """
+        Initialize the DocumentSession.
+
+        Args:
+            document (fitz.Document, optional): The opened source document.
+                Default is an empty document.
+            file_name (str, optional): The file the document was opened from.
+        """
+        self.document = document if document is not None else fitz.Document()
+        self.file_name = file_name
+        self.pages = PageTable.from_document(self.document)
+        # the page references the file currently contains, in the order of its pages
+        self.saved_refs: list[PageRef] = list(self.pages) if file_name else []
+
+    @property
+    def title(self) -> str:
+        """The name of the document shown to the user."""
+        return os.path.basename(self.file_name) or "untitled"
+
+
+class Workspace:
+    """
+    A set of documents that are open at the same time, one of them being active.
+
+    All documents live in the same process, so they share the MuPDF store and the page
+    image cache, and pages can be moved between them by their references without writing
+    either file.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the Workspace."""
+        self.sessions: list[DocumentSession] = []
+        self.active: DocumentSession = DocumentSession()
+
+    def __len__(self) -> int:
+        """Return the number of open documents."""
+        return len(self.sessions)
+
+    def __iter__(self) -> Iterator[DocumentSession]:
+        """Iterate over the open documents."""
+        return iter(self.sessions)
+
+    def find(self, file_name: str) -> Optional[DocumentSession]:
+        """
+        Find the open document of a file.
+
+        Args:
+            file_name (str): The file to look for.
+
+        Returns:
+            Optional[DocumentSession]: The open document or None if the file isn't open.
+        """
+        for session in self.sessions:
+            if session.file_name and _same_file(session.file_name, file_name):
+                return session
+        return None
+
+    def owner(self, table: PageTable) -> Optional[DocumentSession]:
+        """
+        Find the open document a page table belongs to.
+
+        Args:
+            table (PageTable): The page table.
+
+        Returns:
+            Optional[DocumentSession]: The document or None if no open document owns it.
+        """
+        for session in self.sessions:
+            if session.pages is table:
+                return session
+        return None
+
+    def add(self, session: DocumentSession) -> None:
+        """
+        Add a document to the workspace and make it the active one.
+
+        Args:
+            session (DocumentSession): The opened document.
+        """
+        self.sessions.append(session)
+        self.active = session
+
+    def remove(self, session: DocumentSession) -> None:
+        """
+        Remove a document from the workspace.
+
+        If the document was active, the last remaining document becomes the active one.
+
+        Args:
+            session (DocumentSession): The document to remove.
+        """
+        self.sessions.remove(session)
+
+        if session is self.active:
+            self.active = self.sessions[-1] if self.sessions else DocumentSession()
+
+
+def _same_file(file_name: str, other_file_name: str) -> bool:
+    """Check whether two paths refer to the same file."""
+    try:
+        return os.path.samefile(file_name, other_file_name)
+    except OSError:
+        return os.path.abspath(file_name) == os.path.abspath(other_file_name)
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+from typing import Callable
+
+import fitz  # PyMuPDF
+import pytest
+
+
+def page_texts(document: fitz.Document) -> list[str]:
+    """Get the text of each page of a document."""
+    return [page.get_text().strip() for page in document]
+
+
+@pytest.fixture
+def make_pdf(tmp_path) -> Callable[..., str]:
+    """Create PDF files whose pages show a label and their page number."""
+
+    def make(name: str, page_count: int, label: str = "") -> str:
+        file_name = str(tmp_path / name)
+        document = fitz.Document()
+        for page in range(page_count):
+            document.new_page().insert_text((72, 72), f"{label or name} {page}")
+        document.save(file_name)
+        document.close()
+        return file_name
+
+    return make
+
+
+@pytest.fixture
+def document(make_pdf) -> fitz.Document:
+    """An opened document of 10 pages labelled "doc 0" to "doc 9"."""
+    document = fitz.Document(make_pdf("doc.pdf", 10, "doc"))
+    yield document
+    document.close()
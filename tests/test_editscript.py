@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+import json
+import os
+
+import fitz  # PyMuPDF
+import pytest
+
+from conftest import page_texts
+from pydfcat.editscript import load_script, plan_script, run_script
+
+
+@pytest.fixture
+def sources(make_pdf) -> dict[str, str]:
+    """Two source files "A" with 5 pages and "B" with 3 pages."""
+    return {"A": make_pdf("a.pdf", 5, "a"), "B": make_pdf("b.pdf", 3, "b")}
+
+
+def planned_texts(script) -> list[str]:
+    """Get the text of each planned page."""
+    return [ref.load().get_text().strip() for ref in plan_script(script).table]
+
+
+def test_append_and_insert(sources):
+    script = {
+        "sources": sources,
+        "steps": [
+            {"op": "append", "source": "A", "pages": "2-4"},
+            {"op": "insert", "source": "B", "pages": "3", "after": 1},
+            {"op": "insert", "source": "B", "pages": "1", "before": 1},
+        ],
+    }
+
+    assert planned_texts(script) == ["b 0", "a 1", "b 2", "a 2", "a 3"]
+
+
+def test_steps_act_on_the_pages_planned_so_far(sources):
+    script = {
+        "sources": sources,
+        "steps": [
+            {"op": "append", "source": "A"},
+            {"op": "delete", "pages": "2,4"},
+            {"op": "move", "pages": "3", "before": 1},
+            {"op": "duplicate", "pages": "1"},
+            {"op": "select", "pages": "3-1"},
+        ],
+    }
+
+    assert planned_texts(script) == ["a 0", "a 4", "a 4"]
+
+
+def test_rotate_sets_the_rotation_of_the_references(sources):
+    plan = plan_script(
+        [
+            {"op": "append", "source": sources["B"]},
+            {"op": "rotate", "pages": "1-2", "angle": 270},
+            {"op": "rotate", "pages": "2"},
+        ]
+    )
+
+    assert [ref.rotation for ref in plan.table] == [270, 0, None]
+
+
+def test_pages_are_transferred_in_runs(sources):
+    plan = plan_script(
+        {
+            "sources": sources,
+            "steps": [
+                {"op": "append", "source": "A", "pages": "1-3"},
+                {"op": "append", "source": "B"},
+                {"op": "append", "source": "A", "pages": "4-5"},
+                {"op": "duplicate", "pages": "1-2"},
+            ],
+        }
+    )
+
+    # one transfer per run of consecutive pages, the duplicates aren't copied again
+    assert plan.transfers == 3
+    assert str(plan) == "10 pages from 2 files in 3 transfers"
+
+
+@pytest.mark.parametrize(
+    "step, message",
+    [
+        ({"op": "shuffle"}, "Unknown operation"),
+        ({"op": "delete", "page": "1"}, "Unknown keys"),
+        ({"op": "append"}, "requires a"),
+        ({"op": "delete", "pages": "9"}, "out of range"),
+        ({"op": "move", "pages": "1", "before": 1, "after": 1}, "either"),
+        ({"op": "rotate", "angle": 45}, "multiple of 90"),
+    ],
+)
+def test_invalid_steps_name_the_step(sources, step, message):
+    script = {"sources": sources, "steps": [{"op": "append", "source": "A"}, step]}
+
+    with pytest.raises(ValueError, match=f"Step 2 .*{message}"):
+        plan_script(script)
+
+
+def test_run_script_writes_the_output_relative_to_the_script(sources, tmp_path):
+    script_name = tmp_path / "script.json"
+    script_name.write_text(
+        json.dumps(
+            {
+                "sources": {"A": "a.pdf", "B": "b.pdf"},
+                "steps": [
+                    {"op": "append", "source": "B"},
+                    {"op": "append", "source": "A", "pages": "5-4"},
+                ],
+                "output": "out.pdf",
+            }
+        ),
+        encoding="utf-8",
+    )
+
+    report = run_script(load_script(str(script_name)))
+
+    assert report.file_name == os.path.join(str(tmp_path), "out.pdf")
+    output = fitz.Document(report.file_name)
+    assert page_texts(output) == ["b 0", "b 1", "b 2", "a 4", "a 3"]
+    output.close()
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from pydfcat.core import Editor
+from pydfcat.history import History, PageDelta, PagePermutation
+from pydfcat.pagetable import PageTable
+from pydfcat.workspace import DocumentSession
+
+
+@pytest.fixture
+def editor(document) -> Editor:
+    """An editor with the 10 page document open."""
+    editor = Editor()
+    editor.workspace.add(DocumentSession(document))
+    # every edit is a step of its own
+    editor.history.coalesce_time = -1
+    return editor
+
+
+def test_delta_inverse_restores_the_table(document):
+    table = PageTable.from_document(document)
+    original = list(table)
+
+    removed = table.delete([1, 2, 7])
+    delta = PageDelta.deletion(table, [1, 2, 7], removed)
+    delta.inverse().apply()
+    assert list(table) == original
+
+    delta.apply()
+    assert list(table) == [original[i] for i in (0, 3, 4, 5, 6, 8, 9)]
+
+
+def test_move_keeps_only_the_moved_indices(document):
+    table = PageTable.from_document(document)
+    original = list(table)
+
+    permutation = PagePermutation.move(table, [9, 2], 0)
+    permutation.apply()
+
+    assert permutation.size == 2
+    assert list(table) == [original[i] for i in (9, 2, 0, 1, 3, 4, 5, 6, 7, 8)]
+
+    permutation.inverse().apply()
+    assert list(table) == original
+
+
+def test_undo_and_redo_round_trip(editor):
+    states = [list(editor.pages)]
+
+    editor.move([0, 5], 8)
+    states.append(list(editor.pages))
+    editor.delete([1, 2, 3])
+    states.append(list(editor.pages))
+    editor.duplicate([0, 4], deep=True)
+    states.append(list(editor.pages))
+    editor.cut([2])
+    states.append(list(editor.pages))
+    editor.paste(0, list(editor.clipboard))
+    states.append(list(editor.pages))
+
+    for state in reversed(states[:-1]):
+        editor.undo()
+        assert list(editor.pages) == state
+    assert not editor.history.can_undo
+
+    for state in states[1:]:
+        editor.redo()
+        assert list(editor.pages) == state
+    assert not editor.history.can_redo
+
+
+def test_repeated_actions_are_coalesced(editor):
+    editor.history.coalesce_time = 60
+    original = list(editor.pages)
+
+    editor.move([0], 3)
+    editor.move([0], 3)
+    editor.undo()
+
+    assert list(editor.pages) == original
+    assert not editor.history.can_undo
+
+
+def test_oldest_steps_are_dropped_beyond_the_cap(document):
+    table = PageTable.from_document(document)
+    applied = []
+    history = History(applied.append, max_page_refs=5, coalesce_time=-1)
+
+    for _ in range(3):
+        refs = table.delete([0, 1])
+        history.record("delete", [PageDelta.deletion(table, [0, 1], refs)])
+
+    history.undo()
+    history.undo()
+    history.undo()
+    assert len(applied) == 2
+
+
+def test_forget_drops_the_steps_of_a_table(document):
+    first = PageTable.from_document(document)
+    second = PageTable.from_document(document)
+    history = History(lambda delta: delta.apply(), coalesce_time=-1)
+
+    history.record("delete", [PageDelta.deletion(first, [0], first.delete([0]))])
+    history.record("delete", [PageDelta.deletion(second, [0], second.delete([0]))])
+    history.forget(first)
+    history.undo()
+
+    assert not history.can_undo
+    assert len(first) == 9 and len(second) == 10
+
+
+def test_page_refs_lists_the_kept_references(document):
+    table = PageTable.from_document(document)
+    history = History(lambda delta: delta.apply())
+    refs = table.delete([3, 4])
+
+    history.record("delete", [PageDelta.deletion(table, [3, 4], refs)])
+    history.record("move", [PagePermutation.move(table, [0], 5)])
+
+    assert list(history.page_refs()) == refs
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from pydfcat.pageops import inverse_order, move_order, page_runs, parse_page_ranges
+
+
+@pytest.mark.parametrize(
+    "expression, expected",
+    [
+        ("1", [0]),
+        ("1-3", [0, 1, 2]),
+        ("1-3,5", [0, 1, 2, 4]),
+        (" 2 - 3 , 10 ", [1, 2, 9]),
+        ("-3", [0, 1, 2]),
+        ("8-", [7, 8, 9]),
+        ("-", list(range(10))),
+        ("3-1", [2, 1, 0]),
+        ("2,2", [1, 1]),
+    ],
+)
+def test_parse_page_ranges(expression, expected):
+    assert parse_page_ranges(expression, 10) == expected
+
+
+@pytest.mark.parametrize(
+    "expression", ["", "1,,2", "0", "11", "1-11", "a", "1-b", "1-2-3"]
+)
+def test_parse_page_ranges_rejects_invalid_expressions(expression):
+    with pytest.raises(ValueError):
+        parse_page_ranges(expression, 10)
+
+
+def test_page_runs_keep_the_given_order():
+    assert page_runs([0, 1, 2, 5, 4, 6]) == [(0, 2), (5, 5), (4, 4), (6, 6)]
+
+
+def test_move_order_and_its_inverse():
+    order = move_order(6, [4, 1], 3)
+
+    assert order == [0, 2, 4, 1, 3, 5]
+    assert [order[index] for index in inverse_order(order)] == list(range(6))
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+import fitz  # PyMuPDF
+import pytest
+
+from conftest import page_texts
+from pydfcat.pagetable import PageRef, PageTable, apply_page_plan, plan_pages
+
+
+def test_from_document_references_every_page(document):
+    table = PageTable.from_document(document)
+
+    assert len(table) == document.page_count
+    assert [ref.page for ref in table] == list(range(10))
+    assert all(ref.document is document for ref in table)
+
+
+@pytest.mark.parametrize(
+    "indices", [[0], [9], [2, 3, 4], [0, 5, 9], [1, 2, 6, 7, 8], list(range(10))]
+)
+def test_delete_and_insert_at_round_trip(document, indices):
+    table = PageTable.from_document(document)
+    original = list(table)
+
+    removed = table.delete(reversed(indices))
+
+    assert removed == [original[index] for index in indices]
+    assert list(table) == [ref for ref in original if ref not in removed]
+
+    table.insert_at(indices, removed)
+    assert list(table) == original
+
+
+def test_duplicate_inserts_copies_behind_the_last_page(document):
+    table = PageTable.from_document(document)
+
+    copies = table.duplicate([4, 1])
+
+    assert copies == [table[4], table[1]]
+    assert table.refs(range(5, 7)) == copies
+    assert len(table) == 12
+
+
+def test_deep_copies_are_distinct_references(document):
+    table = PageTable.from_document(document)
+
+    copies = table.duplicate([0, 0], deep=True)
+
+    assert copies[0] != copies[1] != table[0]
+    assert copies[0].original() == copies[1].original() == table[0]
+
+
+def test_permute(document):
+    table = PageTable.from_document(document)
+    original = list(table)
+    order = [9, 0, 1, 2, 3, 4, 5, 6, 7, 8]
+
+    table.permute(order)
+
+    assert list(table) == [original[index] for index in order]
+
+
+def test_materialize_shares_repeated_pages(document):
+    table = PageTable.from_document(document)
+    refs = [table[3], PageRef(document, 0, 90), table[3], table[3].deep_copy()]
+
+    result = PageTable(refs).materialize()
+
+    assert page_texts(result) == ["doc 3", "doc 0", "doc 3", "doc 3"]
+    assert result[1].rotation == 90
+    xrefs = [page.xref for page in result]
+    assert xrefs[0] == xrefs[2] != xrefs[3]
+
+
+def test_page_plan_reuses_pages_the_document_contains(document, make_pdf):
+    other = fitz.Document(make_pdf("other.pdf", 3, "other"))
+    saved = list(PageTable.from_document(document))
+    refs = [saved[2], PageRef(other, 1), saved[0], saved[0].deep_copy()]
+
+    positions = {ref: position for position, ref in enumerate(saved)}
+    originals, plan = plan_pages(refs, positions, len(saved))
+
+    assert originals == [PageRef(other, 1)]
+    assert plan == [(2, 0), (10, 0), (0, 0), (0, refs[3].copy)]
+
+    document.insert_pdf(other, from_page=1, to_page=1)
+    apply_page_plan(document, plan)
+    assert page_texts(document) == ["doc 2", "other 1", "doc 0", "doc 0"]
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import itertools
+import random
+
+from pydfcat.rowindex import RowOffsetIndex
+
+
+def assert_matches(index: RowOffsetIndex, heights: list[int]) -> None:
+    """Compare an index with the prefix sums of a list of row heights."""
+    offsets = list(itertools.accumulate(heights, initial=0))
+
+    assert len(index) == len(heights)
+    assert index.total() == sum(heights)
+    for row in range(len(heights) + 1):
+        assert index.offset(row) == offsets[row]
+    for row, height in enumerate(heights):
+        if height:
+            assert index.row_at(offsets[row]) == row
+            assert index.row_at(offsets[row] + height - 1) == row
+
+
+def test_lookups_are_clamped_to_the_rows():
+    index = RowOffsetIndex([10, 20, 30])
+
+    assert index.offset(-1) == 0
+    assert index.offset(5) == 60
+    assert index.row_at(-5) == 0
+    assert index.row_at(1000) == 2
+    assert RowOffsetIndex().row_at(10) == 0
+
+
+def test_edits_match_a_list_of_heights():
+    rng = random.Random(0)
+    heights = [rng.randint(0, 5) for _ in range(50)]
+    index = RowOffsetIndex(heights)
+
+    for _ in range(500):
+        action = rng.random()
+        if action < 0.4:
+            row = rng.randint(0, len(heights))
+            inserted = [rng.randint(0, 5) for _ in range(rng.randint(1, 4))]
+            heights[row:row] = inserted
+            index.insert(row, inserted)
+        elif action < 0.7 and heights:
+            rows = set(rng.sample(range(len(heights)), min(len(heights), 5)))
+            heights = [height for row, height in enumerate(heights) if row not in rows]
+            index.delete(rows)
+        elif heights:
+            row = rng.randrange(len(heights))
+            heights[row] = rng.randint(0, 5)
+            index.set(row, heights[row])
+
+        assert_matches(index, heights)